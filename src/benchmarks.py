@@ -0,0 +1,938 @@
+"""Offline benchmarks for the macro's hot paths.
+
+Run from the repository root, for example:
+
+    python src\\benchmarks.py frame-analysis
+
+None of these touch the game window, so they can run on any machine.
+
+OCR benchmarks read a labeled corpus of notification-area captures (turn on
+save_ocr_samples to collect them, then sort the PNGs into subfolders):
+
+    <corpus>/fruit/*.png       common/rare devil fruit banner
+    <corpus>/legendary/*.png   devil fruit banner with pity at 0
+    <corpus>/none/*.png        anything else
+
+    python src\\benchmarks.py banner-gate --corpus ocr_samples
+"""
+
+import argparse
+import gc
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import frame_analysis
+from ocr_fastpath import TextLineLayout
+from ocr_gate import BannerGate
+from ocr_templates import TemplateDetector
+from profiler import StageProfiler
+
+CORPUS_LABELS = ('fruit', 'legendary', 'none')
+
+
+def _percentiles(samples_ms):
+    data = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "mean_ms": round(float(data.mean()), 4),
+        "p50_ms": round(float(np.percentile(data, 50)), 4),
+        "p95_ms": round(float(np.percentile(data, 95)), 4),
+        "p99_ms": round(float(np.percentile(data, 99)), 4),
+    }
+
+
+def _time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def make_minigame_frame(width=410, height=720, bar_x=200, white=(300, 360), fish=(320, 340), seed=0):
+    """Build a BGRA frame that looks like the fishing minigame to fishing().
+
+    The bar is a blue column with a dark gray track, a white target zone and
+    some dark gray noise rows outside the fish bar.
+    """
+    rng = np.random.default_rng(seed)
+    img = rng.integers(40, 200, size=(height, width, 4), dtype=np.uint8)
+    img[:, :, 3] = 255
+
+    def paint(rows, cols, rgb):
+        img[rows, cols, 0] = rgb[2]
+        img[rows, cols, 1] = rgb[1]
+        img[rows, cols, 2] = rgb[0]
+
+    track_top, track_bottom = int(height * 0.1), int(height * 0.9)
+    paint(slice(track_top, track_bottom), slice(bar_x - 6, bar_x + 7), frame_analysis.BAR_BLUE)
+    paint(slice(track_top, track_bottom), bar_x, frame_analysis.TRACK_GRAY)
+    paint(slice(white[0], white[1]), bar_x, frame_analysis.TARGET_WHITE)
+    paint(slice(fish[0], fish[1]), bar_x, frame_analysis.TRACK_GRAY)
+    return img
+
+
+def load_corpus(directory):
+    """Return [(label, relative_path, BGRA image)] for every PNG under the label folders."""
+    import cv2
+
+    if not directory or not os.path.isdir(directory):
+        raise SystemExit("This benchmark needs --corpus pointing at a labeled screenshot folder")
+    samples = []
+    for label in CORPUS_LABELS:
+        folder = os.path.join(directory, label)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.lower().endswith('.png'):
+                continue
+            img = cv2.imread(os.path.join(folder, name), cv2.IMREAD_UNCHANGED)
+            if img is None:
+                continue
+            if img.ndim == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGRA)
+            elif img.shape[2] == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2BGRA)
+            samples.append((label, f"{label}/{name}", img))
+    if not samples:
+        raise SystemExit(f"No labeled PNGs found under {directory}")
+    return samples
+
+
+def bench_frame_analysis(args):
+    frames = [
+        make_minigame_frame(white=(300 + i * 7 % 200, 360 + i * 7 % 200), fish=(250 + i * 11 % 300, 270 + i * 11 % 300), seed=i)
+        for i in range(16)
+    ]
+    empty = np.zeros_like(frames[0])
+    multiplier = 2.0
+
+    for img in frames + [empty]:
+        expected = frame_analysis.analyze_frame_numpy(img, multiplier)
+        actual = frame_analysis.analyze_frame(img, multiplier)
+        if expected != actual:
+            raise SystemExit(f"Kernel mismatch: numpy={expected} fused={actual}")
+
+    frame_analysis.warmup()
+    results = {"frame_shape": list(frames[0].shape), "numba": frame_analysis.HAS_NUMBA}
+    counter = iter(range(10 ** 9))
+    results["numpy"] = _percentiles(_time_calls(
+        lambda: frame_analysis.analyze_frame_numpy(frames[next(counter) % len(frames)], multiplier), args.iterations))
+    if frame_analysis.HAS_NUMBA:
+        results["fused"] = _percentiles(_time_calls(
+            lambda: frame_analysis.analyze_frame(frames[next(counter) % len(frames)], multiplier), args.iterations))
+    return results
+
+
+def _measure_allocations(fn, iterations):
+    """Run fn under tracemalloc and report what a steady-state tick allocates."""
+    # Enough warm-up calls to cycle through every frame and fill NumPy's small-array caches.
+    for _ in range(20):
+        fn()
+    collections = [0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    # Preallocated so recording a tick doesn't itself leave a block behind.
+    peaks = np.zeros(iterations, dtype=np.int64)
+    tracemalloc.start()
+    gc.callbacks.append(on_gc)
+    try:
+        before = tracemalloc.take_snapshot()
+        for i in range(iterations):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peaks[i] = tracemalloc.get_traced_memory()[1] - current
+        after = tracemalloc.take_snapshot()
+    finally:
+        gc.callbacks.remove(on_gc)
+        tracemalloc.stop()
+
+    # Leave out tracemalloc's own bookkeeping for the two snapshots.
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    new_blocks = sum(max(s.count_diff, 0) for s in stats)
+    return {
+        "peak_bytes_per_tick_max": int(max(peaks)),
+        "peak_bytes_per_tick_p50": int(np.percentile(peaks, 50)),
+        "allocated_blocks_per_tick": round(new_blocks / iterations, 3),
+        # Whole blocks every tick keeps; the few that outlive the loop round down to 0.
+        "new_blocks_per_tick": new_blocks // iterations,
+        "gc_collections": collections[0],
+    }
+
+
+def bench_frame_allocations(args):
+    frames = [make_minigame_frame(seed=i) for i in range(4)]
+    workspace = frame_analysis.FrameWorkspace(*frames[0].shape[:2])
+    multiplier = 2.0
+    frame_analysis.warmup()
+    counter = iter(range(10 ** 9))
+
+    results = {
+        "frame_shape": list(frames[0].shape),
+        "numba": frame_analysis.HAS_NUMBA,
+        "numpy": _measure_allocations(
+            lambda: frame_analysis.analyze_frame_numpy(frames[next(counter) % 4], multiplier), args.iterations),
+        "workspace": _measure_allocations(
+            lambda: workspace.analyze(frames[next(counter) % 4], multiplier), args.iterations),
+        "workspace_bite_check": _measure_allocations(
+            lambda: workspace.bite_detected(frames[next(counter) % 4]), args.iterations),
+    }
+    if frame_analysis.HAS_NUMBA:
+        results["fused"] = _measure_allocations(
+            lambda: frame_analysis.analyze_frame(frames[next(counter) % 4], multiplier), args.iterations)
+    leaking = [name for name in ("workspace", "workspace_bite_check", "fused")
+               if name in results and results[name]["new_blocks_per_tick"] != 0]
+    if leaking:
+        raise SystemExit(f"Steady-state ticks keep allocating blocks: {leaking}")
+    return results
+
+
+def bench_profiler_overhead(args):
+    """Compare a profiled analysis tick against an unprofiled one."""
+    frames = [make_minigame_frame(seed=i) for i in range(4)]
+    workspace = frame_analysis.FrameWorkspace(*frames[0].shape[:2])
+    profiler = StageProfiler()
+    multiplier = 2.0
+    frame_analysis.warmup()
+    counter = iter(range(10 ** 9))
+
+    def tick(stage_profiler):
+        start = time.perf_counter()
+        img = frames[next(counter) % 4]
+        if stage_profiler is not None:
+            stage_profiler.record('fishing.capture', time.perf_counter() - start)
+        frame_analysis.analyze_frame(img, multiplier, workspace, stage_profiler)
+        if stage_profiler is not None:
+            control_start = time.perf_counter()
+            stage_profiler.record('fishing.control_law', time.perf_counter() - control_start)
+            stage_profiler.record('fishing.input_dispatch', time.perf_counter() - control_start)
+
+    plain = _percentiles(_time_calls(lambda: tick(None), args.iterations))
+    profiled = _percentiles(_time_calls(lambda: tick(profiler), args.iterations))
+
+    # A separate profiler, so the measurement loop doesn't show up as a stage
+    record_calls = 100000
+    scratch = StageProfiler()
+    start = time.perf_counter()
+    for _ in range(record_calls):
+        scratch.record('overhead', time.perf_counter() - start)
+    record_ns = (time.perf_counter() - start) / record_calls * 1e9
+
+    return {
+        "numba": frame_analysis.HAS_NUMBA,
+        "plain": plain,
+        "profiled": profiled,
+        "record_with_timestamp_ns": round(record_ns, 1),
+        "stages": profiler.summary(),
+    }
+
+
+def bench_banner_gate(args):
+    """False-negative/skip rates of the pre-OCR banner gate, and its cost."""
+    samples = load_corpus(args.corpus)
+    gate = BannerGate()
+    scores = {label: [] for label in CORPUS_LABELS}
+    missed = []
+    for label, path, img in samples:
+        score = gate.score(img)
+        scores[label].append(score)
+        if label != 'none' and score < gate.min_score:
+            missed.append({"path": path, "score": round(score, 5)})
+
+    positives = scores['fruit'] + scores['legendary']
+    negatives = scores['none']
+    counter = iter(range(10 ** 9))
+    results = {
+        "samples": {label: len(values) for label, values in scores.items()},
+        "min_score": gate.min_score,
+        "false_negative_rate": round(len(missed) / len(positives), 4) if positives else None,
+        "skip_rate_on_none": round(sum(s < gate.min_score for s in negatives) / len(negatives), 4) if negatives else None,
+        "missed": missed,
+        "lowest_positive_score": round(min(positives), 5) if positives else None,
+        "highest_none_score": round(max(negatives), 5) if negatives else None,
+        "latency": _percentiles(_time_calls(
+            lambda: gate.score(samples[next(counter) % len(samples)][2]), args.iterations)),
+    }
+    return results
+
+
+def make_banner(fruit, pity=12, width=420, height=110):
+    """Grayscale stand-in for the devil fruit banner: a name line and a pity line."""
+    import cv2
+
+    img = np.full((height, width), 30, dtype=np.uint8)
+    cv2.putText(img, f"{fruit} Devil Fruit dropped!", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 235, 2)
+    cv2.putText(img, f"Pity: {pity}/40", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 235, 2)
+    return img
+
+
+def _check_fruit_names(detector_dir):
+    """Harvest a template from one fruit's banner and classify other fruits: none may be rejected."""
+    detector = TemplateDetector(detector_dir)
+    source = make_banner("Flame")
+    detector.harvest(source, [([[5, 12], [400, 12], [400, 50], [5, 50]], "flame devil fruit dropped!", 0.99)])
+    rows = {}
+    for fruit in ("Flame", "Ice", "Dough", "Leopard", "Kitsune"):
+        img = make_banner(fruit)
+        verdict = detector.classify(img)
+        rows[fruit] = {"score": round(detector.scores(img)['banner'], 4), "verdict": verdict}
+    rejected = [fruit for fruit, row in rows.items() if row["verdict"] is False]
+    if rejected:
+        raise SystemExit(f"Template rejected a devil fruit banner: {rejected}")
+    return rows
+
+
+def bench_banner_templates(args):
+    """Template detector verdicts against corpus labels, and how often OCR would still run."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as scratch:
+        results = {"fruit_names": _check_fruit_names(scratch)}
+    if not args.templates:
+        return results
+    if not os.path.isdir(args.templates):
+        raise SystemExit("--templates must point at an ocr_templates folder")
+    detector = TemplateDetector(args.templates)
+    loaded = detector.load()
+    samples = load_corpus(args.corpus)
+
+    rows = []
+    for label, path, img in samples:
+        verdict = detector.classify(img)
+        rows.append({
+            "path": path,
+            "label": label,
+            "verdict": verdict,
+            "correct": None if verdict is None else label != 'none',
+            "scores": {kind: None if score is None else round(score, 4) for kind, score in detector.scores(img).items()},
+        })
+
+    decided = [row for row in rows if row["verdict"] is not None]
+    counter = iter(range(10 ** 9))
+    results.update({
+        "templates": loaded,
+        "thresholds": {"high": detector.high},
+        "samples": len(rows),
+        "decided_rate": round(len(decided) / len(rows), 4),
+        "accuracy_on_decided": round(sum(row["correct"] for row in decided) / len(decided), 4) if decided else None,
+        "wrong": [row for row in decided if not row["correct"]],
+        "latency": _percentiles(_time_calls(
+            lambda: detector.classify(samples[next(counter) % len(samples)][2]), args.iterations)),
+        "samples_detail": rows,
+    })
+    return results
+
+
+def _load_reader():
+    try:
+        import easyocr
+    except ImportError:
+        raise SystemExit("This benchmark needs easyocr installed")
+    return easyocr.Reader(['en'], gpu=False, verbose=False)
+
+
+def bench_ocr_fast_path(args):
+    """Full readtext vs recognizer-only reads of learned banner lines on fruit captures."""
+    import cv2
+
+    positives = [(path, cv2.cvtColor(img, cv2.COLOR_BGRA2RGB))
+                 for label, path, img in load_corpus(args.corpus) if label != 'none']
+    if not positives:
+        raise SystemExit("The corpus has no fruit/legendary captures to learn the layout from")
+    reader = _load_reader()
+    readtext_kwargs = dict(detail=1, paragraph=False, batch_size=1, text_threshold=0.5, low_text=0.3, link_threshold=0.3)
+
+    layout = TextLineLayout()
+    full_ms, fast_ms, rows = [], [], []
+    reader.readtext(positives[0][1], **readtext_kwargs)  # warm-up
+    for path, img in positives:
+        start = time.perf_counter()
+        full = reader.readtext(img, **readtext_kwargs)
+        full_ms.append((time.perf_counter() - start) * 1000)
+        full_text = ' '.join(text for _box, text, _conf in full).lower()
+        if not layout.ready:
+            layout.learn(full, img.shape)
+            continue
+
+        boxes = layout.boxes_for(img.shape)
+        if boxes is None:
+            rows.append({"path": path, "result": "shape_mismatch"})
+            continue
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+        start = time.perf_counter()
+        fast = reader.recognize(gray, horizontal_list=boxes, free_list=[], detail=1, batch_size=len(boxes))
+        fast_ms.append((time.perf_counter() - start) * 1000)
+        fast_text = ' '.join(text for _box, text, _conf in fast).lower()
+        rows.append({
+            "path": path,
+            "result": "hit" if layout.confident(fast) else "fallback",
+            "same_text": fast_text == full_text,
+            "full_text": full_text,
+            "fast_text": fast_text,
+        })
+
+    hits = [row for row in rows if row["result"] == "hit"]
+    return {
+        "layout": layout.to_dict(),
+        "samples": len(positives),
+        "readtext": _percentiles(full_ms),
+        "recognize": _percentiles(fast_ms) if fast_ms else None,
+        "hit_rate": round(len(hits) / len(rows), 4) if rows else None,
+        "text_agreement_on_hits": round(sum(row["same_text"] for row in hits) / len(hits), 4) if hits else None,
+        "samples_detail": rows,
+    }
+
+
+def bench_ocr_batching(args):
+    """Three sequential readtext calls vs one readtext_batched call on same-sized captures."""
+    import cv2
+
+    samples = load_corpus(args.corpus)
+    shape = samples[0][2].shape
+    frames = [cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY) for _label, _path, img in samples if img.shape == shape]
+    reader = _load_reader()
+    kwargs = dict(detail=0, paragraph=True)
+    reader.readtext(frames[0], **kwargs)  # warm-up
+
+    sequential, batched = [], []
+    for index in range(min(args.iterations, len(frames))):
+        burst = [frames[(index + k) % len(frames)] for k in range(3)]
+        start = time.perf_counter()
+        for frame in burst:
+            reader.readtext(frame, **kwargs)
+        sequential.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        reader.readtext_batched(burst, **kwargs)
+        batched.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "frame_shape": list(shape),
+        "bursts": len(sequential),
+        "sequential_3x_readtext": _percentiles(sequential),
+        "readtext_batched_3": _percentiles(batched),
+    }
+
+
+def _legacy_preprocess(img):
+    """preprocess_image_for_ocr() before the fused variants: resize, BGR->RGB, RGB->gray, contrast."""
+    import cv2
+
+    height, width = img.shape[:2]
+    if width > 800 or height > 600:
+        scale = min(800 / width, 600 / height)
+        img = cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_LINEAR)
+    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    return cv2.convertScaleAbs(img, alpha=1.2, beta=10)
+
+
+def bench_ocr_preprocess(args):
+    """Latency and allocations of each preprocessing variant; OCR hit rate per variant when easyocr is installed."""
+    from ocr_pipeline import match_fruit_and_legendary
+    from ocr_preprocess import VARIANTS, OcrPreprocessor
+    from ocr_worker import warmup_image
+
+    if args.corpus:
+        samples = load_corpus(args.corpus)
+    else:
+        import cv2
+        samples = [('fruit', 'synthetic', cv2.cvtColor(warmup_image(), cv2.COLOR_RGB2BGRA))]
+    preprocessor = OcrPreprocessor()
+    counter = iter(range(10 ** 9))
+
+    def frame():
+        return samples[next(counter) % len(samples)][2]
+
+    results = {"samples": len(samples), "frame_shape": list(samples[0][2].shape), "variants": {}}
+    results["legacy_preprocess"] = dict(
+        _percentiles(_time_calls(lambda: _legacy_preprocess(frame()), args.iterations)),
+        **_measure_allocations(lambda: _legacy_preprocess(frame()), min(args.iterations, 200)))
+    for variant in VARIANTS:
+        results["variants"][variant] = dict(
+            _percentiles(_time_calls(lambda: preprocessor.prepare(variant, frame()), args.iterations)),
+            **_measure_allocations(lambda: preprocessor.prepare(variant, frame()), min(args.iterations, 200)))
+
+    try:
+        reader = _load_reader()
+    except SystemExit:
+        results["ocr"] = "skipped: easyocr not installed"
+        return results
+    if not args.corpus:
+        return results
+    readtext_kwargs = dict(detail=0, paragraph=True)
+    for variant in VARIANTS:
+        correct, ocr_ms = 0, []
+        for label, _path, img in samples:
+            prepared = preprocessor.prepare(variant, img)
+            start = time.perf_counter()
+            text = ' '.join(reader.readtext(prepared, **readtext_kwargs)).lower()
+            ocr_ms.append((time.perf_counter() - start) * 1000)
+            has_fruit, is_legendary, _details = match_fruit_and_legendary(text)
+            predicted = 'legendary' if is_legendary else 'fruit' if has_fruit else 'none'
+            correct += predicted == label
+        results["variants"][variant]["hit_rate"] = round(correct / len(samples), 4)
+        results["variants"][variant]["readtext"] = _percentiles(ocr_ms)
+    return results
+
+
+_BANNER_TEXTS = (
+    ('fruit', "you fished up a devil fruit! check your backpack pity: 12/40"),
+    ('fruit', "devil fruit drop! got a devil fruit pity: 7/40"),
+    ('legendary', "you fished up a devil fruit! check your backpack pity: 0/40"),
+    ('legendary', "legendary devil fruit drop! pity 0/40"),
+    ('none', "you caught a salmon"),
+    ('none', "level up! fishing level 12"),
+    ('none', "the weather is clear"),
+    ('none', "you got 25 coins"),
+)
+
+
+def make_text_corpus(count=2000, noise=0.08, seed=0):
+    """Labeled banner and non-banner texts with OCR-style noise: confusions, dropped and swapped letters."""
+    rng = np.random.default_rng(seed)
+    confusions = {'o': '0', 'l': '1', 'i': 'l', 'e': 'c', 's': '5', 'u': 'v'}
+    corpus = []
+    for index in range(count):
+        label, text = _BANNER_TEXTS[index % len(_BANNER_TEXTS)]
+        chars = []
+        for char in text:
+            roll = rng.random()
+            if roll < noise / 3 and char in confusions:
+                chars.append(confusions[char])
+            elif roll < noise * 2 / 3 and char.isalpha():
+                continue
+            else:
+                chars.append(char)
+        if rng.random() < noise and len(chars) > 3:
+            at = int(rng.integers(0, len(chars) - 1))
+            chars[at], chars[at + 1] = chars[at + 1], chars[at]
+        corpus.append((label, ''.join(chars)))
+    return corpus
+
+
+def _load_text_corpus(path):
+    """label<TAB>text per line, label one of CORPUS_LABELS."""
+    corpus = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            label, _, text = line.rstrip('\n').partition('\t')
+            if label in CORPUS_LABELS and text:
+                corpus.append((label, text.lower()))
+    if not corpus:
+        raise SystemExit(f"No labeled texts found in {path}")
+    return corpus
+
+
+def _legacy_match_fruit(text):
+    """match_fruit_and_legendary() before the compiled matcher: one substring scan per pattern."""
+    import re
+
+    patterns = ('drop', 'backpac', 'ruit', 'evil', 'got', 'fish', 'legendar', 'pity')
+    has_fruit = sum(1 for pattern in patterns if pattern in text) >= 2
+    is_legendary = False
+    if has_fruit and 'pity' in text:
+        pity_match = re.search(r'pity[:\s]+([0-9ol]+)', text, re.IGNORECASE)
+        if pity_match:
+            is_legendary = pity_match.group(1)[0] in ('0', 'o', 'l') and len(pity_match.group(1)) <= 2
+    return has_fruit, is_legendary, {}
+
+
+def bench_ocr_matcher(args):
+    """Legacy substring matching vs the compiled fuzzy matcher: latency, accuracy and disagreements."""
+    from ocr_pipeline import match_fruit_and_legendary
+
+    corpus = _load_text_corpus(args.texts) if args.texts else make_text_corpus()
+    results = {"texts": len(corpus), "source": args.texts or "synthetic"}
+    counter = iter(range(10 ** 9))
+    for name, matcher in (("legacy", _legacy_match_fruit), ("compiled", match_fruit_and_legendary)):
+        rows = []
+        for label, text in corpus:
+            has_fruit, is_legendary, _details = matcher(text)
+            rows.append('legendary' if is_legendary else 'fruit' if has_fruit else 'none')
+        results[name] = {
+            "accuracy": round(sum(row == label for row, (label, _text) in zip(rows, corpus)) / len(corpus), 4),
+            "missed_fruit": sum(row == 'none' and label != 'none' for row, (label, _text) in zip(rows, corpus)),
+            "false_fruit": sum(row != 'none' and label == 'none' for row, (label, _text) in zip(rows, corpus)),
+            "latency": _percentiles(_time_calls(
+                lambda: matcher(corpus[next(counter) % len(corpus)][1]), args.iterations)),
+        }
+        results[name]["predictions"] = rows
+    legacy = results["legacy"].pop("predictions")
+    compiled = results["compiled"].pop("predictions")
+    results["disagreements"] = [
+        {"label": label, "text": text, "legacy": old, "compiled": new}
+        for (label, text), old, new in zip(corpus, legacy, compiled) if old != new
+    ][:25]
+    return results
+
+
+def bench_ocr_backends(args):
+    """EasyOCR (torch) vs the exported recognizer in ONNX Runtime: load cost, accuracy and latency."""
+    import cv2
+
+    from ocr_onnx import load_onnx_reader
+    from ocr_pipeline import match_fruit_and_legendary
+    from ocr_worker import load_reader, process_rss_mb
+
+    if not args.onnx_model:
+        raise SystemExit("This benchmark needs --onnx-model (see python src\\ocr_onnx.py export)")
+    samples = [(label, path, cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)) for label, path, img in load_corpus(args.corpus)]
+
+    backends = {}
+    rss = process_rss_mb()
+    onnx_reader, onnx_timings = load_onnx_reader(args.onnx_model, threads=args.threads)
+    backends["onnx"] = (onnx_reader, onnx_timings, _rss_delta(rss))
+    rss = process_rss_mb()
+    try:
+        easy_reader, easy_timings = load_reader()
+        backends["easyocr"] = (easy_reader, easy_timings, _rss_delta(rss))
+    except ImportError:
+        pass
+
+    # Recognizer-only comparison on the same boxes: lines learned from the
+    # first positive capture, as the fast path does in the app.
+    layout = TextLineLayout()
+    reference = backends.get("easyocr", backends["onnx"])[0]
+    for label, _path, img in samples:
+        if label != 'none' and layout.learn(reference.readtext(img, detail=1, paragraph=False), img.shape):
+            break
+
+    results = {"samples": len(samples), "onnx_model": os.path.basename(args.onnx_model), "threads": args.threads}
+    texts = {}
+    for name, (reader, timings, rss_mb) in backends.items():
+        readtext_ms, recognize_ms, rows = [], [], []
+        for label, path, img in samples:
+            start = time.perf_counter()
+            text = ' '.join(reader.readtext(img, detail=0, paragraph=True)).lower()
+            readtext_ms.append((time.perf_counter() - start) * 1000)
+            boxes = layout.boxes_for(img.shape)
+            if boxes:
+                gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+                start = time.perf_counter()
+                reader.recognize(gray, horizontal_list=boxes, free_list=[], detail=1, batch_size=len(boxes))
+                recognize_ms.append((time.perf_counter() - start) * 1000)
+            has_fruit, is_legendary, _details = match_fruit_and_legendary(text)
+            predicted = 'legendary' if is_legendary else 'fruit' if has_fruit else 'none'
+            rows.append({"path": path, "label": label, "predicted": predicted, "text": text})
+        texts[name] = [row["text"] for row in rows]
+        results[name] = {
+            "load": timings,
+            "rss_growth_mb": rss_mb,
+            "accuracy": round(sum(row["label"] == row["predicted"] for row in rows) / len(rows), 4),
+            "readtext": _percentiles(readtext_ms),
+            "recognize": _percentiles(recognize_ms) if recognize_ms else None,
+            "wrong": [row for row in rows if row["label"] != row["predicted"]],
+        }
+    if len(texts) == 2:
+        results["text_agreement"] = round(
+            sum(a == b for a, b in zip(texts["onnx"], texts["easyocr"])) / len(samples), 4)
+    return results
+
+
+def _rss_delta(before):
+    from ocr_worker import process_rss_mb
+
+    after = process_rss_mb()
+    return round(after - before, 1) if before is not None and after is not None else None
+
+
+class _CorpusMacro:
+    """The parts of MacroAPI that OcrPipeline uses, reading corpus images instead of the screen."""
+
+    def __init__(self, reader, args):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.reader = reader
+        self.profiler = StageProfiler(capacity=100000)
+        self.image = None
+        self.last_ocr_time = 0.0
+        self.last_ocr_text = ""
+        self.ocr_cooldown = 0.0
+        self.save_ocr_samples = False
+        self.ocr_gate_enabled = not args.no_gate
+        self.banner_gate = BannerGate()
+        self.ocr_fast_path_enabled = not args.no_fast_path
+        self.text_layout = TextLineLayout()
+        self.ocr_text_layout = None
+        self.ocr_race_variants = args.race
+        self.template_detector = TemplateDetector(args.templates or '')
+        self.template_detector_enabled = bool(args.templates)
+        if self.template_detector_enabled:
+            self.template_detector.load()
+            # Read-only: a benchmark must not add crops to the user's library
+            self.template_detector.harvest = lambda *a, **k: []
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+    def _ocr_ready(self):
+        return True
+
+    def save_settings(self):
+        pass
+
+    def capture_ocr_area(self):
+        return self.image.copy()
+
+    def _ocr_call(self, method, img, **kwargs):
+        started = time.perf_counter()
+        results = getattr(self.reader, method)(list(img) if method == 'readtext_batched' else img, **kwargs)
+        self.profiler.record(f'ocr.backend.{method}', time.perf_counter() - started)
+        return results
+
+    def _readtext(self, img, **kwargs):
+        return self._ocr_call('readtext', img, **kwargs)
+
+    def _ocr_submit(self, method, img, **kwargs):
+        return self._executor.submit(self._ocr_call, method, img, **kwargs)
+
+    def _ocr_cancel(self, future):
+        future.cancel()
+
+
+def _precision_recall(rows, predicted_key, label_values):
+    tp = sum(row[predicted_key] and row["label"] in label_values for row in rows)
+    fp = sum(row[predicted_key] and row["label"] not in label_values for row in rows)
+    fn = sum(not row[predicted_key] and row["label"] in label_values for row in rows)
+    return {
+        "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+    }
+
+
+def bench_ocr_pipeline(args):
+    """Run OCR pipeline profiles over a labeled corpus: precision/recall and per-stage latency."""
+    from ocr_pipeline import DEFAULT_PROFILES, OcrPipeline
+
+    samples = load_corpus(args.corpus)
+    if args.backend == "onnx":
+        from ocr_onnx import load_onnx_reader
+
+        if not args.onnx_model:
+            raise SystemExit("--backend onnx needs --onnx-model")
+        reader, load_timings = load_onnx_reader(args.onnx_model, threads=args.threads)
+    else:
+        from ocr_worker import load_reader
+
+        try:
+            reader, load_timings = load_reader()
+        except ImportError:
+            raise SystemExit("This benchmark needs easyocr installed (or --backend onnx)")
+
+    names = sorted(DEFAULT_PROFILES) if args.profile == "all" else [args.profile]
+    results = {
+        "backend": args.backend,
+        "load": load_timings,
+        "samples": {label: sum(1 for l, _p, _i in samples if l == label) for label in CORPUS_LABELS},
+        "stages": {"gate": not args.no_gate, "templates": bool(args.templates),
+                   "fast_path": not args.no_fast_path, "race": args.race},
+        "profiles": {},
+    }
+    for name in names:
+        macro = _CorpusMacro(reader, args)
+        # Captures come from the corpus, so there is nothing to wait for between attempts
+        pipeline = OcrPipeline(macro, {name: {'attempt_interval_s': 0.0}})
+        rows = []
+        for label, path, img in samples:
+            macro.image = img
+            scan = pipeline.run(name, img=img.copy(), started_at=0.0)
+            rows.append({
+                "path": path,
+                "label": label,
+                "has_fruit": scan.has_fruit,
+                "is_legendary": scan.is_legendary,
+                "decided_by": scan.decided_by,
+                "text": scan.text,
+                "total_ms": round(scan.timings.get('total', 0.0) * 1000, 3),
+            })
+        decided_by = {}
+        for row in rows:
+            decided_by[row["decided_by"]] = decided_by.get(row["decided_by"], 0) + 1
+        results["profiles"][name] = {
+            "fruit": _precision_recall(rows, "has_fruit", ('fruit', 'legendary')),
+            "legendary": _precision_recall(rows, "is_legendary", ('legendary',)),
+            "decided_by": decided_by,
+            "total": _percentiles([row["total_ms"] for row in rows]),
+            "stages": macro.profiler.summary(),
+            "race": pipeline.race_stats() if args.race else None,
+            "mismatches": [row for row in rows
+                       if row["has_fruit"] != (row["label"] != 'none')
+                       or row["is_legendary"] != (row["label"] == 'legendary')],
+        }
+    return results
+
+
+def _start_webhook_stub(rate_limit_every=5, retry_after=0.05, delay=0.0):
+    """Local HTTP server that answers like a Discord webhook: 204, and a 429 every rate_limit_every posts."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"posts": 0, "clients": set(), "received": []}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            with lock:
+                state["posts"] += 1
+                state["clients"].add(self.client_address)
+                limited = rate_limit_every and state["posts"] % rate_limit_every == 0
+                if not limited:
+                    state["received"].append((time.perf_counter(), len(body)))
+            if delay:
+                time.sleep(delay)
+            if limited:
+                data = json.dumps({"message": "You are being rate limited.", "retry_after": retry_after}).encode()
+                self.send_response(429)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            else:
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def bench_webhook_dispatch(args):
+    """Caller-side cost of queuing webhooks, and delivery through a local stub with 429s and latency."""
+    from webhook import WebhookDispatcher
+
+    server, state = _start_webhook_stub(delay=0.02)
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/webhooks/stub"
+    dispatcher = WebhookDispatcher(queue_size=args.iterations + 1, base_backoff=0.05)
+    payload = {"embeds": [{"title": "Bait Purchased", "description": "benchmark"}], "username": "haiku"}
+    count = min(args.iterations, 200)
+
+    started = time.perf_counter()
+    submit_ms = _time_calls(lambda: dispatcher.submit(url, payload, label="benchmark"), count)
+    while dispatcher.sent + dispatcher.failed < count and time.perf_counter() - started < 60:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    dispatcher.stop(timeout=1.0)
+    server.shutdown()
+    return {
+        "messages": count,
+        "submit": _percentiles(submit_ms),
+        "delivered_s": round(elapsed, 3),
+        "posts": state["posts"],
+        "connections": len(state["clients"]),
+        "dispatcher": dispatcher.stats(),
+    }
+
+
+def make_screenshot(width=768, height=576, seed=0):
+    """BGRA stand-in for the legendary fruit crop: sky gradient, shapes and sensor-like noise."""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    img[..., 0] = np.linspace(230, 120, height, dtype=np.uint8)[:, None]
+    img[..., 1] = np.linspace(180, 90, height, dtype=np.uint8)[:, None]
+    img[..., 2] = np.linspace(120, 60, height, dtype=np.uint8)[:, None]
+    img[..., 3] = 255
+    for _ in range(12):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3)) + (255,)
+        cv2.circle(img, center, int(rng.integers(10, height // 4)), color, -1)
+    noise = rng.integers(-12, 13, img.shape[:2] + (3,))
+    img[..., :3] = np.clip(img[..., :3].astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    return img
+
+
+def bench_screenshot_encode(args):
+    """Size and encode time of the legendary screenshot: the old full PNG vs budgeted JPEG/WebP."""
+    import cv2
+    from screenshot_encoder import ScreenshotEncoder, encode_image
+
+    if args.corpus:
+        samples = [img for _label, _path, img in load_corpus(args.corpus)]
+    else:
+        samples = [make_screenshot(seed=seed) for seed in range(4)]
+    count = min(args.iterations, 50)
+    counter = iter(range(10 ** 9))
+
+    def frame():
+        return samples[next(counter) % len(samples)]
+
+    def legacy_png():
+        return cv2.imencode('.png', cv2.cvtColor(frame(), cv2.COLOR_BGRA2BGR))[1].tobytes()
+
+    results = {"samples": len(samples), "frame_shape": list(samples[0].shape), "formats": {}}
+    results["legacy_png"] = dict(_percentiles(_time_calls(legacy_png, count)),
+                                 kb=round(np.mean([len(legacy_png()) for _ in samples]) / 1024, 1))
+    for fmt in ('png', 'jpeg', 'webp'):
+        encoded = [encode_image(frame(), fmt) for _ in samples]
+        results["formats"][fmt] = dict(
+            _percentiles(_time_calls(lambda: encode_image(frame(), fmt), count)),
+            kb=round(np.mean([len(e.data) for e in encoded]) / 1024, 1),
+            mime=encoded[0].mime, quality=encoded[0].quality, size=[encoded[0].width, encoded[0].height])
+
+    encoder = ScreenshotEncoder()
+    results["submit"] = _percentiles(_time_calls(lambda: encoder.submit(frame()), count))
+    encoder.stop()
+    return results
+
+
+BENCHMARKS = {
+    "banner-gate": bench_banner_gate,
+    "banner-templates": bench_banner_templates,
+    "frame-allocations": bench_frame_allocations,
+    "frame-analysis": bench_frame_analysis,
+    "ocr-backends": bench_ocr_backends,
+    "ocr-batching": bench_ocr_batching,
+    "ocr-fast-path": bench_ocr_fast_path,
+    "ocr-matcher": bench_ocr_matcher,
+    "ocr-pipeline": bench_ocr_pipeline,
+    "ocr-preprocess": bench_ocr_preprocess,
+    "profiler-overhead": bench_profiler_overhead,
+    "screenshot-encode": bench_screenshot_encode,
+    "webhook-dispatch": bench_webhook_dispatch,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Haiku Fishing hot path benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    parser.add_argument("--corpus", help="labeled screenshot folder for the OCR benchmarks")
+    parser.add_argument("--templates", help="ocr_templates folder for banner-templates")
+    parser.add_argument("--texts", help="label<TAB>text file for ocr-matcher (default: synthetic noisy banners)")
+    parser.add_argument("--onnx-model", help="exported recognizer .onnx for ocr-backends")
+    parser.add_argument("--threads", type=int, default=2, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--backend", choices=("easyocr", "onnx"), default="easyocr", help="OCR backend for ocr-pipeline")
+    parser.add_argument("--profile", default="all", help="OCR profile for ocr-pipeline: fruit, any_drop, legendary or all")
+    parser.add_argument("--no-gate", action="store_true", help="ocr-pipeline: skip the banner gate")
+    parser.add_argument("--no-fast-path", action="store_true", help="ocr-pipeline: always run full readtext")
+    parser.add_argument("--race", action="store_true", help="ocr-pipeline: race image variants")
+    args = parser.parse_args()
+
+    results = BENCHMARKS[args.benchmark](args)
+    print(json.dumps(results, indent=4))
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
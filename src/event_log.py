@@ -0,0 +1,187 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class EventLog:
+    """Structured event log that never blocks the caller.
+
+    Logging appends a tuple to two deques (append is atomic in CPython, so no
+    lock is taken on the hot path): a bounded in-memory ring that search()
+    reads, and a pending queue that a background thread drains into rotated
+    JSONL files. Console echo also happens on that thread.
+
+    Call sites pass a stable event name. With every=<seconds>, an event is
+    dropped if the same name was logged less than that long ago, and the
+    next accepted entry reports how many were suppressed.
+    """
+
+    def __init__(self, level=INFO, ring_size=5000, max_bytes=5 * 1024 * 1024, backups=5, flush_interval=0.5):
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.echo = not getattr(sys, 'frozen', False)
+        self.directory = None
+        self.ring = deque(maxlen=ring_size)
+        self._pending = deque(maxlen=ring_size)
+        self._last_emit = {}
+        self._suppressed = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._file = None
+        self._file_size = 0
+
+    def start(self, directory):
+        """Start the writer thread. Events logged before this are held (up to ring_size) until then."""
+        if self._thread is not None:
+            return
+        self.directory = str(directory)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except Exception:
+            self.directory = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._writer_loop, name="event-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flush pending events and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def log(self, level, event, message="", every=None, **fields):
+        if level < self.level:
+            return
+        now = time.time()
+        if every is not None:
+            last = self._last_emit.get(event)
+            if last is not None and now - last < every:
+                self._suppressed[event] = self._suppressed.get(event, 0) + 1
+                return
+            self._last_emit[event] = now
+            suppressed = self._suppressed.pop(event, 0)
+            if suppressed:
+                fields["suppressed"] = suppressed
+        entry = (now, level, event, message, fields)
+        self.ring.append(entry)
+        self._pending.append(entry)
+
+    def debug(self, event, message="", every=None, **fields):
+        self.log(DEBUG, event, message, every, **fields)
+
+    def info(self, event, message="", every=None, **fields):
+        self.log(INFO, event, message, every, **fields)
+
+    def warning(self, event, message="", every=None, **fields):
+        self.log(WARNING, event, message, every, **fields)
+
+    def error(self, event, message="", every=None, **fields):
+        self.log(ERROR, event, message, every, **fields)
+
+    def search(self, text=None, level=None, event=None, limit=200):
+        """Newest-first entries from the in-memory ring that match every given filter."""
+        min_level = LEVELS.get(level, DEBUG) if isinstance(level, str) else (level or DEBUG)
+        needle = text.lower() if text else None
+        results = []
+        for entry in reversed(list(self.ring)):
+            ts, entry_level, entry_event, message, fields = entry
+            if entry_level < min_level:
+                continue
+            if event and entry_event != event:
+                continue
+            if needle and needle not in message.lower() and needle not in entry_event:
+                continue
+            results.append(self._to_dict(entry))
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def _to_dict(entry):
+        ts, level, event, message, fields = entry
+        record = {
+            "ts": round(ts, 3),
+            "level": LEVEL_NAMES.get(level, str(level)),
+            "event": event,
+        }
+        if message:
+            record["msg"] = message
+        if fields:
+            record.update(fields)
+        return record
+
+    @staticmethod
+    def _echo(entry):
+        ts, level, event, message, fields = entry
+        extra = " ".join(f"{k}={v}" for k, v in fields.items())
+        try:
+            print(f"[{LEVEL_NAMES.get(level, level)}] {message or event}" + (f" ({extra})" if extra else ""))
+        except Exception:
+            pass
+
+    def _writer_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    def _drain(self):
+        lines = []
+        while self._pending:
+            entry = self._pending.popleft()
+            if self.echo:
+                self._echo(entry)
+            lines.append(json.dumps(self._to_dict(entry), default=str))
+        if not lines or self.directory is None:
+            return
+        try:
+            self._write("\n".join(lines) + "\n")
+        except Exception:
+            pass
+
+    def _path(self, index=0):
+        name = "events.jsonl" if index == 0 else f"events.{index}.jsonl"
+        return os.path.join(self.directory, name)
+
+    def _write(self, data):
+        if self._file is None:
+            self._file = open(self._path(), 'a', encoding='utf-8')
+            self._file_size = self._file.tell()
+        if self._file_size + len(data) > self.max_bytes and self._file_size > 0:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            src = self._path(index)
+            if os.path.exists(src):
+                os.replace(src, self._path(index + 1))
+        os.replace(self._path(), self._path(1))
+        self._file = open(self._path(), 'a', encoding='utf-8')
+        self._file_size = 0
+
+
+log = EventLog()
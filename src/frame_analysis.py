@@ -0,0 +1,317 @@
+import math
+import time
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Minigame colors as (R, G, B). mss frames are BGRA, so channel 2 is red.
+BAR_BLUE = (85, 170, 255)
+TARGET_WHITE = (255, 255, 255)
+TRACK_GRAY = (25, 25, 25)
+
+HAS_NUMBA = numba is not None
+
+
+def _color_mask(pixels, color):
+    return (
+        (pixels[..., 2] == color[0]) &
+        (pixels[..., 1] == color[1]) &
+        (pixels[..., 0] == color[2])
+    )
+
+
+def analyze_frame_numpy(img, gap_tolerance_multiplier):
+    """Reference NumPy implementation of the fishing() frame analysis.
+
+    Returns (found_blue, white_y, bar_y). white_y is the middle of the white
+    target zone and bar_y the middle of the biggest dark gray group, both in
+    image rows. They are None when the blue column has no gray track.
+    """
+    blue_mask = _color_mask(img, BAR_BLUE)
+    if not np.any(blue_mask):
+        return False, None, None
+
+    x_coords = np.where(blue_mask)[1]
+    middle_x = int(np.mean(x_coords))
+
+    column = img[:, middle_x, :]
+    gray_mask = _color_mask(column, TRACK_GRAY)
+    if not np.any(gray_mask):
+        return True, None, None
+
+    gray_y_coords = np.where(gray_mask)[0]
+    top_gray_y = gray_y_coords[0]
+    bottom_gray_y = gray_y_coords[-1]
+
+    final_slice = column[top_gray_y:bottom_gray_y + 1]
+    white_mask = _color_mask(final_slice, TARGET_WHITE)
+    dark_gray_y_coords = np.where(_color_mask(final_slice, TRACK_GRAY))[0]
+
+    if np.any(white_mask):
+        white_y_coords = np.where(white_mask)[0]
+        top_white_y = white_y_coords[0]
+        bottom_white_y = white_y_coords[-1]
+    else:
+        top_white_y = 0
+        bottom_white_y = max(5, len(final_slice) // 10)
+    white_height = bottom_white_y - top_white_y + 1
+
+    gap_tolerance = white_height * gap_tolerance_multiplier
+    groups = []
+    current_group = [dark_gray_y_coords[0]]
+    for i in range(1, len(dark_gray_y_coords)):
+        if dark_gray_y_coords[i] - dark_gray_y_coords[i - 1] <= gap_tolerance:
+            current_group.append(dark_gray_y_coords[i])
+        else:
+            groups.append(current_group)
+            current_group = [dark_gray_y_coords[i]]
+    groups.append(current_group)
+
+    biggest_group = max(groups, key=len)
+    biggest_group_middle = (biggest_group[0] + biggest_group[-1]) // 2
+
+    white_y = int(top_gray_y + (top_white_y + bottom_white_y) // 2)
+    bar_y = int(top_gray_y + biggest_group_middle)
+    return True, white_y, bar_y
+
+
+class FrameWorkspace:
+    """Preallocated buffers for analysing frames of one area_box size.
+
+    Every mask and index array the NumPy path needs is filled in place with
+    out= ufunc calls, so a steady-state tick allocates no frame-sized arrays
+    and no Python lists. Build a new workspace when the area size changes.
+    """
+
+    def __init__(self, height, width):
+        self.shape = (height, width)
+        self.mask = np.empty((height, width), dtype=bool)
+        self.scratch = np.empty((height, width), dtype=bool)
+        # Integer copy of the blue mask: summing a bool mask into intp counts goes through a
+        # ~64 KB cast buffer every tick, summing intp into intp does not.
+        self.mask_counts = np.empty((height, width), dtype=np.intp)
+        self.column_counts = np.empty(width, dtype=np.intp)
+        self.x_index = np.arange(width, dtype=np.intp)
+        self.y_index = np.arange(height, dtype=np.intp)
+        self.column_mask = np.empty(height, dtype=bool)
+        self.column_scratch = np.empty(height, dtype=bool)
+        self.positions = np.empty(height, dtype=np.intp)
+        self.gaps = np.empty(height, dtype=np.intp)
+        self.breaks = np.empty(height, dtype=bool)
+        self.group_starts = np.empty(height, dtype=np.intp)
+        self.group_ends = np.empty(height, dtype=np.intp)
+        self.group_lengths = np.empty(height, dtype=np.intp)
+
+    def matches(self, img):
+        return self.shape == img.shape[:2]
+
+    @staticmethod
+    def _color_mask(pixels, color, out, scratch):
+        np.equal(pixels[..., 2], color[0], out=out)
+        np.equal(pixels[..., 1], color[1], out=scratch)
+        np.logical_and(out, scratch, out=out)
+        np.equal(pixels[..., 0], color[2], out=scratch)
+        np.logical_and(out, scratch, out=out)
+        return out
+
+    def has_color(self, img, color):
+        return bool(self._color_mask(img, color, self.mask, self.scratch).any())
+
+    def bite_detected(self, img):
+        """True when the minigame's blue, white and dark gray are all on screen."""
+        return (
+            self.has_color(img, BAR_BLUE) and
+            self.has_color(img, TARGET_WHITE) and
+            self.has_color(img, TRACK_GRAY)
+        )
+
+    def analyze(self, img, gap_tolerance_multiplier, profiler=None):
+        """Same result as analyze_frame_numpy(), computed into the buffers.
+
+        With a profiler, records the fishing.color_match, fishing.localization
+        and fishing.grouping stages.
+        """
+        if profiler is not None:
+            start = time.perf_counter()
+        blue_mask = self._color_mask(img, BAR_BLUE, self.mask, self.scratch)
+        count = np.count_nonzero(blue_mask)
+        if profiler is not None:
+            matched = time.perf_counter()
+            profiler.record('fishing.color_match', matched - start)
+        if count == 0:
+            return False, None, None
+
+        np.copyto(self.mask_counts, blue_mask, casting='unsafe')
+        np.sum(self.mask_counts, axis=0, out=self.column_counts)
+        middle_x = int(np.vdot(self.column_counts, self.x_index)) // count
+
+        column = img[:, middle_x, :]
+        gray_mask = self._color_mask(column, TRACK_GRAY, self.column_mask, self.column_scratch)
+        gray_count = np.count_nonzero(gray_mask)
+        if gray_count == 0:
+            return True, None, None
+
+        positions = np.compress(gray_mask, self.y_index, out=self.positions[:gray_count])
+        top_gray_y = int(positions[0])
+        bottom_gray_y = int(positions[-1])
+        span = bottom_gray_y - top_gray_y + 1
+
+        white_mask = self._color_mask(
+            column[top_gray_y:bottom_gray_y + 1], TARGET_WHITE,
+            self.column_mask[:span], self.column_scratch[:span]
+        )
+        if white_mask.any():
+            top_white_y = int(np.argmax(white_mask))
+            bottom_white_y = span - 1 - int(np.argmax(white_mask[::-1]))
+        else:
+            top_white_y = 0
+            bottom_white_y = max(5, span // 10)
+        white_height = bottom_white_y - top_white_y + 1
+        if profiler is not None:
+            located = time.perf_counter()
+            profiler.record('fishing.localization', located - matched)
+
+        # Group the gray rows: a gap wider than the tolerance starts a new group.
+        # Gaps are whole rows, so comparing against the floored tolerance gives the same
+        # breaks without casting the gaps to float.
+        gap_tolerance = math.floor(white_height * gap_tolerance_multiplier)
+        gaps = np.subtract(positions[1:], positions[:-1], out=self.gaps[:gray_count - 1])
+        breaks = np.greater(gaps, gap_tolerance, out=self.breaks[:gray_count - 1])
+        break_count = np.count_nonzero(breaks)
+
+        starts = self.group_starts[:break_count + 1]
+        ends = self.group_ends[:break_count + 1]
+        starts[0] = 0
+        np.compress(breaks, self.y_index[:gray_count - 1], out=ends[:break_count])
+        np.add(ends[:break_count], 1, out=starts[1:])
+        ends[break_count] = gray_count - 1
+        lengths = np.subtract(ends, starts, out=self.group_lengths[:break_count + 1])
+        biggest = int(np.argmax(lengths))
+
+        white_y = top_gray_y + (top_white_y + bottom_white_y) // 2
+        bar_y = int(positions[starts[biggest]] + positions[ends[biggest]]) // 2
+        if profiler is not None:
+            profiler.record('fishing.grouping', time.perf_counter() - located)
+        return True, white_y, bar_y
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, nogil=True)
+    def _analyze_frame_kernel(img, gap_tolerance_multiplier):
+        height, width = img.shape[0], img.shape[1]
+
+        # Column location: mean x of every bar-blue pixel.
+        count = 0
+        x_sum = 0
+        for y in range(height):
+            for x in range(width):
+                if img[y, x, 2] == 85 and img[y, x, 1] == 170 and img[y, x, 0] == 255:
+                    count += 1
+                    x_sum += x
+        if count == 0:
+            return 0, -1, -1
+        middle_x = x_sum // count
+
+        # Extent search: gray track bounds and white zone bounds inside them.
+        # A white pixel only counts as the zone's bottom once a gray pixel
+        # below it proves it lies inside the track.
+        top_gray = -1
+        bottom_gray = -1
+        top_white = -1
+        bottom_white = -1
+        pending_white = -1
+        for y in range(height):
+            r = img[y, middle_x, 2]
+            g = img[y, middle_x, 1]
+            b = img[y, middle_x, 0]
+            if r == 25 and g == 25 and b == 25:
+                if top_gray < 0:
+                    top_gray = y
+                bottom_gray = y
+                if pending_white >= 0:
+                    bottom_white = pending_white
+            elif r == 255 and g == 255 and b == 255 and top_gray >= 0:
+                if top_white < 0:
+                    top_white = y
+                pending_white = y
+        if top_gray < 0:
+            return 1, -1, -1
+
+        if top_white >= 0 and bottom_white >= 0:
+            top_white_rel = top_white - top_gray
+            bottom_white_rel = bottom_white - top_gray
+        else:
+            top_white_rel = 0
+            bottom_white_rel = max(5, (bottom_gray - top_gray + 1) // 10)
+        white_height = bottom_white_rel - top_white_rel + 1
+        gap_tolerance = white_height * gap_tolerance_multiplier
+
+        # Run grouping: keep the largest run of gray rows whose gaps stay
+        # within tolerance. Ties keep the first group, as max() does.
+        best_len = 0
+        best_start = top_gray
+        best_end = top_gray
+        run_len = 0
+        run_start = top_gray
+        prev = -1
+        for y in range(top_gray, bottom_gray + 1):
+            if img[y, middle_x, 2] == 25 and img[y, middle_x, 1] == 25 and img[y, middle_x, 0] == 25:
+                if prev >= 0 and y - prev > gap_tolerance:
+                    if run_len > best_len:
+                        best_len = run_len
+                        best_start = run_start
+                        best_end = prev
+                    run_len = 0
+                    run_start = y
+                run_len += 1
+                prev = y
+        if run_len > best_len:
+            best_start = run_start
+            best_end = prev
+
+        white_y = top_gray + (top_white_rel + bottom_white_rel) // 2
+        bar_y = top_gray + (best_start - top_gray + best_end - top_gray) // 2
+        return 2, white_y, bar_y
+
+
+def analyze_frame(img, gap_tolerance_multiplier, workspace=None, profiler=None):
+    """Locate the white target zone and the fish bar in one minigame frame.
+
+    Uses the fused Numba kernel when numba is installed. Otherwise the NumPy
+    path runs, inside workspace's buffers when one is given. See
+    analyze_frame_numpy() for the result. The fused kernel can't be split
+    into stages, so it is profiled as a single fishing.analysis stage.
+    """
+    if not HAS_NUMBA:
+        if workspace is not None:
+            return workspace.analyze(img, gap_tolerance_multiplier, profiler)
+        return analyze_frame_numpy(img, gap_tolerance_multiplier)
+
+    if profiler is not None:
+        start = time.perf_counter()
+    status, white_y, bar_y = _analyze_frame_kernel(img, float(gap_tolerance_multiplier))
+    if profiler is not None:
+        profiler.record('fishing.analysis', time.perf_counter() - start)
+    if status == 0:
+        return False, None, None
+    if status == 1:
+        return True, None, None
+    return True, white_y, bar_y
+
+
+def warmup():
+    """Compile the kernel up front so the first catch doesn't pay for it."""
+    if not HAS_NUMBA:
+        return
+    img = np.zeros((8, 8, 4), dtype=np.uint8)
+    _analyze_frame_kernel(img, 2.0)
+
+
+def grab_frame(sct, monitor):
+    """Capture monitor as a BGRA array that views mss's buffer instead of copying it."""
+    shot = sct.grab(monitor)
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
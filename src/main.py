@@ -259,9 +259,16 @@ def _run_ocr_selftest_and_exit() -> None:
 if '--ocr-selftest' in sys.argv:
     _run_ocr_selftest_and_exit()
 
+# OCR worker child process (see ocr_worker.py): serve readtext requests, skip the UI.
+if '--ocr-worker' in sys.argv:
+    import ocr_worker
+    ocr_worker.serve()
+    raise SystemExit(0)
+
 import webview
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import pyautogui
 import keyboard
 import ctypes
@@ -272,6 +279,18 @@ import json
 from pathlib import Path
 import tkinter as tk
 from watchdog import WatchdogMonitor
+import frame_analysis
+from profiler import CycleAccounting, StageProfiler
+from event_log import log
+from ocr_cache import OcrCache
+from ocr_fastpath import TextLineLayout
+from ocr_pipeline import OcrPipeline
+from ocr_worker import process_rss_mb
+from ocr_templates import TemplateDetector
+from ocr_gate import BannerGate
+from screenshot_encoder import ScreenshotEncoder
+from settings_store import SettingsStore
+from webhook import WebhookDigest, WebhookDispatcher, WebhookSpool
 
 class StatsOverlay:
     def __init__(self, api):
@@ -619,6 +638,7 @@ class MacroAPI:
     
     def __init__(self):
         self.config_file = Path(_get_macro_settings_path())
+        log.start(self.config_file.parent / 'logs')
         
         self.running = False
         self.fish_count = 0
@@ -631,6 +651,13 @@ class MacroAPI:
         self.watchdog = WatchdogMonitor(self)
         
         self.ocr_available = False
+        self.ocr_status = "pending"
+        self.ocr_init_timings = {}
+        self.ocr_memory = {}
+        self.last_ocr_use = time.monotonic()
+        self._ocr_load_lock = threading.Lock()
+        self._ocr_reload_lock = threading.Lock()
+        self._ocr_reload = None
         self.init_errors = []
         self.state_start_time = time.time()
         self.current_state = "idle"
@@ -644,6 +671,7 @@ class MacroAPI:
         self.last_scan_time = time.time()
         self.is_holding_click = False
         self.last_input_resend_time = time.time()
+        self.frame_workspace = None
         self.setting_point = False
         self.setting_point_callback = None
         
@@ -759,6 +787,12 @@ class MacroAPI:
         self.webhook_notify_devil_fruit = True
         self.webhook_notify_purchase = True
         self.webhook_notify_recovery = True
+        self.webhook_spool_max_mb = 50  # undelivered webhooks kept on disk for replay
+        self.webhook_digest_enabled = False  # batch purchases, recoveries and throughput into one message
+        self.webhook_digest_interval_s = 600.0
+        self.screenshot_format = "jpeg"  # "jpeg", "webp" or "png"
+        self.screenshot_max_kb = 400
+        self.screenshot_max_width = 1280
         
         self.minimize_on_run = False
         self.stay_on_top = True
@@ -776,85 +810,111 @@ class MacroAPI:
         
         self.gap_tolerance_multiplier = 2.0
         
+        self.stage_profiler_enabled = True
+        
+        self.ocr_worker_enabled = True
+        self.ocr_timeout = 15.0
+        self.ocr_idle_unload_s = 1800.0
+        self.ocr_backend = "easyocr"  # "easyocr" or "onnx"
+        self.onnx_model_path = ""  # default: ocr_onnx/recognizer_int8.onnx, else recognizer.onnx
+        self.onnx_threads = 2
+        self.ocr_worker = None
+        self.reader = None
+        self.pipelined_ocr = True
+        self.ocr_race_variants = False  # read raw and contrast variants at the same time
+        self.ocr_gate_enabled = True
+        self.ocr_gate_min_score = 0.004
+        self.save_ocr_samples = False
+        self.ocr_cache_enabled = True
+        self.ocr_cache_ttl = 10.0
+        self.ocr_fast_path_enabled = True
+        self.ocr_text_layout = None
+        self.template_detector_enabled = True
+        self.ocr_pipeline_profiles = {}
+        self.ocr_executor = None
+        self.ocr_race_executor = None
+        self.pending_fruit_scan = None
+        
         self.area_selector_active = False
         self.area_selector = None
         
         self.consecutive_recast_failures = 0
         self.max_recast_failures = 5
+        self.recast_timed_out = False
+        self.macro_thread = None
         
         self.load_settings()
+        
+        self.profiler = StageProfiler(enabled=self.stage_profiler_enabled)
+        self.cycle_stats = CycleAccounting()
+        self.webhook_dispatcher = WebhookDispatcher(spool=WebhookSpool(
+            self.config_file.parent / 'webhook_spool', max_bytes=int(self.webhook_spool_max_mb * 1024 * 1024)))
+        self.settings_store = SettingsStore(self.config_file, self._settings_data)
+        self.webhook_digest = WebhookDigest(self.webhook_dispatcher, interval=self.webhook_digest_interval_s,
+                                            snapshot=self._throughput_snapshot)
+        if self.webhook_digest_enabled:
+            self.webhook_digest.start()
+        self.screenshot_encoder = ScreenshotEncoder(fmt=self.screenshot_format, max_bytes=int(self.screenshot_max_kb * 1024),
+                                                    max_width=self.screenshot_max_width)
+        self.banner_gate = BannerGate(min_score=self.ocr_gate_min_score)
+        self.ocr_cache = OcrCache(ttl=self.ocr_cache_ttl)
+        self.text_layout = TextLineLayout.from_dict(self.ocr_text_layout)
+        self.template_detector = TemplateDetector(self.config_file.parent / 'ocr_templates')
+        self.template_detector.load()
+        self.ocr_pipeline = OcrPipeline(self, self.ocr_pipeline_profiles)
     
     def deferred_init(self):
         """Run heavy initialization after the window is visible.
         Returns a dict of any errors encountered so the UI can show toasts."""
         errors = []
+
+        # Compile the frame analysis kernel before the first minigame
+        try:
+            frame_analysis.warmup()
+        except Exception as e:
+            print(f"Frame analysis warm-up failed, using NumPy path: {e}")
+            frame_analysis.HAS_NUMBA = False
+
+        # OCR loads and warms up in the background; the UI polls ocr_status
+        threading.Thread(target=self._initialize_ocr_background, name="ocr-init", daemon=True).start()
         
-        # Initialize OCR
+        self.init_errors = errors
+        return {"success": len(errors) == 0, "errors": errors}
+
+    def _initialize_ocr_background(self):
+        self.ocr_status = "loading"
+        started = time.perf_counter()
         try:
             self.initialize_ocr()
-            if not self.ocr_available:
-                errors.append('OCR failed to initialize — devil fruit detection disabled')
         except Exception as e:
-            errors.append(f'OCR error: {str(e)[:100]}')
+            log.error('ocr_init_error', "OCR initialization failed", error=str(e))
             self.ocr_available = False
             self.reader = None
-        
-        self.init_errors = errors
-        return {"success": len(errors) == 0, "errors": errors}
+        self.ocr_init_timings["total_s"] = round(time.perf_counter() - started, 3)
+        if self.ocr_available:
+            self.ocr_status = "ready"
+            self.last_ocr_use = time.monotonic()
+            log.info('ocr_ready', "OCR ready", **self.ocr_init_timings)
+            threading.Thread(target=self._ocr_idle_monitor, name="ocr-idle", daemon=True).start()
+        else:
+            self.ocr_status = "unavailable"
+            self.init_errors.append('OCR failed to initialize — devil fruit detection disabled')
 
     def initialize_ocr(self):
+        if self.ocr_backend == "onnx" and self._load_onnx_reader():
+            return
+        # The worker process imports torch itself; importing it here as well
+        # would keep ~1 GB of torch in the UI process for nothing.
+        if self.ocr_worker_enabled and self._start_ocr_worker():
+            return
         try:
-            # PyInstaller + torch on Windows can fail with WinError 1114 when loading
-            # c10.dll due to DLL search path / OpenMP runtime conflicts.
-            os.environ.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
-            os.environ.setdefault('OMP_NUM_THREADS', '1')
-
-            try:
-                # Prefer the extracted PyInstaller location if present; importing torch can
-                # fail before we can discover torch.__file__.
-                torch_lib_dir = None
-                if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-                    candidate = os.path.join(sys._MEIPASS, 'torch', 'lib')
-                    if os.path.isdir(candidate):
-                        torch_lib_dir = candidate
-
-                # onedir fallback: dist/<app>/_internal/torch/lib
-                if torch_lib_dir is None and getattr(sys, 'frozen', False):
-                    exe_dir = os.path.dirname(sys.executable)
-                    internal_candidate = os.path.join(exe_dir, '_internal', 'torch', 'lib')
-                    if os.path.isdir(internal_candidate):
-                        torch_lib_dir = internal_candidate
-
-                if torch_lib_dir is None:
-                    import torch
-                    torch_root = os.path.dirname(torch.__file__)
-                    candidate = os.path.join(torch_root, 'lib')
-                    if os.path.isdir(candidate):
-                        torch_lib_dir = candidate
-
-                if torch_lib_dir:
-                    _add_dll_search_dir(torch_lib_dir)
-
-                    # Preload Intel OpenMP runtime if present to reduce init failures.
-                    try:
-                        import ctypes
-                        libiomp = os.path.join(torch_lib_dir, 'libiomp5md.dll')
-                        if os.path.isfile(libiomp):
-                            ctypes.CDLL(libiomp)
-                    except Exception:
-                        pass
-            except Exception as e:
-                print(f"Torch pre-load failed (OCR may not work): {e}")
+            self._preload_torch()
 
-            import easyocr
+            from ocr_worker import load_reader
             
             print("Initializing EasyOCR...")
-            self.reader = easyocr.Reader(
-                ['en'], 
-                gpu=False,
-                verbose=False,
-                download_enabled=True
-            )
+            self.reader, timings = load_reader({'download_enabled': True})
+            self.ocr_init_timings.update(timings, mode="in_process")
             self.ocr_available = True
             print("EasyOCR ready - text recognition available!")
                 
@@ -868,280 +928,286 @@ class MacroAPI:
             self.ocr_available = False
             self.reader = None
     
-    def preprocess_image_for_ocr(self, img_array):
-        """Enhance image for better EasyOCR accuracy - lightweight approach"""
-        import cv2
-        
-        # Resize if too large (faster processing)
-        height, width = img_array.shape[:2]
-        max_width, max_height = 800, 600
-        if width > max_width or height > max_height:
-            scale_factor = min(max_width / width, max_height / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            img_array = cv2.resize(img_array, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
-        
-        # Convert BGR to RGB if needed
-        if len(img_array.shape) == 3:
-            img_array = cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB)
-        
-        # Convert to grayscale
-        if len(img_array.shape) == 3:
-            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        
-        # Light contrast adjustment
-        img_array = cv2.convertScaleAbs(img_array, alpha=1.2, beta=10)
-        
-        return img_array
-    
-    def detect_legendary_fruit_drop(self):
-        if not self.ocr_available or not self.reader:
+    def _preload_torch(self):
+        # PyInstaller + torch on Windows can fail with WinError 1114 when loading
+        # c10.dll due to DLL search path / OpenMP runtime conflicts.
+        os.environ.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
+        os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+        try:
+            # Prefer the extracted PyInstaller location if present; importing torch can
+            # fail before we can discover torch.__file__.
+            torch_lib_dir = None
+            if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+                candidate = os.path.join(sys._MEIPASS, 'torch', 'lib')
+                if os.path.isdir(candidate):
+                    torch_lib_dir = candidate
+
+            # onedir fallback: dist/<app>/_internal/torch/lib
+            if torch_lib_dir is None and getattr(sys, 'frozen', False):
+                exe_dir = os.path.dirname(sys.executable)
+                internal_candidate = os.path.join(exe_dir, '_internal', 'torch', 'lib')
+                if os.path.isdir(internal_candidate):
+                    torch_lib_dir = internal_candidate
+
+            if torch_lib_dir is None:
+                import torch
+                torch_root = os.path.dirname(torch.__file__)
+                candidate = os.path.join(torch_root, 'lib')
+                if os.path.isdir(candidate):
+                    torch_lib_dir = candidate
+
+            if torch_lib_dir:
+                _add_dll_search_dir(torch_lib_dir)
+
+                # Preload Intel OpenMP runtime if present to reduce init failures.
+                try:
+                    import ctypes
+                    libiomp = os.path.join(torch_lib_dir, 'libiomp5md.dll')
+                    if os.path.isfile(libiomp):
+                        ctypes.CDLL(libiomp)
+                except Exception:
+                    pass
+        except Exception as e:
+            print(f"Torch pre-load failed (OCR may not work): {e}")
+
+    def _start_ocr_worker(self):
+        """Load EasyOCR in a separate process. Returns False if it could not start."""
+        worker = None
+        try:
+            from ocr_worker import OcrWorker
+            worker = OcrWorker(reader_kwargs={'download_enabled': True}, request_timeout=self.ocr_timeout,
+                               concurrency=2 if self.ocr_race_variants else 1)
+            print("Starting EasyOCR worker process...")
+            info = worker.start().result(timeout=worker.start_timeout)
+        except Exception as e:
+            log.warning('ocr_worker_failed', "OCR worker failed to start, loading EasyOCR in-process", error=str(e))
+            if worker is not None:
+                worker.close()
             return False
-        
+        self.ocr_worker = worker
+        self.ocr_available = True
+        self.ocr_init_timings.update(info, mode="worker")
+        log.info('ocr_worker_ready', "EasyOCR worker ready", **info)
+        return True
+
+    def _onnx_model_path(self):
+        if self.onnx_model_path:
+            return self.onnx_model_path
+        folder = self.config_file.parent / 'ocr_onnx'
+        quantized = folder / 'recognizer_int8.onnx'
+        return str(quantized if quantized.exists() else folder / 'recognizer.onnx')
+
+    def _load_onnx_reader(self):
+        """Load the exported recognizer in ONNX Runtime. Returns False to fall back to EasyOCR."""
+        model_path = self._onnx_model_path()
         try:
-            import mss
-            import numpy as np
-            
-            with mss.mss() as sct:
-                drop_region = {
-                    'left': self.ocr_area_box['x1'],
-                    'top': self.ocr_area_box['y1'],
-                    'width': self.ocr_area_box['x2'] - self.ocr_area_box['x1'],
-                    'height': self.ocr_area_box['y2'] - self.ocr_area_box['y1']
-                }
-                
-                screenshot = sct.grab(drop_region)
-                img_array = np.array(screenshot)
-            
-            # Preprocess image for better OCR
-            processed_img = self.preprocess_image_for_ocr(img_array)
-                
-            # Use EasyOCR to extract text
-            results = self.reader.readtext(processed_img, detail=0, paragraph=True)
-            detected_text = ' '.join(results).lower() if results else ""
-            
-            if not detected_text:
-                return False
-            
-            print(f"📝 EasyOCR detected: {detected_text[:100]}")
-            
-            # Look for pity counter reset (0/X) which indicates legendary+ fruit
-            import re
-            
-            # Check for "pity: 0" or "pity 0" followed by slash/number (handles OCR errors)
-            # Matches: "pity: 0/40", "pity: 0o", "pity 0 /", "pity:0/", etc.
-            pity_zero_pattern = re.compile(r'pity[:\s]*0\s*[/o\s]*\d*', re.IGNORECASE)
-            if pity_zero_pattern.search(detected_text):
-                # Double check it's actually a reset (has "0" right after "pity")
-                if re.search(r'pity[:\s]*0', detected_text, re.IGNORECASE):
-                    print(f"LEGENDARY FRUIT DETECTED: Pity counter reset to 0!")
-                    return True
-            
-            if 'legendary' in detected_text and re.search(r'\b0\b', detected_text):
-                print(f"LEGENDARY FRUIT DETECTED: Found 'legendary' with '0'!")
-                return True
-            
+            from ocr_onnx import load_onnx_reader
+            print("Initializing ONNX Runtime OCR...")
+            self.reader, timings = load_onnx_reader(model_path, threads=self.onnx_threads)
+        except Exception as e:
+            log.warning('ocr_onnx_failed', "ONNX OCR backend failed to load, using EasyOCR", error=str(e), model=model_path)
+            self.reader = None
             return False
-            
+        self.ocr_init_timings.update(timings, mode="onnx", model=os.path.basename(model_path))
+        self.ocr_available = True
+        log.info('ocr_onnx_ready', "ONNX Runtime OCR ready", threads=self.onnx_threads, **timings)
+        return True
+
+    def _ocr_rss(self):
+        worker_pid = self.ocr_worker.pid if self.ocr_worker is not None else None
+        return {
+            "main_rss_mb": process_rss_mb(),
+            "worker_rss_mb": process_rss_mb(worker_pid) if worker_pid else None,
+        }
+
+    def _ocr_idle_monitor(self):
+        while True:
+            time.sleep(30)
+            if self.ocr_idle_unload_s <= 0 or self.ocr_status != "ready":
+                continue
+            if time.monotonic() - self.last_ocr_use > self.ocr_idle_unload_s:
+                # Refused while a scan is running; the next tick tries again.
+                self.unload_ocr(reason="idle")
+
+    def unload_ocr(self, reason="manual"):
+        """Release the EasyOCR model (and its worker process); the next scan reloads it."""
+        with self._ocr_load_lock:
+            if self.ocr_status != "ready":
+                return {"success": False, "message": f"OCR is {self.ocr_status}"}
+            # Holding active_lock keeps new scans waiting until the status says "unloaded",
+            # so they reload instead of finding the reader gone.
+            with self.ocr_pipeline.active_lock:
+                scan = self.pending_fruit_scan
+                if self.ocr_pipeline.active or (scan is not None and not scan.done()):
+                    log.info('ocr_unload_deferred', "OCR is busy with a scan, not unloading", reason=reason,
+                             active=self.ocr_pipeline.active)
+                    return {"success": False, "message": "OCR is busy with a scan, try again when it finishes"}
+                before = self._ocr_rss()
+                if self.ocr_worker is not None:
+                    self.ocr_worker.close()
+                    self.ocr_worker = None
+                self.reader = None
+                import gc
+                gc.collect()
+                self.ocr_status = "unloaded"
+            after = self._ocr_rss()
+            self.ocr_memory = {"unloaded_at": time.strftime('%Y-%m-%dT%H:%M:%S'), "reason": reason,
+                               "before": before, "after": after}
+        log.info('ocr_unloaded', "OCR model unloaded", reason=reason, **{
+            "main_rss_before_mb": before["main_rss_mb"], "main_rss_after_mb": after["main_rss_mb"],
+            "worker_rss_before_mb": before["worker_rss_mb"]})
+        return {"success": True, **self.ocr_memory}
+
+    def _reload_ocr(self):
+        with self._ocr_load_lock:
+            if self.ocr_status != "unloaded":
+                return self.ocr_status == "ready"
+            self.ocr_status = "loading"
+            log.info('ocr_reloading', "Reloading OCR model")
+            started = time.perf_counter()
+            self.initialize_ocr()
+            self.ocr_status = "ready" if self.ocr_available else "unavailable"
+            self.last_ocr_use = time.monotonic()
+            self.ocr_memory["reloaded"] = dict(self._ocr_rss(), reload_s=round(time.perf_counter() - started, 3))
+        log.info('ocr_reloaded', "OCR model reloaded", status=self.ocr_status, **self.ocr_memory["reloaded"])
+        return self.ocr_available
+
+    def _start_ocr_reload(self):
+        """Reload an idle-unloaded model on a background thread. Returns the reload Future, or None if none is needed."""
+        with self._ocr_reload_lock:
+            reload = self._ocr_reload
+            if reload is None or reload.done():
+                if self.ocr_status != "unloaded":
+                    return None
+                reload = self._ocr_reload = Future()
+                threading.Thread(target=self._run_ocr_reload, args=(reload,), name="ocr-reload", daemon=True).start()
+            return reload
+    
+    def _run_ocr_reload(self, reload):
+        try:
+            reload.set_result(self._reload_ocr())
         except Exception as e:
-            print(f"OCR detection error: {str(e)}")
+            log.error('ocr_reload_error', "OCR reload failed", error=str(e))
+            reload.set_result(False)
+    
+    def _ocr_ready(self, wait=True):
+        """True when OCR can run now. An unloaded model starts reloading; wait=False doesn't block on it."""
+        reload = self._start_ocr_reload()
+        if reload is not None:
+            if not wait:
+                return False
+            reload.result()
+        if not self.ocr_available:
             return False
-    
-    def detect_devil_fruit_and_legendary(self):
-        """Combined OCR scan - checks for devil fruit AND legendary status in one go"""
-        if not self.ocr_available or not self.reader:
-            return False, False
+        if self.ocr_worker is not None and self.ocr_worker.alive:
+            return True
+        return self.reader is not None
+
+    def _ocr_call(self, method, img, **kwargs):
+        """Run an easyocr.Reader method on the OCR worker when it is up, otherwise in-process.
         
-        current_time = time.time()
-        if current_time - self.last_ocr_time < self.ocr_cooldown:
-            return False, False
+        Results are cached by image hash, so re-reading the same banner is free.
+        readtext_batched takes a stack of same-sized frames (N, H, W[, C]).
+        """
+        batched = method == 'readtext_batched'
+        self.last_ocr_use = time.monotonic()
+        key = None
+        if self.ocr_cache_enabled and not batched:
+            key = self.ocr_cache.key(img, dict(kwargs, _method=method))
+            cached = self.ocr_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        started = time.perf_counter()
+        if self.ocr_worker is not None and self.ocr_worker.alive:
+            results = self.ocr_worker.call(method, img, timeout=self.ocr_timeout, **kwargs)
+        elif self.reader is not None:
+            results = getattr(self.reader, method)(list(img) if batched else img, **kwargs)
+        else:
+            raise RuntimeError("OCR worker is not running and no in-process reader is loaded")
+        self.profiler.record(f'ocr.backend.{method}', time.perf_counter() - started)
+        if key is not None:
+            self.ocr_cache.put(key, results)
+        return results
+
+    def _readtext(self, img, **kwargs):
+        return self._ocr_call('readtext', img, **kwargs)
+
+    def _ocr_submit(self, method, img, **kwargs):
+        """Like _ocr_call, but returns a Future so several reads can run at once."""
+        self.last_ocr_use = time.monotonic()
+        key = None
+        if self.ocr_cache_enabled:
+            key = self.ocr_cache.key(img, dict(kwargs, _method=method))
+            cached = self.ocr_cache.get(key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+        
+        started = time.perf_counter()
+        if self.ocr_worker is not None and self.ocr_worker.alive:
+            future = self.ocr_worker.submit(img, method, **kwargs)
+        elif self.reader is not None:
+            if self.ocr_race_executor is None:
+                self.ocr_race_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ocr-race")
+            future = self.ocr_race_executor.submit(getattr(self.reader, method), img, **kwargs)
+        else:
+            raise RuntimeError("OCR worker is not running and no in-process reader is loaded")
         
+        def done(f):
+            if f.cancelled() or f.exception() is not None:
+                return
+            self.profiler.record(f'ocr.backend.{method}', time.perf_counter() - started)
+            if key is not None:
+                self.ocr_cache.put(key, f.result())
+        future.add_done_callback(done)
+        return future
+
+    def _ocr_cancel(self, future):
+        if not future.cancel() and self.ocr_worker is not None:
+            self.ocr_worker.cancel(future)
+
+    def _save_ocr_sample(self, img_array):
         try:
-            import mss
-            import numpy as np
-            import re
             import cv2
-            
-            # Debug: Show scan region
-            user32 = ctypes.windll.user32
-            screen_width = user32.GetSystemMetrics(0)
-            screen_height = user32.GetSystemMetrics(1)
-            print(f"🔍 OCR Scan - Resolution: {screen_width}x{screen_height}, Area: ({self.ocr_area_box['x1']},{self.ocr_area_box['y1']}) to ({self.ocr_area_box['x2']},{self.ocr_area_box['y2']})")
-            
-            with mss.mss() as sct:
-                drop_region = {
-                    'left': self.ocr_area_box['x1'],
-                    'top': self.ocr_area_box['y1'],
-                    'width': self.ocr_area_box['x2'] - self.ocr_area_box['x1'],
-                    'height': self.ocr_area_box['y2'] - self.ocr_area_box['y1']
-                }
-                screenshot = sct.grab(drop_region)
-                img_array = np.array(screenshot)
-            
-            # Try OCR with minimal preprocessing first
-            # Convert BGRA to RGB
-            if img_array.shape[2] == 4:
-                img_rgb = cv2.cvtColor(img_array, cv2.COLOR_BGRA2RGB)
-            else:
-                img_rgb = cv2.cvtColor(img_array, cv2.COLOR_BGR2RGB)
-            
-            # Try OCR on original image first with aggressive settings
-            results = self.reader.readtext(
-                img_rgb, 
-                detail=0, 
-                paragraph=False, 
-                batch_size=1,
-                text_threshold=0.5,  # Lower threshold for text detection
-                low_text=0.3,        # Lower threshold for character detection
-                link_threshold=0.3   # More aggressive text linking
-            )
-            detected_text = ' '.join(results).lower() if results else ""
-            
-            # If no results, try with preprocessing
-            if not detected_text:
-                print("⚠️ Trying with preprocessing...")
-                processed_img = self.preprocess_image_for_ocr(img_array)
-                results = self.reader.readtext(
-                    processed_img, 
-                    detail=0, 
-                    paragraph=False, 
-                    batch_size=1,
-                    text_threshold=0.5,
-                    low_text=0.3,
-                    link_threshold=0.3
-                )
-                detected_text = ' '.join(results).lower() if results else ""
-            
-            if not detected_text:
-                print("❌ OCR detected NO TEXT in scan area")
-                self.last_ocr_time = current_time
-                return False, False
-            
-            print(f"📝 EasyOCR detected: {detected_text[:100]}")
-            
-            # Check for devil fruit keywords - OCR-tolerant matching
-            has_fruit = False
-            
-            # More flexible patterns to handle OCR errors
-            flexible_patterns = [
-                'drop',      # Always present
-                'backpac',   # "backpack" often becomes "backpacr"
-                'ruit',      # "fruit" often becomes "eruit" or "ruit"
-                'evil',      # "devil" often becomes "devl" or "evil"
-                'got',       # Usually readable
-                'fish',      # "fished" substring
-                'legendar',  # "legendary" substring
-                'pity'       # Always with devil fruit notification
-            ]
-            
-            # Count flexible pattern matches
-            pattern_matches = sum(1 for pattern in flexible_patterns if pattern in detected_text)
-            
-            # If we see 2+ patterns, it's likely a devil fruit notification
-            if pattern_matches >= 2:
-                has_fruit = True
-                print(f"✅ Devil fruit detected! (matched {pattern_matches} patterns)")
-            else:
-                print(f"⚠️ Not enough matches ({pattern_matches} patterns found)")
-            
-            # Check if legendary (pity counter at 0)
-            is_legendary = False
-            if has_fruit and 'pity' in detected_text:
-                pity_match = re.search(r'pity[:\s]+([0-9ol]+)', detected_text, re.IGNORECASE)
-                if pity_match:
-                    pity_number = pity_match.group(1)
-                    if pity_number[0] in ['0', 'o', 'l'] and len(pity_number) <= 2:
-                        is_legendary = True
-            
-            self.last_ocr_time = current_time
-            self.last_ocr_text = detected_text
-            
-            if has_fruit:
-                fruit_type = "LEGENDARY+" if is_legendary else "Common/Rare"
-                print(f"🍇 DEVIL FRUIT DETECTED! Type: {fruit_type}")
-            else:
-                print(f"⚠️ No devil fruit keywords in text: '{detected_text[:80]}'")
-            
-            return has_fruit, is_legendary
-            
+            folder = self.config_file.parent / 'ocr_samples' / 'unsorted'
+            folder.mkdir(parents=True, exist_ok=True)
+            name = time.strftime('%Y%m%d_%H%M%S') + f"_{int(time.time() * 1000) % 1000:03d}.png"
+            cv2.imwrite(str(folder / name), img_array)
         except Exception as e:
-            print(f"OCR detection error: {str(e)}")
-            return False, False
+            log.warning('ocr_sample_error', "Failed to save OCR sample", every=60.0, error=str(e))
+
+    def preprocess_image_for_ocr(self, img_array):
+        """Enhance image for better EasyOCR accuracy - lightweight approach"""
+        return self.ocr_pipeline.preprocessor.prepare('contrast', img_array, reuse=False)
+    
+    def capture_ocr_area(self):
+        with mss.mss() as sct:
+            drop_region = {
+                'left': self.ocr_area_box['x1'],
+                'top': self.ocr_area_box['y1'],
+                'width': self.ocr_area_box['x2'] - self.ocr_area_box['x1'],
+                'height': self.ocr_area_box['y2'] - self.ocr_area_box['y1']
+            }
+            return np.array(sct.grab(drop_region))
+    
+    def detect_legendary_fruit_drop(self):
+        return self.ocr_pipeline.run('legendary').is_legendary
+    
+    def detect_devil_fruit_and_legendary(self):
+        """Combined OCR scan - checks for devil fruit AND legendary status in one go"""
+        result = self.ocr_pipeline.run('fruit')
+        return result.has_fruit, result.is_legendary
+    
+    def scan_devil_fruit_image(self, img_array, current_time):
+        """OCR an already captured notification area. Safe to call off the macro thread."""
+        result = self.ocr_pipeline.run('fruit', img=img_array, started_at=current_time)
+        return result.has_fruit, result.is_legendary
     
     def detect_any_devil_fruit_drop(self):
-        if not self.ocr_available or not self.reader:
-            return False
-        
-        # don't OCR too frequently
-        current_time = time.time()
-        if current_time - self.last_ocr_time < self.ocr_cooldown:
-            return False
-        
-        try:
-            import mss
-            import numpy as np
-            
-            # Try 3 times with delays to catch the message
-            for attempt in range(3):
-                with mss.mss() as sct:
-                    drop_region = {
-                        'left': self.ocr_area_box['x1'],
-                        'top': self.ocr_area_box['y1'],
-                        'width': self.ocr_area_box['x2'] - self.ocr_area_box['x1'],
-                        'height': self.ocr_area_box['y2'] - self.ocr_area_box['y1']
-                    }
-                    
-                    screenshot = sct.grab(drop_region)
-                    img_array = np.array(screenshot)
-                
-                # Preprocess image for better OCR
-                processed_img = self.preprocess_image_for_ocr(img_array)
-                    
-                # Use EasyOCR to extract text
-                results = self.reader.readtext(processed_img, detail=0, paragraph=True)
-                detected_text = ' '.join(results).lower() if results else ""
-                
-                if not detected_text:
-                    if attempt < 2:
-                        time.sleep(0.5)  # Longer delay between attempts
-                        continue
-                    break
-                
-                devil_fruit_keywords = ['devil', 'fruit', 'backpack', 'drop', 'got', 'fished']
-                devil_fruit_phrases = [
-                    'devil fruit',
-                    'fished up a devil',
-                    'got a devil fruit',
-                    'devil fruit drop',
-                    'check your backpack'
-                ]
-                
-                for phrase in devil_fruit_phrases:
-                    if phrase in detected_text:
-                        print(f"🍇 Devil fruit detected: '{phrase}' found!")
-                        self.last_ocr_time = current_time  # Update cooldown
-                        self.last_ocr_text = detected_text
-                        return True
-                
-                keyword_matches = sum(1 for keyword in devil_fruit_keywords if keyword in detected_text)
-                if keyword_matches >= 2:
-                    print(f"🍇 Devil fruit detected: {keyword_matches} keyword matches!")
-                    print(f"   Text: {detected_text[:100]}")
-                    self.last_ocr_time = current_time  # Update cooldown
-                    self.last_ocr_text = detected_text
-                    return True
-                
-                # If no match on this attempt, wait and try again
-                if attempt < 2:
-                    time.sleep(0.5)
-            
-            # Update cooldown even on failure to prevent spam
-            self.last_ocr_time = current_time
-            return False
-            
-        except Exception as e:
-            print(f"OCR detection error: {str(e)}")
-            return False
+        return self.ocr_pipeline.run('any_drop').has_fruit
     
     def load_settings(self):
         if self.config_file.exists():
@@ -1174,89 +1240,119 @@ class MacroAPI:
                 print(f"Error loading settings: {e}")
     
     def save_settings(self):
+        """Queue a write of macro_settings.json; the settings store coalesces bursts of changes."""
+        self.settings_store.mark_dirty()
+    
+    def flush_settings(self):
+        return {"success": self.settings_store.flush(), "stats": self.settings_store.stats()}
+    
+    def _settings_data(self):
         try:
-            try:
-                self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            except Exception:
-                pass
-
-            data = {
-                "water_point": self.water_point,
-                "area_box": self.area_box,
-                "ocr_area_box_percentages": self.ocr_area_box_percentages,
-                "left_point": self.left_point,
-                "middle_point": self.middle_point,
-                "right_point": self.right_point,
-                "bait_point": self.bait_point,
-                "craft_point_1": self.craft_point_1,
-                "craft_point_2": self.craft_point_2,
-                "craft_point_3": self.craft_point_3,
-                "craft_point_4": self.craft_point_4,
-                "leg_bait_point": self.leg_bait_point,
-                "rare_bait_point": self.rare_bait_point,
-                "hotkeys": self.hotkeys,
-                "rod_hotkey": self.rod_hotkey,
-                "anything_else_hotkey": self.anything_else_hotkey,
-                "kp": self.kp,
-                "kd": self.kd,
-                "pd_clamp": self.pd_clamp,
-                "cast_hold_duration": self.cast_hold_duration,
-                "recast_timeout": self.recast_timeout,
-                "fish_end_delay": self.fish_end_delay,
-                "auto_buy_common_bait": self.auto_buy_common_bait,
-                "auto_select_top_bait": self.auto_select_top_bait,
-                "auto_store_devil_fruit": self.auto_store_devil_fruit,
-                "auto_craft_bait": self.auto_craft_bait,
-                "craft_leg_bait": self.craft_leg_bait,
-                "craft_rare_bait": self.craft_rare_bait,
-                "craft_nav_key_1": self.craft_nav_key_1,
-                "craft_nav_duration_1": self.craft_nav_duration_1,
-                "craft_nav_key_2": self.craft_nav_key_2,
-                "craft_nav_duration_2": self.craft_nav_duration_2,
-                "craft_nav_wait_delay": self.craft_nav_wait_delay,
-                "craft_t_press_delay": self.craft_t_press_delay,
-                "craft_click_delay": self.craft_click_delay,
-                "craft_button_delay": self.craft_button_delay,
-                "craft_craft_button_delay": self.craft_craft_button_delay,
-                "craft_sequence_delay": self.craft_sequence_delay,
-                "craft_exit_delay": self.craft_exit_delay,
-                "loops_per_purchase": self.loops_per_purchase,
-                "store_fruit_point": self.store_fruit_point,
-                "devil_fruit_hotkey": self.devil_fruit_hotkey,
-                "store_fruit_hotkey_delay": self.store_fruit_hotkey_delay,
-                "store_fruit_click_delay": self.store_fruit_click_delay,
-                "store_fruit_shift_delay": self.store_fruit_shift_delay,
-                "store_fruit_backspace_delay": self.store_fruit_backspace_delay,
-                "webhook_enabled": self.webhook_enabled,
-                "webhook_url": self.webhook_url,
-                "discord_user_id": self.discord_user_id,
-                "webhook_notify_devil_fruit": self.webhook_notify_devil_fruit,
-                "webhook_notify_purchase": self.webhook_notify_purchase,
-                "webhook_notify_recovery": self.webhook_notify_recovery,
-                "pre_cast_e_delay": self.pre_cast_e_delay,
-                "pre_cast_click_delay": self.pre_cast_click_delay,
-                "pre_cast_type_delay": self.pre_cast_type_delay,
-                "pre_cast_anti_detect_delay": self.pre_cast_anti_detect_delay,
-                "auto_select_bait_delay": self.auto_select_bait_delay,
-                "rod_select_delay": self.rod_select_delay,
-                "cursor_anti_detect_delay": self.cursor_anti_detect_delay,
-                "scan_loop_delay": self.scan_loop_delay,
-                "pd_approaching_damping": self.pd_approaching_damping,
-                "pd_chasing_damping": self.pd_chasing_damping,
-                "gap_tolerance_multiplier": self.gap_tolerance_multiplier,
-                "minimize_on_run": self.minimize_on_run,
-                "stay_on_top": self.stay_on_top
-            }
-            with open(self.config_file, 'w') as f:
-                json.dump(data, f, indent=4)
-            print("Settings saved successfully")
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            pass
+        return {
+            "water_point": self.water_point,
+            "area_box": self.area_box,
+            "ocr_area_box_percentages": self.ocr_area_box_percentages,
+            "left_point": self.left_point,
+            "middle_point": self.middle_point,
+            "right_point": self.right_point,
+            "bait_point": self.bait_point,
+            "craft_point_1": self.craft_point_1,
+            "craft_point_2": self.craft_point_2,
+            "craft_point_3": self.craft_point_3,
+            "craft_point_4": self.craft_point_4,
+            "leg_bait_point": self.leg_bait_point,
+            "rare_bait_point": self.rare_bait_point,
+            "hotkeys": self.hotkeys,
+            "rod_hotkey": self.rod_hotkey,
+            "anything_else_hotkey": self.anything_else_hotkey,
+            "kp": self.kp,
+            "kd": self.kd,
+            "pd_clamp": self.pd_clamp,
+            "cast_hold_duration": self.cast_hold_duration,
+            "recast_timeout": self.recast_timeout,
+            "fish_end_delay": self.fish_end_delay,
+            "auto_buy_common_bait": self.auto_buy_common_bait,
+            "auto_select_top_bait": self.auto_select_top_bait,
+            "auto_store_devil_fruit": self.auto_store_devil_fruit,
+            "auto_craft_bait": self.auto_craft_bait,
+            "craft_leg_bait": self.craft_leg_bait,
+            "craft_rare_bait": self.craft_rare_bait,
+            "craft_nav_key_1": self.craft_nav_key_1,
+            "craft_nav_duration_1": self.craft_nav_duration_1,
+            "craft_nav_key_2": self.craft_nav_key_2,
+            "craft_nav_duration_2": self.craft_nav_duration_2,
+            "craft_nav_wait_delay": self.craft_nav_wait_delay,
+            "craft_t_press_delay": self.craft_t_press_delay,
+            "craft_click_delay": self.craft_click_delay,
+            "craft_button_delay": self.craft_button_delay,
+            "craft_craft_button_delay": self.craft_craft_button_delay,
+            "craft_sequence_delay": self.craft_sequence_delay,
+            "craft_exit_delay": self.craft_exit_delay,
+            "loops_per_purchase": self.loops_per_purchase,
+            "store_fruit_point": self.store_fruit_point,
+            "devil_fruit_hotkey": self.devil_fruit_hotkey,
+            "store_fruit_hotkey_delay": self.store_fruit_hotkey_delay,
+            "store_fruit_click_delay": self.store_fruit_click_delay,
+            "store_fruit_shift_delay": self.store_fruit_shift_delay,
+            "store_fruit_backspace_delay": self.store_fruit_backspace_delay,
+            "webhook_enabled": self.webhook_enabled,
+            "webhook_url": self.webhook_url,
+            "discord_user_id": self.discord_user_id,
+            "webhook_notify_devil_fruit": self.webhook_notify_devil_fruit,
+            "webhook_notify_purchase": self.webhook_notify_purchase,
+            "webhook_notify_recovery": self.webhook_notify_recovery,
+            "webhook_spool_max_mb": self.webhook_spool_max_mb,
+            "webhook_digest_enabled": self.webhook_digest_enabled,
+            "webhook_digest_interval_s": self.webhook_digest_interval_s,
+            "screenshot_format": self.screenshot_format,
+            "screenshot_max_kb": self.screenshot_max_kb,
+            "screenshot_max_width": self.screenshot_max_width,
+            "pre_cast_e_delay": self.pre_cast_e_delay,
+            "pre_cast_click_delay": self.pre_cast_click_delay,
+            "pre_cast_type_delay": self.pre_cast_type_delay,
+            "pre_cast_anti_detect_delay": self.pre_cast_anti_detect_delay,
+            "auto_select_bait_delay": self.auto_select_bait_delay,
+            "rod_select_delay": self.rod_select_delay,
+            "cursor_anti_detect_delay": self.cursor_anti_detect_delay,
+            "scan_loop_delay": self.scan_loop_delay,
+            "pd_approaching_damping": self.pd_approaching_damping,
+            "pd_chasing_damping": self.pd_chasing_damping,
+            "gap_tolerance_multiplier": self.gap_tolerance_multiplier,
+            "minimize_on_run": self.minimize_on_run,
+            "stay_on_top": self.stay_on_top,
+            "stage_profiler_enabled": self.stage_profiler_enabled,
+            "ocr_worker_enabled": self.ocr_worker_enabled,
+            "ocr_timeout": self.ocr_timeout,
+            "ocr_idle_unload_s": self.ocr_idle_unload_s,
+            "ocr_backend": self.ocr_backend,
+            "onnx_model_path": self.onnx_model_path,
+            "onnx_threads": self.onnx_threads,
+            "pipelined_ocr": self.pipelined_ocr,
+            "ocr_race_variants": self.ocr_race_variants,
+            "ocr_gate_enabled": self.ocr_gate_enabled,
+            "ocr_gate_min_score": self.ocr_gate_min_score,
+            "save_ocr_samples": self.save_ocr_samples,
+            "ocr_cache_enabled": self.ocr_cache_enabled,
+            "ocr_cache_ttl": self.ocr_cache_ttl,
+            "ocr_fast_path_enabled": self.ocr_fast_path_enabled,
+            "ocr_text_layout": self.ocr_text_layout,
+            "template_detector_enabled": self.template_detector_enabled,
+            "ocr_pipeline_profiles": self.ocr_pipeline_profiles
+        }
         
     def start_macro(self):
         if self.running:
             return {"status": "already_running"}
         
+        # The previous loop may still be settling its last fruit scan; a
+        # second loop would send input alongside it.
+        if self.macro_thread is not None and self.macro_thread.is_alive():
+            log.info('macro_start_deferred', "Previous run is still stopping, start ignored")
+            return {"status": "stopping", "message": "Previous run is still stopping, try again in a moment"}
+        
         if not self.water_point or self.water_point.get("x") is None:
             return {"status": "error", "message": "Please set water point first (Controls tab)"}
         
@@ -1291,7 +1387,8 @@ class MacroAPI:
             print(f"Failed to show stats overlay: {e}")
             print(traceback.format_exc())
         
-        threading.Thread(target=self._macro_loop, daemon=True).start()
+        self.macro_thread = threading.Thread(target=self._macro_loop, daemon=True)
+        self.macro_thread.start()
         
         return {"status": "started", "message": "Macro started!"}
     
@@ -1337,18 +1434,44 @@ class MacroAPI:
             keyboard.unhook_all()
         except:
             pass
+        
+        self.settings_store.stop()
+        self.screenshot_encoder.stop()
+        self.webhook_digest.stop()
+        self.webhook_dispatcher.stop(timeout=5.0)
+        
+        if self.ocr_executor is not None:
+            self.ocr_executor.shutdown(wait=False)
+        if self.ocr_race_executor is not None:
+            self.ocr_race_executor.shutdown(wait=False, cancel_futures=True)
+        
+        if self.ocr_worker is not None:
+            try:
+                self.ocr_worker.close()
+            except Exception as e:
+                print(f"Failed to stop OCR worker: {e}")
+        
+        log.stop()
     
     def _macro_loop(self):
-        print("Macro loop started...")
+        log.info('macro_loop_started', "Macro loop started")
         while self.running:
             try:
                 self.watchdog.update_heartbeat()
                 
+                # Safe point: store a fruit found by the previous cycle's scan
+                self.resolve_fruit_scan(wait=False)
+                if not self.running:
+                    break
+                
                 self.current_state = "pre_cast"
                 self.state_start_time = time.time()
+                phase_start = time.perf_counter()
                 if not self.pre_cast():
                     break
+                self.cycle_stats.add('pre_cast', time.perf_counter() - phase_start)
                 
+                # waiting() splits its own time into rod_select, cast and bite_wait
                 self.current_state = "waiting"
                 self.state_start_time = time.time()
                 if not self.waiting():
@@ -1356,38 +1479,124 @@ class MacroAPI:
                 
                 self.current_state = "fishing"
                 self.state_start_time = time.time()
+                phase_start = time.perf_counter()
                 if not self.fishing():
                     break
+                self.cycle_stats.add('minigame', time.perf_counter() - phase_start)
                 
                 self.fish_count += 1
                 self.bait_purchase_loop_counter += 1
-                print(f"Fish caught! Total: {self.fish_count}")
+                log.info('fish_caught', "Fish caught", total=self.fish_count)
                 
                 self.watchdog.reset_recovery_count()
                 
                 if self.auto_store_devil_fruit and self.ocr_available:
+                    phase_start = time.perf_counter()
                     time.sleep(0.1)  # Wait for notification to appear
                     
-                    # Single OCR scan - checks both fruit and legendary status
-                    has_fruit, is_legendary = self.detect_devil_fruit_and_legendary()
-                    
-                    if has_fruit:
-                        print("Devil fruit detected! Starting storage sequence...")
-                        self.fruit_count += 1
+                    if self.pipelined_ocr:
+                        self.cycle_stats.add('ocr', time.perf_counter() - phase_start)
+                        # Capture now, OCR while the next cast and bite wait run
+                        self.queue_fruit_scan()
+                    else:
+                        # Single OCR scan - checks both fruit and legendary status
+                        has_fruit, is_legendary = self.detect_devil_fruit_and_legendary()
+                        self.cycle_stats.add('ocr', time.perf_counter() - phase_start)
                         
-                        if is_legendary:
-                            print("LEGENDARY FRUIT confirmed! Capturing screenshot...")
-                            self.store_devil_fruit(capture_legendary=True)
-                            if self.webhook_enabled and self.webhook_url:
-                                self.send_devil_fruit_webhook()
-                        else:
-                            self.store_devil_fruit(capture_legendary=False)
+                        if has_fruit:
+                            self.handle_devil_fruit(is_legendary)
                 
+                phase_start = time.perf_counter()
                 time.sleep(self.fish_end_delay)
+                self.cycle_stats.add('end_delay', time.perf_counter() - phase_start)
+                if self.recast_timed_out:
+                    self.cycle_stats.abort_cycle('recast_timeout')
+                else:
+                    self.cycle_stats.end_cycle()
                 
             except Exception as e:
-                print(f"Error in macro loop: {e}")
+                log.error('macro_loop_error', "Error in macro loop", every=5.0, error=str(e))
+                self.cycle_stats.abort_cycle('error')
                 time.sleep(1)
+        
+        # A scan still running when the loop stopped may have found a fruit
+        self.resolve_fruit_scan(wait=True, stopped=True)
+        self.cycle_stats.abort_cycle('stopped')
+    
+    def handle_devil_fruit(self, is_legendary):
+        phase_start = time.perf_counter()
+        log.info('fruit_storage_started', "Devil fruit detected, starting storage sequence")
+        self.fruit_count += 1
+        
+        if is_legendary:
+            log.info('legendary_confirmed', "Legendary fruit confirmed, capturing screenshot")
+            self.store_devil_fruit(capture_legendary=True)
+            if self.webhook_enabled and self.webhook_url:
+                self.send_devil_fruit_webhook()
+        else:
+            self.store_devil_fruit(capture_legendary=False)
+        self.cycle_stats.add('fruit_storage', time.perf_counter() - phase_start)
+    
+    def queue_fruit_scan(self):
+        """Capture the notification area and OCR it on the scan thread.
+        
+        A scan still pending from the previous catch is resolved first, after
+        the capture so the new notification isn't missed while storing.
+        """
+        # After an idle unload the model reloads in the background and the
+        # scan thread waits for it, so the banner is captured right away.
+        reloading = self._start_ocr_reload() is not None
+        if not reloading and not self._ocr_ready():
+            return
+        current_time = time.time()
+        if current_time - self.last_ocr_time < self.ocr_cooldown:
+            return
+        capture_start = time.perf_counter()
+        try:
+            img_array = self.capture_ocr_area()
+        except Exception as e:
+            log.error('ocr_error', "OCR capture error", error=str(e))
+            return
+        finally:
+            self.cycle_stats.add('ocr', time.perf_counter() - capture_start)
+        
+        self.resolve_fruit_scan(wait=True)
+        
+        if self.ocr_executor is None:
+            self.ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-scan")
+        self.pending_fruit_scan = self.ocr_executor.submit(self.scan_devil_fruit_image, img_array, current_time)
+    
+    def resolve_fruit_scan(self, wait, stopped=False):
+        """Act on the pending pipelined scan if it has finished (or wait for it).
+        
+        stopped: the loop has exited, so a fruit is only counted and alerted, never stored.
+        """
+        future = self.pending_fruit_scan
+        if future is None or (not wait and not future.done()):
+            return
+        self.pending_fruit_scan = None
+        
+        phase_start = time.perf_counter()
+        try:
+            has_fruit, is_legendary = future.result(timeout=self.ocr_timeout)
+        except Exception as e:
+            log.error('ocr_error', "Pipelined OCR scan failed", error=str(e))
+            return
+        finally:
+            self.cycle_stats.add('ocr', time.perf_counter() - phase_start)
+        
+        if not has_fruit:
+            return
+        if self.running and not stopped:
+            self.handle_devil_fruit(is_legendary)
+            return
+        # Stopped before the scan finished: the storage sequence would send
+        # input after Stop, so only count the fruit and still send the alert.
+        log.info('fruit_detected_after_stop', "Devil fruit detected after stop, not storing it", legendary=is_legendary)
+        self.fruit_count += 1
+        if is_legendary and self.webhook_enabled and self.webhook_url:
+            self.legendary_fruit_screenshot = None  # no camera turn, so no screenshot of this fruit
+            self.send_devil_fruit_webhook()
     
     def pre_cast(self):
         if not self.running:
@@ -1395,7 +1604,7 @@ class MacroAPI:
         
         if self.auto_buy_common_bait:
             if self.bait_purchase_loop_counter >= self.loops_per_purchase:
-                print(f"Auto buying bait (loop {self.bait_purchase_loop_counter})...")
+                log.info('bait_purchase_started', "Auto buying bait", loop=self.bait_purchase_loop_counter)
                 self.bait_purchase_loop_counter = 0
                 
                 keyboard.press_and_release('e')
@@ -1453,12 +1662,12 @@ class MacroAPI:
                 if not self.running:
                     return False
                 
-                print("Bait purchase complete")
+                log.info('bait_purchase_complete', "Bait purchase complete")
                 self.send_purchase_webhook(self.loops_per_purchase)
                 
                 # Auto craft baits after purchase
                 if self.auto_craft_bait:
-                    print("Auto crafting bait after purchase...")
+                    log.info('craft_after_purchase', "Auto crafting bait after purchase")
                     if not self.craft_bait():
                         return False
         
@@ -1482,26 +1691,27 @@ class MacroAPI:
         # Check if all craft points are set
         if not all([self.craft_point_1, self.craft_point_2, self.craft_point_3, 
                     self.craft_point_4]):
-            print("⚠️ All craft points must be set to use auto craft bait")
+            log.warning('craft_points_missing', "All craft points must be set to use auto craft bait")
             return False
         
         # Check if at least one bait type is selected and has point set
         leg_bait_ready = self.craft_leg_bait and self.leg_bait_point
         rare_bait_ready = self.craft_rare_bait and self.rare_bait_point
         
-        print(f"Debug - craft_leg_bait: {self.craft_leg_bait}, leg_bait_point: {self.leg_bait_point is not None}")
-        print(f"Debug - craft_rare_bait: {self.craft_rare_bait}, rare_bait_point: {self.rare_bait_point is not None}")
+        log.debug('craft_config', "Craft bait configuration",
+                  craft_leg_bait=self.craft_leg_bait, leg_bait_point_set=self.leg_bait_point is not None,
+                  craft_rare_bait=self.craft_rare_bait, rare_bait_point_set=self.rare_bait_point is not None)
         
         if not leg_bait_ready and not rare_bait_ready:
-            print("⚠️ Select at least one bait type and set its point")
+            log.warning('craft_bait_unselected', "Select at least one bait type and set its point")
             return False
         
         # Check if left and middle points are set (needed for navigation)
         if not self.left_point or not self.middle_point:
-            print("⚠️ Left and Middle points must be set in Auto Buy Common Bait")
+            log.warning('craft_nav_points_missing', "Left and Middle points must be set in Auto Buy Common Bait")
             return False
         
-        print(f"🔧 Crafting baits - Legendary: {leg_bait_ready}, Rare: {rare_bait_ready}")
+        log.info('craft_started', "Crafting baits", legendary=bool(leg_bait_ready), rare=bool(rare_bait_ready))
         
         try:
             # Set state to crafting and reset timer
@@ -1571,7 +1781,7 @@ class MacroAPI:
                 if hasattr(self, 'watchdog') and self.watchdog:
                     self.watchdog.update_heartbeat()
                 
-                print("🔧 Crafting Legendary Fish Bait...")
+                log.info('craft_bait', "Crafting Legendary Fish Bait")
                 # Click leg bait point to select it
                 self.reliable_click(self.leg_bait_point["x"], self.leg_bait_point["y"], self.craft_click_delay)
                 # Extra wait to ensure menu selection registers
@@ -1600,7 +1810,7 @@ class MacroAPI:
                     
                     time.sleep(self.craft_sequence_delay)
                 
-                print("✅ Legendary Fish Bait crafted")
+                log.info('craft_bait_done', "Legendary Fish Bait crafted")
             
             # Craft Rare Bait if enabled
             if rare_bait_ready:
@@ -1615,7 +1825,7 @@ class MacroAPI:
                 if hasattr(self, 'watchdog') and self.watchdog:
                     self.watchdog.update_heartbeat()
                 
-                print("🔧 Crafting Rare Fish Bait...")
+                log.info('craft_bait', "Crafting Rare Fish Bait")
                 # Click rare bait point to select it
                 self.reliable_click(self.rare_bait_point["x"], self.rare_bait_point["y"], self.craft_click_delay)
                 # Extra wait to ensure menu selection registers
@@ -1644,7 +1854,7 @@ class MacroAPI:
                     
                     time.sleep(self.craft_sequence_delay)
                 
-                print("✅ Rare Fish Bait crafted")
+                log.info('craft_bait_done', "Rare Fish Bait crafted")
             
             if not self.running:
                 return False
@@ -1686,7 +1896,7 @@ class MacroAPI:
             keyboard.press_and_release('shift')
             time.sleep(0.1)
             
-            print("✅ Bait crafting completed successfully")
+            log.info('craft_complete', "Bait crafting completed successfully")
             
             # Reset recast failure counter after successful craft
             self.consecutive_recast_failures = 0
@@ -1698,7 +1908,7 @@ class MacroAPI:
             return True
             
         except Exception as e:
-            print(f"❌ Error during bait crafting: {e}")
+            log.error('craft_error', "Error during bait crafting", error=str(e))
             
             # Restore state to pre_cast
             self.current_state = "pre_cast"
@@ -1709,7 +1919,7 @@ class MacroAPI:
         # 4. Confirm crafting
         # 5. Exit menu
         
-        print("✅ Bait crafting complete")
+        log.info('craft_complete', "Bait crafting complete")
         return True
     
     def capture_legendary_fruit_screenshot(self):
@@ -1717,7 +1927,6 @@ class MacroAPI:
         try:
             import mss
             import numpy as np
-            import cv2
             
             # Helper functions for SendInput
             def send_mouse_move(dx, dy):
@@ -1747,7 +1956,7 @@ class MacroAPI:
             time.sleep(self.store_fruit_shift_delay)
             
             # Move to center
-            print("Rotating camera 180°...")
+            log.debug('camera_rotate', "Rotating camera 180 degrees")
             ctypes.windll.user32.SetCursorPos(center_x, center_y)
             time.sleep(0.2)
             
@@ -1777,7 +1986,7 @@ class MacroAPI:
             time.sleep(0.3)
             
             # Capture screenshot from center of screen
-            print("Capturing fruit screenshot...")
+            log.debug('legendary_screenshot', "Capturing fruit screenshot")
             screenshot_box = {
                 'left': int(screen_width * 0.35),
                 'top': int(screen_height * 0.30),
@@ -1786,20 +1995,11 @@ class MacroAPI:
             }
             
             with mss.mss() as sct:
-                screenshot = sct.grab(screenshot_box)
-                img_array = np.array(screenshot)
-                # mss captures in BGRA format, cv2 expects BGR
-                # Convert BGRA to BGR by removing alpha channel
-                img_bgr = cv2.cvtColor(img_array, cv2.COLOR_BGRA2BGR)
-                
-                # Encode to PNG using cv2
-                success, encoded_img = cv2.imencode('.png', img_bgr)
-                if success:
-                    self.legendary_fruit_screenshot = encoded_img.tobytes()
-                else:
-                    self.legendary_fruit_screenshot = None
+                img_array = np.array(sct.grab(screenshot_box))
+            # Encoded off the macro thread; send_devil_fruit_webhook waits for it
+            self.legendary_fruit_screenshot = self.screenshot_encoder.submit(img_array)
             
-            print("Rotating camera back...")
+            log.debug('camera_rotate_back', "Rotating camera back")
             # Rotate camera back
             ctypes.windll.user32.SetCursorPos(center_x, center_y)
             time.sleep(0.2)
@@ -1816,15 +2016,15 @@ class MacroAPI:
             send_mouse_button(down=False)
             time.sleep(0.2)
             
-            print("Screenshot captured successfully!")
+            log.info('legendary_screenshot_captured', "Legendary fruit screenshot captured")
             
         except Exception as e:
-            print(f"Error capturing legendary fruit screenshot: {e}")
+            log.error('legendary_screenshot_error', "Error capturing legendary fruit screenshot", error=str(e))
             self.legendary_fruit_screenshot = None
     
     def store_devil_fruit(self, capture_legendary=False):
         if not self.store_fruit_point:
-            print("Warning: Auto Store Devil Fruit enabled but Store Fruit Point not set!")
+            log.warning('store_fruit_point_missing', "Auto Store Devil Fruit enabled but Store Fruit Point not set")
             return False
         
         try:
@@ -1863,10 +2063,11 @@ class MacroAPI:
             return True
             
         except Exception as e:
-            print(f"Error storing devil fruit: {e}")
+            log.error('fruit_storage_error', "Error storing devil fruit", error=str(e))
             return False
     
     def waiting(self):
+        phase_start = time.perf_counter()
         pyautogui.rightClick()
         time.sleep(0.1)
         if not self.running:
@@ -1892,6 +2093,9 @@ class MacroAPI:
             if not self.running:
                 return False
         
+        cast_start = time.perf_counter()
+        self.cycle_stats.add('rod_select', cast_start - phase_start)
+        
         ctypes.windll.user32.SetCursorPos(self.water_point['x'], self.water_point['y'])
         time.sleep(self.cursor_anti_detect_delay)
         if not self.running:
@@ -1905,51 +2109,42 @@ class MacroAPI:
             return False
         pyautogui.mouseUp()
         
-        start_time = time.time()
-        target_blue = np.array([85, 170, 255])
-        target_white = np.array([255, 255, 255])
-        target_dark_gray = np.array([25, 25, 25])
+        bite_wait_start = time.perf_counter()
+        self.cycle_stats.add('cast', bite_wait_start - cast_start)
         
-        while self.running and (time.time() - start_time) < self.recast_timeout:
-            with mss.mss() as sct:
-                monitor = {
-                    "left": self.area_box['x1'],
-                    "top": self.area_box['y1'],
-                    "width": self.area_box['x2'] - self.area_box['x1'],
-                    "height": self.area_box['y2'] - self.area_box['y1']
-                }
-                img = np.array(sct.grab(monitor))
-            
-            blue_mask = (
-                (img[:, :, 2] == target_blue[0]) &
-                (img[:, :, 1] == target_blue[1]) &
-                (img[:, :, 0] == target_blue[2])
-            )
-            white_mask = (
-                (img[:, :, 2] == target_white[0]) &
-                (img[:, :, 1] == target_white[1]) &
-                (img[:, :, 0] == target_white[2])
-            )
-            dark_gray_mask = (
-                (img[:, :, 2] == target_dark_gray[0]) &
-                (img[:, :, 1] == target_dark_gray[1]) &
-                (img[:, :, 0] == target_dark_gray[2])
-            )
-            
-            if np.any(blue_mask) and np.any(white_mask) and np.any(dark_gray_mask):
-                print("All colors detected - fish has bitten!")
-                self.consecutive_recast_failures = 0
-                return True
-            
-            self.watchdog.update_heartbeat()
-            
-            time.sleep(self.scan_loop_delay)
+        start_time = time.time()
+        monitor = self._area_monitor()
+        
+        with mss.mss() as sct:
+            while self.running and (time.time() - start_time) < self.recast_timeout:
+                scan_start = time.perf_counter()
+                img = frame_analysis.grab_frame(sct, monitor)
+                captured = time.perf_counter()
+                workspace = self._frame_workspace_for(img)
+                
+                bite = workspace.bite_detected(img)
+                self.profiler.record('waiting.capture', captured - scan_start)
+                self.profiler.record('waiting.color_match', time.perf_counter() - captured)
+                
+                if bite:
+                    log.info('bite_detected', "All colors detected - fish has bitten")
+                    self.recast_timed_out = False
+                    self.consecutive_recast_failures = 0
+                    self.cycle_stats.add('bite_wait', time.perf_counter() - bite_wait_start)
+                    return True
+                
+                self.watchdog.update_heartbeat()
+                
+                time.sleep(self.scan_loop_delay)
         
+        self.cycle_stats.add('bite_wait', time.perf_counter() - bite_wait_start)
+        self.recast_timed_out = True
         self.consecutive_recast_failures += 1
-        print(f"Recast timeout - no bite detected ({self.consecutive_recast_failures}/{self.max_recast_failures})")
+        log.warning('recast_timeout', "Recast timeout - no bite detected",
+                    failures=self.consecutive_recast_failures, max_failures=self.max_recast_failures)
         
         if self.consecutive_recast_failures >= self.max_recast_failures:
-            print(f"🛑 STOPPING: {self.max_recast_failures} consecutive recasts without minigame")
+            log.error('recast_limit_reached', "Stopping: consecutive recasts without minigame", failures=self.max_recast_failures)
             if self.webhook_enabled and self.webhook_url and self.webhook_notify_recovery:
                 self.send_recast_failure_webhook()
             self.stop_macro()
@@ -1965,168 +2160,115 @@ class MacroAPI:
             ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
             self.is_holding_click = False
         
-        target_blue = np.array([85, 170, 255])
-        target_white = np.array([255, 255, 255])
-        target_dark_gray = np.array([25, 25, 25])
         fishing_start_time = time.time()
         
-        while self.running:
-            with mss.mss() as sct:
-                monitor = {
-                    "left": self.area_box['x1'],
-                    "top": self.area_box['y1'],
-                    "width": self.area_box['x2'] - self.area_box['x1'],
-                    "height": self.area_box['y2'] - self.area_box['y1']
-                }
-                img = np.array(sct.grab(monitor))
-            
-            blue_mask = (
-                (img[:, :, 2] == target_blue[0]) &
-                (img[:, :, 1] == target_blue[1]) &
-                (img[:, :, 0] == target_blue[2])
-            )
-            
-            if np.any(blue_mask):
-                y_coords, x_coords = np.where(blue_mask)
-                middle_x = int(np.mean(x_coords))
-                
-                cropped_slice = img[:, middle_x:middle_x+1, :]
+        monitor = self._area_monitor()
+        
+        with mss.mss() as sct:
+            while self.running:
+                scan_start = time.perf_counter()
+                img = frame_analysis.grab_frame(sct, monitor)
+                self.profiler.record('fishing.capture', time.perf_counter() - scan_start)
+                workspace = self._frame_workspace_for(img)
                 
-                target_gray = np.array([25, 25, 25])
-                gray_mask = (
-                    (cropped_slice[:, 0, 2] == target_gray[0]) &
-                    (cropped_slice[:, 0, 1] == target_gray[1]) &
-                    (cropped_slice[:, 0, 0] == target_gray[2])
+                found_blue, white_y, bar_y = frame_analysis.analyze_frame(
+                    img, self.gap_tolerance_multiplier, workspace, self.profiler
                 )
                 
-                if np.any(gray_mask):
-                    gray_y_coords = np.where(gray_mask)[0]
-                    top_gray_y = gray_y_coords[0]
-                    bottom_gray_y = gray_y_coords[-1]
-                    
-                    final_slice = cropped_slice[top_gray_y:bottom_gray_y+1, :, :]
-                    
-                    target_white_slice = np.array([255, 255, 255])
-                    white_mask = (
-                        (final_slice[:, 0, 2] == target_white_slice[0]) &
-                        (final_slice[:, 0, 1] == target_white_slice[1]) &
-                        (final_slice[:, 0, 0] == target_white_slice[2])
-                    )
-                    
-                    target_dark_gray_slice = np.array([25, 25, 25])
-                    dark_gray_mask = (
-                        (final_slice[:, 0, 2] == target_dark_gray_slice[0]) &
-                        (final_slice[:, 0, 1] == target_dark_gray_slice[1]) &
-                        (final_slice[:, 0, 0] == target_dark_gray_slice[2])
-                    )
-                    
-                    if np.any(dark_gray_mask):
-                        dark_gray_y_coords = np.where(dark_gray_mask)[0]
+                if found_blue:
+                    if white_y is not None:
+                        control_start = time.perf_counter()
+                        middle_white_y_screen = self.area_box["y1"] + white_y
+                        biggest_group_middle_y_screen = self.area_box["y1"] + bar_y
                         
-                        if np.any(white_mask):
-                            white_y_coords = np.where(white_mask)[0]
-                            top_white_y_relative = white_y_coords[0]
-                            bottom_white_y_relative = white_y_coords[-1]
-                            white_height = bottom_white_y_relative - top_white_y_relative + 1
-                            
-                            middle_white_y_screen = self.area_box["y1"] + top_gray_y + (top_white_y_relative + bottom_white_y_relative) // 2
-                        else:
-                            top_white_y_relative = 0
-                            bottom_white_y_relative = max(5, len(final_slice) // 10)
-                            white_height = bottom_white_y_relative - top_white_y_relative + 1
-                            middle_white_y_screen = self.area_box["y1"] + top_gray_y + (top_white_y_relative + bottom_white_y_relative) // 2
+                        kp = self.kp
+                        kd = self.kd
+                        pd_clamp = self.pd_clamp
                         
-                        if True:
-                            dark_gray_y_coords = np.where(dark_gray_mask)[0]
-                            
-                            gap_tolerance = white_height * self.gap_tolerance_multiplier
-                            groups = []
-                            current_group = [dark_gray_y_coords[0]]
-                            
-                            for i in range(1, len(dark_gray_y_coords)):
-                                if dark_gray_y_coords[i] - dark_gray_y_coords[i-1] <= gap_tolerance:
-                                    current_group.append(dark_gray_y_coords[i])
-                                else:
-                                    groups.append(current_group)
-                                    current_group = [dark_gray_y_coords[i]]
-                            groups.append(current_group)
-                            
-                            biggest_group = max(groups, key=len)
-                            biggest_group_middle = (biggest_group[0] + biggest_group[-1]) // 2
-                            
-                            biggest_group_middle_y_screen = self.area_box["y1"] + top_gray_y + biggest_group_middle
-                            
-                            kp = self.kp
-                            kd = self.kd
-                            pd_clamp = self.pd_clamp
-                            
-                            error = middle_white_y_screen - biggest_group_middle_y_screen
+                        error = middle_white_y_screen - biggest_group_middle_y_screen
+                        
+                        p_term = kp * error
+                        
+                        d_term = 0.0
+                        current_time = time.time()
+                        time_delta = current_time - self.last_scan_time
+                        
+                        if self.last_error is not None and self.last_dark_gray_y is not None and time_delta > 0.001:
+                            dark_gray_velocity = (biggest_group_middle_y_screen - self.last_dark_gray_y) / time_delta
                             
-                            p_term = kp * error
+                            error_magnitude_decreasing = abs(error) < abs(self.last_error)
                             
-                            d_term = 0.0
-                            current_time = time.time()
-                            time_delta = current_time - self.last_scan_time
+                            bar_moving_toward_target = (dark_gray_velocity > 0 and error > 0) or (dark_gray_velocity < 0 and error < 0)
                             
-                            if self.last_error is not None and self.last_dark_gray_y is not None and time_delta > 0.001:
-                                dark_gray_velocity = (biggest_group_middle_y_screen - self.last_dark_gray_y) / time_delta
-                                
-                                error_magnitude_decreasing = abs(error) < abs(self.last_error)
-                                
-                                bar_moving_toward_target = (dark_gray_velocity > 0 and error > 0) or (dark_gray_velocity < 0 and error < 0)
-                                
-                                if error_magnitude_decreasing and bar_moving_toward_target:
-                                    damping_multiplier = self.pd_approaching_damping
-                                    d_term = -kd * damping_multiplier * dark_gray_velocity
+                            if error_magnitude_decreasing and bar_moving_toward_target:
+                                damping_multiplier = self.pd_approaching_damping
+                                d_term = -kd * damping_multiplier * dark_gray_velocity
+                            else:
+                                damping_multiplier = self.pd_chasing_damping
+                                d_term = -kd * damping_multiplier * dark_gray_velocity
+                        
+                        control_signal = p_term + d_term
+                        control_signal = max(-pd_clamp, min(pd_clamp, control_signal))
+                        
+                        should_hold = control_signal <= 0
+                        dispatch_start = time.perf_counter()
+                        self.profiler.record('fishing.control_law', dispatch_start - control_start)
+                        
+                        if should_hold and not self.is_holding_click:
+                            ctypes.windll.user32.mouse_event(2, 0, 0, 0, 0)
+                            self.is_holding_click = True
+                            self.last_input_resend_time = current_time
+                        elif not should_hold and self.is_holding_click:
+                            ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
+                            self.is_holding_click = False
+                            self.last_input_resend_time = current_time
+                        else:
+                            time_since_last_resend = current_time - self.last_input_resend_time
+                            if time_since_last_resend >= self.state_resend_interval:
+                                if self.is_holding_click:
+                                    ctypes.windll.user32.mouse_event(2, 0, 0, 0, 0)
                                 else:
-                                    damping_multiplier = self.pd_chasing_damping
-                                    d_term = -kd * damping_multiplier * dark_gray_velocity
-                            
-                            control_signal = p_term + d_term
-                            control_signal = max(-pd_clamp, min(pd_clamp, control_signal))
-                            
-                            should_hold = control_signal <= 0
-                            
-                            if should_hold and not self.is_holding_click:
-                                ctypes.windll.user32.mouse_event(2, 0, 0, 0, 0)
-                                self.is_holding_click = True
-                                self.last_input_resend_time = current_time
-                            elif not should_hold and self.is_holding_click:
-                                ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
-                                self.is_holding_click = False
+                                    ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
                                 self.last_input_resend_time = current_time
-                            else:
-                                time_since_last_resend = current_time - self.last_input_resend_time
-                                if time_since_last_resend >= self.state_resend_interval:
-                                    if self.is_holding_click:
-                                        ctypes.windll.user32.mouse_event(2, 0, 0, 0, 0)
-                                    else:
-                                        ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
-                                    self.last_input_resend_time = current_time
-                            
-                            self.last_error = error
-                            self.last_dark_gray_y = biggest_group_middle_y_screen
-                            self.last_scan_time = current_time
-                            
-                            self.watchdog.update_heartbeat()
-            else:
-                if self.is_holding_click:
-                    ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
-                    self.is_holding_click = False
-                
-                if time.time() - fishing_start_time > 3.0:
-                    if self.check_black_screen():
-                        self.handle_anti_macro_screen()
+                        self.profiler.record('fishing.input_dispatch', time.perf_counter() - dispatch_start)
+                        
+                        self.last_error = error
+                        self.last_dark_gray_y = biggest_group_middle_y_screen
+                        self.last_scan_time = current_time
+                        
+                        self.watchdog.update_heartbeat()
+                else:
+                    if self.is_holding_click:
+                        ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
+                        self.is_holding_click = False
                     
-                    return True
-            
-            time.sleep(self.scan_loop_delay)
+                    if time.time() - fishing_start_time > 3.0:
+                        if self.check_black_screen():
+                            self.handle_anti_macro_screen()
+                        
+                        return True
+                
+                time.sleep(self.scan_loop_delay)
         
         if self.is_holding_click:
             ctypes.windll.user32.mouse_event(4, 0, 0, 0, 0)
             self.is_holding_click = False
         return False
     
+    def _area_monitor(self):
+        return {
+            "left": self.area_box['x1'],
+            "top": self.area_box['y1'],
+            "width": self.area_box['x2'] - self.area_box['x1'],
+            "height": self.area_box['y2'] - self.area_box['y1']
+        }
+    
+    def _frame_workspace_for(self, img):
+        """Return the scan buffers for img's size, rebuilding them only when the area changed."""
+        if self.frame_workspace is None or not self.frame_workspace.matches(img):
+            self.frame_workspace = frame_analysis.FrameWorkspace(img.shape[0], img.shape[1])
+        return self.frame_workspace
+    
     def check_black_screen(self):
         try:
             with mss.mss() as sct:
@@ -2144,20 +2286,20 @@ class MacroAPI:
             black_ratio = black_pixels / total_pixels
             
             if black_ratio > self.black_screen_threshold:
-                print(f"Black screen detected! ({black_ratio*100:.1f}% black pixels)")
+                log.warning('black_screen', "Black screen detected", black_ratio=round(float(black_ratio), 3))
                 return True
             return False
         except Exception as e:
-            print(f"Error checking black screen: {e}")
+            log.error('black_screen_error', "Error checking black screen", every=5.0, error=str(e))
             return False
     
     def handle_anti_macro_screen(self):
-        print("Handling anti-macro screen...")
+        log.info('anti_macro_screen', "Handling anti-macro screen")
         keyboard.press_and_release('space')
         time.sleep(0.5)
         keyboard.press_and_release('space')
         time.sleep(1.0)
-        print("Anti-macro screen cleared")
+        log.info('anti_macro_screen_cleared', "Anti-macro screen cleared")
     
     def get_state(self):
         elapsed_time = 0
@@ -2218,6 +2360,7 @@ class MacroAPI:
             "webhook_notify_purchase": getattr(self, 'webhook_notify_purchase', True),
             "webhook_notify_recovery": getattr(self, 'webhook_notify_recovery', True),
             "watchdog_recoveries": self.watchdog.recovery_count if hasattr(self, 'watchdog') else 0,
+            "ocr_status": self.ocr_status,
             "cast_hold_duration": self.cast_hold_duration,
             "recast_timeout": self.recast_timeout,
             "fish_end_delay": self.fish_end_delay,
@@ -2246,6 +2389,83 @@ class MacroAPI:
             "stay_on_top": self.stay_on_top
         }
     
+    def get_recent_events(self, text=None, level=None, limit=100):
+        """Search the in-memory event history, newest first."""
+        return log.search(text=text, level=level, limit=int(limit))
+
+    def get_cycle_breakdown(self):
+        """Where each fishing cycle's wall time went, per phase."""
+        return self.cycle_stats.summary()
+
+    def export_cycle_breakdown(self):
+        path = self.config_file.parent / 'cycle_breakdown.json'
+        try:
+            self.cycle_stats.dump(path)
+            return {"success": True, "path": str(path)}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def reset_cycle_breakdown(self):
+        self.cycle_stats.reset()
+        return {"success": True}
+
+    def get_stage_profile(self):
+        """Rolling p50/p95/p99 per control loop stage, in milliseconds."""
+        return {"enabled": self.profiler.enabled, "stages": self.profiler.summary()}
+
+    def export_stage_profile(self):
+        path = self.config_file.parent / 'stage_profile.json'
+        try:
+            self.profiler.dump(path)
+            return {"success": True, "path": str(path)}
+        except Exception as e:
+            return {"success": False, "message": str(e)}
+
+    def reset_stage_profile(self):
+        self.profiler.reset()
+        return {"success": True}
+
+    def test_ocr_scan(self, profile='fruit'):
+        """Run one OCR pipeline profile on the current screen and report each stage's latency."""
+        if profile not in self.ocr_pipeline.profiles:
+            return {"success": False, "message": f"Unknown OCR profile: {profile}"}
+        last_ocr_time = self.last_ocr_time
+        self.last_ocr_time = 0
+        try:
+            result = self.ocr_pipeline.run(profile)
+        finally:
+            self.last_ocr_time = last_ocr_time
+        return {"success": True, "profile": profile, **result.to_dict()}
+
+    def get_ocr_stats(self):
+        return {
+            "status": self.ocr_status,
+            "init_timings": self.ocr_init_timings,
+            "memory": dict(self._ocr_rss(), last_unload=self.ocr_memory, idle_unload_s=self.ocr_idle_unload_s),
+            "gate": self.banner_gate.stats(),
+            "cache": self.ocr_cache.stats(),
+            "fast_path": self.text_layout.stats(),
+            "templates": self.template_detector.stats(),
+            "race": self.ocr_pipeline.race_stats(),
+        }
+
+    def toggle_pipelined_ocr(self, enabled):
+        self.pipelined_ocr = bool(enabled)
+        self.save_settings()
+        return {"success": True, "enabled": self.pipelined_ocr}
+    
+    def toggle_race_ocr_variants(self, enabled):
+        """Worker concurrency follows this setting the next time the OCR worker starts."""
+        self.ocr_race_variants = bool(enabled)
+        self.save_settings()
+        return {"success": True, "enabled": self.ocr_race_variants}
+    
+    def toggle_stage_profiler(self, enabled):
+        self.stage_profiler_enabled = bool(enabled)
+        self.profiler.enabled = self.stage_profiler_enabled
+        self.save_settings()
+        return {"success": True, "enabled": self.stage_profiler_enabled}
+
     def set_water_point(self):
         return self._start_point_setting('water_point')
     
@@ -2420,7 +2640,6 @@ class MacroAPI:
             return
         
         try:
-            import requests
             from datetime import datetime, timezone
             
             embed = {
@@ -2433,33 +2652,35 @@ class MacroAPI:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
-            # Add image if screenshot was captured
-            if hasattr(self, 'legendary_fruit_screenshot') and self.legendary_fruit_screenshot:
-                embed["image"] = {"url": "attachment://legendary_fruit.png"}
-            
             payload = {"embeds": [embed], "username": "haiku"}
             if self.discord_user_id:
                 payload["content"] = f"<@{self.discord_user_id}>"
             
-            # Send with image attachment if available
-            if hasattr(self, 'legendary_fruit_screenshot') and self.legendary_fruit_screenshot:
-                files = {'file': ('legendary_fruit.png', self.legendary_fruit_screenshot, 'image/png')}
-                response = requests.post(self.webhook_url, data={'payload_json': requests.compat.json.dumps(payload)}, files=files, timeout=10)
-                self.legendary_fruit_screenshot = None  # Clear after sending
-            else:
-                response = requests.post(self.webhook_url, json=payload, timeout=10)
-            
-            if response.status_code == 204:
-                print("✅ Devil fruit webhook sent successfully!")
+            screenshot = getattr(self, 'legendary_fruit_screenshot', None)
+            self.legendary_fruit_screenshot = None  # Clear after handing off
+            if screenshot is None:
+                self.webhook_dispatcher.submit(self.webhook_url, payload, label="devil_fruit")
             else:
-                print(f"❌ Devil fruit webhook failed: HTTP {response.status_code} - {response.text[:100]}")
-        except requests.exceptions.Timeout:
-            print("❌ Devil fruit webhook error: Request timed out (check your internet connection)")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Devil fruit webhook error: {str(e)}")
+                # Queued from the encoder thread once the image is ready
+                screenshot.add_done_callback(
+                    lambda future: self._submit_devil_fruit_webhook(self.webhook_url, payload, future))
         except Exception as e:
             print(f"❌ Devil fruit webhook error: {str(e)}")
     
+    def _submit_devil_fruit_webhook(self, url, payload, screenshot):
+        files = None
+        try:
+            encoded = screenshot.result()
+            filename = encoded.filename('legendary_fruit')
+            payload["embeds"][0]["image"] = {"url": f"attachment://{filename}"}
+            files = {'file': (filename, encoded.data, encoded.mime)}
+            log.info('legendary_screenshot_encoded', "Encoded legendary fruit screenshot",
+                     kb=round(len(encoded.data) / 1024, 1), quality=encoded.quality,
+                     size=f"{encoded.width}x{encoded.height}", encode_ms=round(encoded.encode_s * 1000, 1))
+        except Exception as e:
+            log.error('legendary_screenshot_error', "Error encoding legendary fruit screenshot", error=str(e))
+        self.webhook_dispatcher.submit(url, payload, files=files, label="devil_fruit")
+    
     def minimize_window(self):
         if self.window:
             self.window.minimize()
@@ -2633,12 +2854,56 @@ class MacroAPI:
         except Exception as e:
             return {"success": False, "message": f"❌ Error: {str(e)[:100]}"}
     
+    def get_webhook_stats(self):
+        stats = self.webhook_dispatcher.stats()
+        stats["digest"] = dict(self.webhook_digest.stats(), enabled=self.webhook_digest_enabled,
+                               interval_s=self.webhook_digest_interval_s)
+        return stats
+    
+    def toggle_webhook_digest(self, enabled):
+        self.webhook_digest_enabled = bool(enabled)
+        if self.webhook_digest_enabled:
+            self.webhook_digest.start()
+        else:
+            self.webhook_digest.stop()
+        self.save_settings()
+        return {"success": True, "enabled": self.webhook_digest_enabled}
+    
+    def _send_low_priority_webhook(self, embed, label, mention=False):
+        mention = self.discord_user_id if mention and self.discord_user_id else None
+        if self.webhook_digest_enabled:
+            self.webhook_digest.add(self.webhook_url, embed, label, mention=mention)
+            return
+        payload = {"embeds": [embed], "username": "haiku"}
+        if mention:
+            payload["content"] = f"<@{mention}>"
+        self.webhook_dispatcher.submit(self.webhook_url, payload, label=label)
+    
+    def _throughput_snapshot(self):
+        if not (self.webhook_digest_enabled and self.webhook_enabled and self.webhook_url):
+            return None
+        if not self.running or not self.start_time:
+            return None
+        from datetime import datetime, timezone
+        
+        elapsed_time = max(1, int(time.time() - self.start_time))
+        embed = {
+            "title": "📈 Throughput",
+            "color": 0x2ecc71,
+            "fields": [
+                {"name": "Fish Count", "value": str(self.fish_count), "inline": True},
+                {"name": "Fish / Hour", "value": f"{self.fish_count / elapsed_time * 3600:.1f}", "inline": True},
+                {"name": "Runtime", "value": f"{elapsed_time // 3600}h {(elapsed_time % 3600) // 60}m", "inline": True}
+            ],
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        return self.webhook_url, embed
+    
     def send_purchase_webhook(self, quantity):
         if not self.webhook_enabled or not self.webhook_url or not self.webhook_notify_purchase:
             return
         
         try:
-            import requests
             from datetime import datetime, timezone
             
             embed = {
@@ -2652,17 +2917,7 @@ class MacroAPI:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
-            payload = {"embeds": [embed], "username": "haiku"}
-            response = requests.post(self.webhook_url, json=payload, timeout=5)
-            
-            if response.status_code == 204:
-                print("✅ Purchase webhook sent successfully!")
-            else:
-                print(f"❌ Purchase webhook failed: HTTP {response.status_code} - {response.text[:100]}")
-        except requests.exceptions.Timeout:
-            print("❌ Purchase webhook error: Request timed out (check your internet connection)")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Purchase webhook error: {str(e)}")
+            self._send_low_priority_webhook(embed, "purchase")
         except Exception as e:
             print(f"❌ Purchase webhook error: {str(e)}")
     
@@ -2671,7 +2926,6 @@ class MacroAPI:
             return
         
         try:
-            import requests
             from datetime import datetime, timezone
             
             embed = {
@@ -2686,19 +2940,7 @@ class MacroAPI:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
-            payload = {"embeds": [embed], "username": "haiku"}
-            if self.discord_user_id:
-                payload["content"] = f"<@{self.discord_user_id}>"
-            response = requests.post(self.webhook_url, json=payload, timeout=5)
-            
-            if response.status_code == 204:
-                print("✅ Recovery webhook sent successfully!")
-            else:
-                print(f"❌ Recovery webhook failed: HTTP {response.status_code} - {response.text[:100]}")
-        except requests.exceptions.Timeout:
-            print("❌ Recovery webhook error: Request timed out (check your internet connection)")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Recovery webhook error: {str(e)}")
+            self._send_low_priority_webhook(embed, "recovery", mention=True)
         except Exception as e:
             print(f"❌ Recovery webhook error: {str(e)}")
     
@@ -2707,7 +2949,6 @@ class MacroAPI:
             return
         
         try:
-            import requests
             from datetime import datetime, timezone
             
             embed = {
@@ -2725,16 +2966,7 @@ class MacroAPI:
             payload = {"embeds": [embed], "username": "haiku"}
             if self.discord_user_id:
                 payload["content"] = f"<@{self.discord_user_id}>"
-            response = requests.post(self.webhook_url, json=payload, timeout=10)
-            
-            if response.status_code == 204:
-                print("✅ Recast failure webhook sent successfully!")
-            else:
-                print(f"❌ Recast failure webhook failed: HTTP {response.status_code} - {response.text[:100]}")
-        except requests.exceptions.Timeout:
-            print("❌ Recast failure webhook error: Request timed out (check your internet connection)")
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Recast failure webhook error: {str(e)}")
+            self.webhook_dispatcher.submit(self.webhook_url, payload, label="recast_failure")
         except Exception as e:
             print(f"❌ Recast failure webhook error: {str(e)}")
 
@@ -2797,7 +3029,7 @@ def main():
             _update_status('Loading settings...')
             import time as _t; _t.sleep(0.1)  # let UI render
             
-            _update_status('Initializing OCR engine...')
+            _update_status('Warming up...')
             result = api.deferred_init()
             
             _update_status('Almost ready...')
@@ -0,0 +1,73 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def image_digest(img):
+    """Exact 128-bit hash of an image's pixels, as bytes.
+
+    Only byte-identical captures share a key. A perceptual hash merges
+    banners that differ in one pity digit or one letter of a fruit name,
+    which is exactly the difference the scan must see; the hits that matter
+    (the same prepared image read again, retries on an unchanged frame) are
+    exact repeats anyway.
+    """
+    return hashlib.blake2b(np.ascontiguousarray(img).data, digest_size=16).digest()
+
+
+class OcrCache:
+    """Bounded LRU of readtext results keyed by image hash and call arguments.
+
+    Entries expire ttl seconds after they were stored, so a banner that
+    is shown again later is read again rather than trusted from memory.
+    """
+
+    def __init__(self, capacity=64, ttl=10.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(img, kwargs):
+        # repr() because recognize() takes box lists, which aren't hashable
+        return (image_digest(img), img.shape, str(img.dtype), repr(sorted(kwargs.items())))
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, results):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_s": self.ttl,
+        }
@@ -0,0 +1,76 @@
+class TextLineLayout:
+    """Where the devil fruit banner's text lines sit inside the OCR area.
+
+    The banner always renders at the same place, so once a full readtext()
+    has found its lines, later scans can skip EasyOCR's CRAFT detector and
+    run only the recognizer on those boxes (reader.recognize with a
+    horizontal_list). Boxes are stored as fractions of the capture size
+    together with that size; a capture of any other size is treated as
+    unknown layout.
+    """
+
+    def __init__(self, lines=None, shape=None, min_confidence=0.4, pad_x=0.15, pad_y=0.2):
+        self.lines = lines or []
+        self.shape = tuple(shape) if shape else None
+        self.min_confidence = min_confidence
+        self.pad_x = pad_x
+        self.pad_y = pad_y
+        self.hits = 0
+        self.fallbacks = 0
+
+    @property
+    def ready(self):
+        return bool(self.lines) and self.shape is not None
+
+    def learn(self, results, shape):
+        """Take the line boxes from detail=1 readtext results. Returns True if the layout changed."""
+        height, width = shape[:2]
+        lines = []
+        for points, _text, _conf in results:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            # Pad generously: the fruit name and pity count change the line length.
+            pad_y = (max(ys) - min(ys)) * self.pad_y
+            lines.append([
+                round(max(0.0, min(xs) / width - self.pad_x), 4),
+                round(min(1.0, max(xs) / width + self.pad_x), 4),
+                round(max(0.0, (min(ys) - pad_y) / height), 4),
+                round(min(1.0, (max(ys) + pad_y) / height), 4),
+            ])
+        lines.sort(key=lambda line: line[2])
+        if not lines or (lines == self.lines and self.shape == (height, width)):
+            return False
+        self.lines = lines
+        self.shape = (height, width)
+        return True
+
+    def boxes_for(self, shape):
+        """Pixel [x_min, x_max, y_min, y_max] boxes for a capture, or None if unknown."""
+        if not self.ready or tuple(shape[:2]) != self.shape:
+            return None
+        height, width = self.shape
+        return [
+            [int(x1 * width), int(x2 * width), int(y1 * height), int(y2 * height)]
+            for x1, x2, y1, y2 in self.lines
+        ]
+
+    def confident(self, results):
+        return bool(results) and min(conf for _box, _text, conf in results) >= self.min_confidence
+
+    def to_dict(self):
+        return {"lines": self.lines, "shape": list(self.shape) if self.shape else None}
+
+    @classmethod
+    def from_dict(cls, data, **kwargs):
+        data = data or {}
+        return cls(lines=data.get("lines"), shape=data.get("shape"), **kwargs)
+
+    def stats(self):
+        attempts = self.hits + self.fallbacks
+        return {
+            "learned": self.ready,
+            "lines": len(self.lines),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "hit_rate": round(self.hits / attempts, 4) if attempts else 0.0,
+        }
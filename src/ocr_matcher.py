@@ -0,0 +1,133 @@
+import re
+
+# Characters EasyOCR commonly reads in place of letters on the banner font
+OCR_CONFUSIONS = str.maketrans({'0': 'o', '1': 'l', '|': 'l', '!': 'l', '3': 'e', '5': 's', '$': 's'})
+
+EXACT_WEIGHT = 1.0
+FUZZY_WEIGHT = 0.75
+
+_WORD = re.compile(r'[a-z]+')
+
+
+def osa_distance(a, b, limit):
+    """Optimal string alignment distance (edits plus adjacent swaps), or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class KeywordHits:
+    __slots__ = ('terms', 'phrases')
+
+    def __init__(self, terms, phrases):
+        self.terms = terms
+        self.phrases = phrases
+
+    def count(self, names):
+        return sum(1 for name in names if name in self.terms)
+
+    def score(self, names):
+        return sum(EXACT_WEIGHT if self.terms[name] == 'exact' else FUZZY_WEIGHT
+                   for name in names if name in self.terms)
+
+    def fuzzy(self, names):
+        return [name for name in names if self.terms.get(name) == 'fuzzy']
+
+
+class KeywordMatcher:
+    """Finds every banner term and phrase in OCR text in one regex pass.
+
+    terms maps a term name to the fragments that count as that term
+    ('fruit': ('ruit',) also accepts "eruit"). Fragments and phrases go into
+    a single lookahead alternation, so overlapping hits ("devil fruit" and
+    "fruit") are all seen in one scan. Text is first folded through
+    OCR_CONFUSIONS (0->o, 1->l, ...). Terms whose name is at least
+    min_fuzzy_length long also match words within max_edits edits of the
+    name ("devl", "frult"); candidates come from a precomputed
+    single-deletion index and are confirmed with osa_distance.
+    """
+
+    def __init__(self, terms, phrases=(), max_edits=1, min_fuzzy_length=5):
+        self.terms = dict(terms)
+        self.phrases = tuple(phrases)
+        self.max_edits = max_edits
+        self.min_fuzzy_length = min_fuzzy_length
+
+        fragments = {}
+        for name, parts in self.terms.items():
+            for fragment in parts:
+                fragments.setdefault(fragment, set()).add(name)
+        for phrase in self.phrases:
+            fragments.setdefault(phrase, set())
+        # Longest first, so a fragment that is a prefix of another is
+        # credited through _credits rather than shadowing the longer one.
+        ordered = sorted(fragments, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(f) for f in ordered) + '))')
+        self._credits = {
+            fragment: (
+                {name for other, names in fragments.items() if fragment.startswith(other) for name in names},
+                [phrase for phrase in self.phrases if fragment.startswith(phrase)],
+            )
+            for fragment in ordered
+        }
+
+        self._fuzzy_index = {}
+        for name in self.terms:
+            if len(name) >= min_fuzzy_length:
+                for key in _deletes(name) | {name}:
+                    self._fuzzy_index.setdefault(key, set()).add(name)
+        longest = max((len(name) for name in self.terms if len(name) >= min_fuzzy_length), default=0)
+        self._fuzzy_lengths = range(min_fuzzy_length - max_edits, longest + max_edits + 1)
+        # OCR output repeats the same few words, so each word is resolved once.
+        self._fuzzy_words = {}
+
+    def normalize(self, text):
+        return text.lower().translate(OCR_CONFUSIONS)
+
+    def scan(self, text):
+        text = self.normalize(text)
+        terms = {}
+        phrases = []
+        for match in self._pattern.finditer(text):
+            names, matched_phrases = self._credits[match.group(1)]
+            for name in names:
+                terms[name] = 'exact'
+            for phrase in matched_phrases:
+                if phrase not in phrases:
+                    phrases.append(phrase)
+
+        if self.max_edits and len(terms) < len(self.terms):
+            for word in _WORD.findall(text):
+                if len(word) not in self._fuzzy_lengths:
+                    continue
+                for name in self._fuzzy_names(word):
+                    terms.setdefault(name, 'fuzzy')
+        return KeywordHits(terms, phrases)
+
+    def _fuzzy_names(self, word):
+        names = self._fuzzy_words.get(word)
+        if names is None:
+            candidates = set()
+            for key in _deletes(word) | {word}:
+                candidates.update(self._fuzzy_index.get(key, ()))
+            names = tuple(name for name in candidates if osa_distance(word, name, self.max_edits) <= self.max_edits)
+            if len(self._fuzzy_words) >= 4096:
+                self._fuzzy_words.clear()
+            self._fuzzy_words[word] = names
+        return names
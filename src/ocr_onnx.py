@@ -0,0 +1,260 @@
+"""EasyOCR's recognizer exported to ONNX and run with ONNX Runtime on the CPU.
+
+OnnxReader answers the subset of easyocr.Reader calls the OCR pipeline
+makes (readtext, readtext_batched, recognize, detect) without importing
+torch. There is no CRAFT detector: the banner is light text with a dark
+outline on a fixed spot, so detect() finds its lines from rows of sharp
+horizontal brightness steps, and the fast path passes learned line boxes
+straight to recognize() anyway.
+
+Export the model once from a source checkout that has easyocr and torch:
+
+    python src\\ocr_onnx.py export --quantize
+
+which writes recognizer.onnx (and recognizer_int8.onnx), each next to a
+.json file holding the character set.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+MODEL_HEIGHT = 64
+
+
+def _gray(img):
+    if img.ndim == 2:
+        return img
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+
+
+def _adjust_contrast(crop, target=0.5):
+    # Same stretch easyocr applies to low-contrast crops before recognition.
+    high, low = np.percentile(crop, 90), np.percentile(crop, 10)
+    contrast = (high - low) / max(10, high + low)
+    if contrast >= target:
+        return crop
+    ratio = 200.0 / max(10, high - low)
+    return np.clip((crop.astype(np.float32) - low + 25) * ratio, 0, 255).astype(np.uint8)
+
+
+def _box_points(box):
+    x_min, x_max, y_min, y_max = box
+    return [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+
+
+def detect_lines(gray, edge_threshold=60, min_height=8, pad=0.25):
+    """Horizontal [x_min, x_max, y_min, y_max] boxes around rows of text, top to bottom."""
+    steps = np.abs(np.diff(gray.astype(np.int16), axis=1)) > edge_threshold
+    row_hits = np.count_nonzero(steps, axis=1)
+    text_rows = row_hits >= max(3, steps.shape[1] // 100)
+
+    boxes = []
+    height, width = gray.shape
+    y = 0
+    while y < height:
+        if not text_rows[y]:
+            y += 1
+            continue
+        top = y
+        gap = 0
+        while y < height and gap <= 2:
+            gap = 0 if text_rows[y] else gap + 1
+            y += 1
+        bottom = y - gap
+        if bottom - top < min_height:
+            continue
+        cols = np.flatnonzero(steps[top:bottom].any(axis=0))
+        pad_px = int((bottom - top) * pad)
+        boxes.append([
+            max(0, int(cols[0]) - pad_px), min(width, int(cols[-1]) + 1 + pad_px),
+            max(0, top - pad_px), min(height, bottom + pad_px),
+        ])
+    return boxes
+
+
+class OnnxReader:
+    """Greedy CTC decoding of EasyOCR's recognizer output, easyocr.Reader compatible."""
+
+    def __init__(self, model_path, threads=2):
+        import onnxruntime as ort
+
+        with open(os.path.splitext(model_path)[0] + '.json') as f:
+            self.characters = json.load(f)['characters']
+        options = ort.SessionOptions()
+        # The macro shares the CPU with the game: a few threads that sleep
+        # between calls, instead of every core spinning.
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.add_session_config_entry('session.intra_op.allow_spinning', '0')
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.model_path = model_path
+        self.threads = threads
+
+    def _batch(self, crops):
+        """Resize crops to the model height and pad them to one width, as easyocr's AlignCollate does."""
+        widths = [max(1, math.ceil(MODEL_HEIGHT * crop.shape[1] / crop.shape[0])) for crop in crops]
+        batch = np.empty((len(crops), 1, MODEL_HEIGHT, max(widths)), dtype=np.float32)
+        for index, (crop, width) in enumerate(zip(crops, widths)):
+            resized = cv2.resize(_adjust_contrast(crop), (width, MODEL_HEIGHT), interpolation=cv2.INTER_CUBIC)
+            row = batch[index, 0]
+            row[:, :width] = resized / 127.5 - 1.0
+            row[:, width:] = row[:, width - 1:width]
+        return batch
+
+    def _decode(self, logits):
+        logits = logits - logits.max(axis=2, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=2, keepdims=True)
+        indices = probs.argmax(axis=2)
+        best = probs.max(axis=2)
+        decoded = []
+        for row_indices, row_best in zip(indices, best):
+            keep = np.ones(len(row_indices), dtype=bool)
+            keep[1:] = row_indices[1:] != row_indices[:-1]
+            keep &= row_indices != 0
+            text = ''.join(self.characters[i] for i in row_indices[keep])
+            max_probs = row_best[row_indices != 0]
+            if len(max_probs) == 0:
+                confidence = 0.0
+            else:
+                confidence = float(np.prod(max_probs) ** (2.0 / math.sqrt(len(max_probs))))
+            decoded.append((text, confidence))
+        return decoded
+
+    def _read_boxes(self, jobs):
+        """jobs: [(gray, boxes)]. One inference for every crop of every image."""
+        crops, owners = [], []
+        for job_index, (gray, boxes) in enumerate(jobs):
+            for box in boxes:
+                x_min, x_max, y_min, y_max = (max(0, int(v)) for v in box)
+                crop = gray[y_min:y_max, x_min:x_max]
+                if crop.shape[0] < 2 or crop.shape[1] < 2:
+                    continue
+                crops.append(crop)
+                owners.append((job_index, [x_min, x_max, y_min, y_max]))
+        results = [[] for _ in jobs]
+        if not crops:
+            return results
+        logits = self.session.run(None, {self.input_name: self._batch(crops)})[0]
+        for (job_index, box), (text, confidence) in zip(owners, self._decode(logits)):
+            results[job_index].append((_box_points(box), text, confidence))
+        return results
+
+    @staticmethod
+    def _format(results, detail=1, paragraph=False):
+        if paragraph:
+            text = ' '.join(text for _points, text, _conf in results if text)
+            if not text:
+                return []
+            if detail == 0:
+                return [text]
+            xs = [p[0] for points, _text, _conf in results for p in points]
+            ys = [p[1] for points, _text, _conf in results for p in points]
+            return [[_box_points([min(xs), max(xs), min(ys), max(ys)]), text]]
+        if detail == 0:
+            return [text for _points, text, _conf in results]
+        return results
+
+    def detect(self, img, **_kwargs):
+        return [detect_lines(_gray(img))], [[]]
+
+    def recognize(self, img, horizontal_list=None, free_list=None, detail=1, paragraph=False, **_kwargs):
+        gray = _gray(img)
+        if horizontal_list is None:
+            horizontal_list = [[0, gray.shape[1], 0, gray.shape[0]]]
+        return self._format(self._read_boxes([(gray, horizontal_list)])[0], detail, paragraph)
+
+    def readtext(self, img, detail=1, paragraph=False, **_kwargs):
+        gray = _gray(img)
+        return self._format(self._read_boxes([(gray, detect_lines(gray))])[0], detail, paragraph)
+
+    def readtext_batched(self, images, detail=1, paragraph=False, **_kwargs):
+        grays = [_gray(img) for img in images]
+        jobs = [(gray, detect_lines(gray)) for gray in grays]
+        return [self._format(results, detail, paragraph) for results in self._read_boxes(jobs)]
+
+
+def load_onnx_reader(model_path, threads=2, warmup=True):
+    """Build an OnnxReader and run one warm-up inference. Returns (reader, timings) like load_reader()."""
+    from ocr_worker import warmup_image
+
+    timings = {}
+    started = time.perf_counter()
+    import onnxruntime  # noqa: F401
+    timings['onnxruntime_import_s'] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    reader = OnnxReader(model_path, threads=threads)
+    timings['model_load_s'] = round(time.perf_counter() - started, 3)
+
+    if warmup:
+        started = time.perf_counter()
+        reader.readtext(warmup_image(), detail=1, paragraph=False)
+        timings['first_inference_s'] = round(time.perf_counter() - started, 3)
+    return reader, timings
+
+
+def export_recognizer(output_path, quantize=False, opset=17):
+    """Export easyocr's English recognizer to ONNX. Returns the paths written."""
+    import easyocr
+    import torch
+
+    # quantize=False: torch's dynamically quantized LSTM does not export;
+    # ONNX Runtime quantizes the exported graph instead.
+    reader = easyocr.Reader(['en'], gpu=False, quantize=False, verbose=False)
+    model = reader.recognizer.eval()
+
+    class _Recognizer(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, image):
+            return self.inner(image, None)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    dummy = torch.zeros(1, 1, MODEL_HEIGHT, 256)
+    torch.onnx.export(
+        _Recognizer(model), dummy, output_path, opset_version=opset,
+        input_names=['image'], output_names=['logits'],
+        dynamic_axes={'image': {0: 'batch', 3: 'width'}, 'logits': {0: 'batch', 1: 'steps'}},
+    )
+    written = [output_path]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized = os.path.splitext(output_path)[0] + '_int8.onnx'
+        quantize_dynamic(output_path, quantized, weight_type=QuantType.QInt8)
+        written.append(quantized)
+
+    for path in written:
+        with open(os.path.splitext(path)[0] + '.json', 'w') as f:
+            json.dump({"characters": list(reader.converter.character), "model_height": MODEL_HEIGHT}, f)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export EasyOCR's recognizer for the ONNX Runtime backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export")
+    export.add_argument("--output", default=os.path.join("ocr_onnx", "recognizer.onnx"))
+    export.add_argument("--quantize", action="store_true", help="also write an int8 dynamically quantized copy")
+    args = parser.parse_args()
+
+    for path in export_recognizer(args.output, quantize=args.quantize):
+        print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
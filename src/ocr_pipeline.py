@@ -0,0 +1,484 @@
+"""Staged OCR pipeline behind every devil fruit check.
+
+Each scan runs: capture -> gate -> templates -> preprocess -> recognize ->
+match. A profile says which stages run, which image variants are tried in
+which order, how many capture attempts are made and how much wall time the
+scan may spend. Every stage records its latency in the stage profiler as
+ocr.<stage>.
+"""
+
+import copy
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+from event_log import log
+from ocr_matcher import KeywordMatcher
+from ocr_preprocess import OcrPreprocessor
+
+_PITY_ZERO = re.compile(r'pity[:\s]*0\s*[/o\s]*\d*', re.IGNORECASE)
+_PITY_ZERO_STRICT = re.compile(r'pity[:\s]*0', re.IGNORECASE)
+_LONE_ZERO = re.compile(r'\b0\b')
+_PITY_NUMBER = re.compile(r'pity[:\s]+([0-9ol]+)', re.IGNORECASE)
+
+# Banner terms and the OCR-tolerant fragments that count as each one
+BANNER_TERMS = {
+    'drop': ('drop',),           # Always present
+    'backpack': ('backpac',),    # "backpack" often becomes "backpacr"
+    'fruit': ('ruit',),          # "fruit" often becomes "eruit" or "ruit"
+    'devil': ('evil',),          # "devil" often becomes "devl" or "evil"
+    'got': ('got',),             # Usually readable
+    'fished': ('fish',),         # "fished" substring
+    'legendary': ('legendar',),  # "legendary" substring
+    'pity': ('pity',),           # Always with devil fruit notification
+}
+FRUIT_TERMS = tuple(BANNER_TERMS)
+DROP_TERMS = ('devil', 'fruit', 'backpack', 'drop', 'got', 'fished')
+DROP_PHRASES = (
+    'devil fruit',
+    'fished up a devil',
+    'got a devil fruit',
+    'devil fruit drop',
+    'check your backpack',
+)
+
+TEXT_MATCHER = KeywordMatcher(BANNER_TERMS, DROP_PHRASES)
+
+
+def match_fruit_and_legendary(text):
+    hits = TEXT_MATCHER.scan(text)
+    pattern_matches = hits.count(FRUIT_TERMS)
+    has_fruit = pattern_matches >= 2
+    is_legendary = False
+    if has_fruit and 'pity' in hits.terms:
+        pity_match = _PITY_NUMBER.search(text)
+        if pity_match:
+            pity_number = pity_match.group(1)
+            is_legendary = pity_number[0] in ('0', 'o', 'l') and len(pity_number) <= 2
+    return has_fruit, is_legendary, {
+        "pattern_matches": pattern_matches,
+        "score": hits.score(FRUIT_TERMS),
+        "fuzzy": hits.fuzzy(FRUIT_TERMS),
+    }
+
+
+def match_any_drop(text):
+    hits = TEXT_MATCHER.scan(text)
+    if hits.phrases:
+        return True, False, {"phrase": hits.phrases[0]}
+    keyword_matches = hits.count(DROP_TERMS)
+    return keyword_matches >= 2, False, {
+        "keyword_matches": keyword_matches,
+        "score": hits.score(DROP_TERMS),
+        "fuzzy": hits.fuzzy(DROP_TERMS),
+    }
+
+
+def match_legendary(text):
+    # "pity: 0/40", "pity: 0o", "pity 0 /", "pity:0/" and similar OCR variants
+    if _PITY_ZERO.search(text) and _PITY_ZERO_STRICT.search(text):
+        return True, True, {"reason": "pity_zero"}
+    if 'legendary' in text and _LONE_ZERO.search(text):
+        return True, True, {"reason": "legendary_zero"}
+    return False, False, {}
+
+
+MATCHERS = {
+    'fruit_and_legendary': match_fruit_and_legendary,
+    'any_drop': match_any_drop,
+    'legendary': match_legendary,
+}
+
+_AGGRESSIVE_READTEXT = {
+    'detail': 1,
+    'paragraph': False,
+    'batch_size': 1,
+    'text_threshold': 0.5,  # Lower threshold for text detection
+    'low_text': 0.3,        # Lower threshold for character detection
+    'link_threshold': 0.3,  # More aggressive text linking
+}
+
+DEFAULT_PROFILES = {
+    # Post-catch scan: one capture, raw image first, the contrast variant if the raw read is empty
+    'fruit': {
+        'matcher': 'fruit_and_legendary',
+        'variants': ['raw', 'contrast'],
+        'readtext': _AGGRESSIVE_READTEXT,
+        'attempts': 1,
+        'attempt_interval_s': 0.0,
+        'budget_s': 10.0,
+        'gate': True,
+        'templates': True,
+        'fast_path': True,
+        'learn': True,
+        'cooldown': True,
+    },
+    # Catch-anywhere check: three captures half a second apart. With
+    # batch_attempts the first capture is read on its own (a hit ends the
+    # scan), the rest are captured as a burst and read in one batched call.
+    'any_drop': {
+        'matcher': 'any_drop',
+        'variants': ['contrast'],
+        'readtext': {'detail': 0, 'paragraph': True},
+        'attempts': 3,
+        'attempt_interval_s': 0.5,
+        'batch_attempts': True,
+        'budget_s': 10.0,
+        'gate': True,
+        'templates': False,
+        'fast_path': False,
+        'learn': False,
+        'cooldown': True,
+    },
+    'legendary': {
+        'matcher': 'legendary',
+        'variants': ['contrast'],
+        'readtext': {'detail': 0, 'paragraph': True},
+        'attempts': 1,
+        'attempt_interval_s': 0.0,
+        'budget_s': 10.0,
+        'gate': True,
+        'templates': False,
+        'fast_path': False,
+        'learn': False,
+        'cooldown': False,
+    },
+}
+
+
+def _texts(results):
+    """Text pieces from readtext/recognize output in any detail/paragraph mode."""
+    return [r if isinstance(r, str) else r[1] for r in results or []]
+
+
+class ScanResult:
+    __slots__ = ('has_fruit', 'is_legendary', 'text', 'decided_by', 'timings')
+
+    def __init__(self):
+        self.has_fruit = False
+        self.is_legendary = False
+        self.text = ""
+        self.decided_by = None
+        self.timings = {}
+
+    def to_dict(self):
+        return {
+            "has_fruit": self.has_fruit,
+            "is_legendary": self.is_legendary,
+            "text": self.text,
+            "decided_by": self.decided_by,
+            "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.timings.items()},
+        }
+
+
+class OcrPipeline:
+    """Runs OCR profiles against the macro's capture area and OCR backend."""
+
+    def __init__(self, macro, overrides=None):
+        self.macro = macro
+        self.preprocessor = OcrPreprocessor()
+        self.race_wins = {}
+        self.race_count = 0
+        self.profiles = {}
+        # Scans in progress; unload_ocr holds active_lock and refuses while this is non-zero.
+        self.active = 0
+        self.active_lock = threading.Lock()
+        self.configure(overrides)
+
+    def configure(self, overrides=None):
+        """Apply {profile: {key: value}} overrides on top of DEFAULT_PROFILES."""
+        profiles = copy.deepcopy(DEFAULT_PROFILES)
+        for name, changes in (overrides or {}).items():
+            if name in profiles and isinstance(changes, dict):
+                profiles[name].update(changes)
+        self.profiles = profiles
+
+    def _timed(self, result, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._timed_since(result, stage, started)
+
+    def _timed_since(self, result, stage, started):
+        elapsed = time.perf_counter() - started
+        result.timings[stage] = result.timings.get(stage, 0.0) + elapsed
+        self.macro.profiler.record(f'ocr.{stage}', elapsed)
+
+    def run(self, name, img=None, started_at=None):
+        """Run profile `name`. img skips the first capture; started_at is the cooldown timestamp."""
+        with self.active_lock:
+            self.active += 1
+        try:
+            return self._run(name, img, started_at)
+        finally:
+            with self.active_lock:
+                self.active -= 1
+
+    def _run(self, name, img, started_at):
+        macro = self.macro
+        profile = self.profiles[name]
+        result = ScanResult()
+        if not macro._ocr_ready():
+            return result
+        # Scans settled by the gate or templates never reach the model, but still count as use.
+        macro.last_ocr_use = time.monotonic()
+
+        current_time = started_at if started_at is not None else time.time()
+        if profile['cooldown'] and img is None and current_time - macro.last_ocr_time < macro.ocr_cooldown:
+            return result
+
+        started = time.perf_counter()
+        try:
+            self._run_attempts(profile, result, img, started)
+        except Exception as e:
+            log.error('ocr_error', "OCR detection error", profile=name, error=str(e))
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            result.timings['total'] = elapsed
+            macro.profiler.record('ocr.total', elapsed)
+
+        if profile['cooldown']:
+            macro.last_ocr_time = current_time
+        if result.text:
+            macro.last_ocr_text = result.text
+        self._log_result(name, result)
+        return result
+
+    def _run_attempts(self, profile, result, img, started):
+        macro = self.macro
+        matcher = MATCHERS[profile['matcher']]
+        for attempt in range(profile['attempts']):
+            if attempt == 1 and profile.get('batch_attempts'):
+                self._run_burst(profile, result, matcher, started)
+                return
+            if attempt > 0:
+                if time.perf_counter() - started + profile['attempt_interval_s'] > profile['budget_s']:
+                    log.debug('ocr_budget_exhausted', "OCR budget spent, skipping remaining attempts")
+                    return
+                time.sleep(profile['attempt_interval_s'])
+            if img is None or attempt > 0:
+                img = self._timed(result, 'capture', macro.capture_ocr_area)
+
+            if profile['gate'] and not self._timed(result, 'gate', self._banner_present, img):
+                result.decided_by = 'gate'
+                continue
+
+            # A template match only confirms a banner; OCR always runs, and
+            # when it disagrees every variant is tried before settling.
+            template_fruit = False
+            if profile['templates'] and macro.template_detector_enabled and macro.template_detector.ready:
+                template_fruit = bool(self._timed(result, 'templates', macro.template_detector.classify, img))
+            accept = (lambda text: matcher(text)[0]) if template_fruit else None
+
+            text, line_results, rgb = self._recognize(profile, result, img, started, accept=accept)
+            if template_fruit:
+                has_fruit, is_legendary, details = self._timed(result, 'match', matcher, text) if text else (False, False, {})
+                if not has_fruit:
+                    # Keep the fruit rather than drop it, but the read can't say whether it is legendary.
+                    is_legendary = bool(text) and match_legendary(text)[1]
+                    log.warning('ocr_template_disagreement', "Banner template matched but OCR did not confirm it",
+                                text=text[:80], legendary=is_legendary)
+                    result.text = text
+                    result.has_fruit, result.is_legendary = True, is_legendary
+                    result.decided_by = 'ambiguous'
+                    continue
+            elif not text:
+                result.decided_by = 'no_text'
+                continue
+            else:
+                has_fruit, is_legendary, details = self._timed(result, 'match', matcher, text)
+
+            result.text = text
+            log.debug('ocr_patterns', "OCR text matched", has_fruit=has_fruit, template_fruit=template_fruit, **details)
+            result.has_fruit, result.is_legendary = has_fruit, is_legendary
+            result.decided_by = 'ocr'
+            if has_fruit:
+                if profile['learn'] and line_results:
+                    self._learn(img, rgb, line_results)
+                return
+
+    def _run_burst(self, profile, result, matcher, started):
+        """Capture the remaining attempts back to back and read them in one readtext_batched call."""
+        macro = self.macro
+        frames = []
+        for _ in range(profile['attempts'] - 1):
+            if time.perf_counter() - started + profile['attempt_interval_s'] > profile['budget_s']:
+                log.debug('ocr_budget_exhausted', "OCR budget spent, skipping remaining attempts")
+                break
+            time.sleep(profile['attempt_interval_s'])
+            frame = self._timed(result, 'capture', macro.capture_ocr_area)
+            if profile['gate'] and not self._timed(result, 'gate', self._banner_present, frame):
+                continue
+            frames.append(self._timed(result, 'preprocess', self._prepare, profile['variants'][0], frame, reuse=False))
+        if not frames:
+            return
+
+        if all(frame.shape == frames[0].shape for frame in frames):
+            batch = self._timed(result, 'recognize', macro._ocr_call, 'readtext_batched', np.stack(frames), **profile['readtext'])
+        else:
+            batch = [self._timed(result, 'recognize', macro._readtext, frame, **profile['readtext']) for frame in frames]
+
+        for results in batch:
+            text = ' '.join(_texts(results)).lower()
+            if not text:
+                continue
+            result.text = text
+            has_fruit, is_legendary, details = self._timed(result, 'match', matcher, text)
+            log.debug('ocr_patterns', "OCR text matched", has_fruit=has_fruit, **details)
+            result.has_fruit, result.is_legendary = has_fruit, is_legendary
+            result.decided_by = 'ocr_batched'
+            if has_fruit:
+                return
+
+    def _recognize(self, profile, result, img, started, accept=None):
+        """Try the profile's variants in order until one yields text (that accept() takes, if given).
+
+        With accept, the first text read is returned when no variant passes it.
+        """
+        macro = self.macro
+        if macro.ocr_race_variants and len(profile['variants']) > 1:
+            return self._race_variants(profile, result, img, started)
+        fallback = ("", None, None)
+        for index, variant in enumerate(profile['variants']):
+            if index > 0:
+                if time.perf_counter() - started > profile['budget_s']:
+                    log.debug('ocr_budget_exhausted', "OCR budget spent, skipping remaining variants")
+                    break
+                log.debug('ocr_retry_variant', "No usable text yet, trying next variant", variant=variant)
+            prepared = self._timed(result, 'preprocess', self._prepare, variant, img)
+
+            if variant == 'raw' and profile['fast_path'] and macro.ocr_fast_path_enabled:
+                text = self._timed(result, 'recognize', self._recognize_known_lines, img)
+                if text:
+                    if accept is None or accept(text):
+                        return text, None, prepared
+                    fallback = fallback if fallback[0] else (text, None, prepared)
+
+            results = self._timed(result, 'recognize', macro._readtext, prepared, **profile['readtext'])
+            text = ' '.join(_texts(results)).lower()
+            if text:
+                line_results = results if variant == 'raw' and profile['readtext'].get('detail', 1) == 1 \
+                    and not profile['readtext'].get('paragraph') else None
+                if accept is None or accept(text):
+                    return text, line_results, prepared
+                fallback = fallback if fallback[0] else (text, line_results, prepared)
+        return fallback
+
+    def _race_variants(self, profile, result, img, started):
+        """Read every variant at once; the first whose text passes the matcher wins, the rest are cancelled.
+
+        Without a winner, the earliest variant in profile order that read
+        any text is used, as the sequential path would have.
+        """
+        macro = self.macro
+        matcher = MATCHERS[profile['matcher']]
+        variants = profile['variants']
+        if 'raw' in variants and profile['fast_path'] and macro.ocr_fast_path_enabled:
+            text = self._timed(result, 'recognize', self._recognize_known_lines, img)
+            if text:
+                return text, None, self._prepare('raw', img)
+
+        prepared = {variant: self._timed(result, 'preprocess', self._prepare, variant, img, reuse=False)
+                    for variant in variants}
+        recognize_started = time.perf_counter()
+        futures = {macro._ocr_submit('readtext', image, **profile['readtext']): variant
+                   for variant, image in prepared.items()}
+        texts, winner = {}, None
+        pending = set(futures)
+        deadline = started + profile['budget_s']
+        try:
+            while pending and winner is None:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()), return_when=FIRST_COMPLETED)
+                if not done:
+                    log.debug('ocr_budget_exhausted', "OCR budget spent while racing variants")
+                    break
+                for future in done:
+                    variant = futures[future]
+                    if future.exception() is not None:
+                        log.debug('ocr_race_error', "OCR variant failed", variant=variant, error=str(future.exception()))
+                        continue
+                    results = future.result()
+                    text = ' '.join(_texts(results)).lower()
+                    texts[variant] = (text, results)
+                    if text and matcher(text)[0]:
+                        winner = variant
+                        break
+        finally:
+            for future in pending:
+                macro._ocr_cancel(future)
+            self._timed_since(result, 'recognize', recognize_started)
+
+        if winner is None:
+            winner = next((v for v in variants if texts.get(v, ("",))[0]), None)
+            if winner is None:
+                return "", None, None
+        self.race_count += 1
+        self.race_wins[winner] = self.race_wins.get(winner, 0) + 1
+        log.debug('ocr_race_won', "OCR variant race decided", variant=winner, cancelled=len(pending))
+        text, results = texts[winner]
+        line_results = results if winner == 'raw' and profile['readtext'].get('detail', 1) == 1 \
+            and not profile['readtext'].get('paragraph') else None
+        return text, line_results, prepared[winner]
+
+    def race_stats(self):
+        return {
+            "races": self.race_count,
+            "wins": dict(self.race_wins),
+            "win_rate": {variant: round(wins / self.race_count, 4) for variant, wins in self.race_wins.items()},
+        }
+
+    def _prepare(self, variant, img, reuse=True):
+        return self.preprocessor.prepare(variant, img, reuse=reuse)
+
+    def _banner_present(self, img):
+        macro = self.macro
+        if macro.save_ocr_samples:
+            macro._save_ocr_sample(img)
+        if not macro.ocr_gate_enabled:
+            return True
+        present = macro.banner_gate.is_present(img)
+        if not present:
+            log.debug('ocr_gated', "No banner in OCR area, skipping readtext")
+        return present
+
+    def _recognize_known_lines(self, img):
+        """Recognizer-only read of the learned banner lines; None when unsure."""
+        macro = self.macro
+        layout = macro.text_layout
+        boxes = layout.boxes_for(img.shape)
+        if boxes is None:
+            return None
+        gray = self.preprocessor.prepare('gray', img)
+        results = macro._ocr_call('recognize', gray, horizontal_list=boxes, free_list=[], detail=1, batch_size=len(boxes))
+        if not layout.confident(results):
+            layout.fallbacks += 1
+            log.debug('ocr_fast_path_fallback', "Low confidence on known text lines, running full OCR")
+            return None
+        layout.hits += 1
+        return ' '.join(_texts(results)).lower()
+
+    def _learn(self, img, rgb, line_results):
+        macro = self.macro
+        if macro.text_layout.learn(line_results, rgb.shape):
+            log.info('ocr_layout_learned', "Learned devil fruit banner text lines", lines=len(macro.text_layout.lines))
+            macro.ocr_text_layout = macro.text_layout.to_dict()
+            macro.save_settings()
+        if macro.template_detector_enabled:
+            added = macro.template_detector.harvest(img, line_results)
+            if added:
+                log.info('ocr_templates_harvested', "Saved banner templates from OCR read", kinds=added)
+
+    @staticmethod
+    def _log_result(name, result):
+        if result.decided_by == 'no_text':
+            log.info('ocr_no_text', "OCR detected no text in scan area", profile=name)
+        elif result.has_fruit:
+            fruit_type = "LEGENDARY+" if result.is_legendary else "Common/Rare"
+            log.info('fruit_detected', "Devil fruit detected", profile=name, fruit_type=fruit_type, decided_by=result.decided_by)
+        elif result.text:
+            log.info('ocr_no_fruit', "No devil fruit keywords in OCR text", profile=name, text=result.text[:80])
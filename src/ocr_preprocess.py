@@ -0,0 +1,84 @@
+import threading
+
+import cv2
+import numpy as np
+
+VARIANTS = ('raw', 'gray', 'contrast', 'binarized', 'upscaled')
+
+# Names used by OCR profiles saved before the variants were split out
+ALIASES = {'preprocessed': 'contrast'}
+
+
+class OcrPreprocessor:
+    """Turns a BGRA capture into the image EasyOCR reads, one cv2 call per step.
+
+    Variants:
+        raw        RGB, as captured
+        gray       grayscale straight from BGRA
+        contrast   gray, shrunk to fit max_width x max_height, then
+                   alpha * x + beta (the original preprocess_image_for_ocr)
+        binarized  contrast, then an Otsu threshold
+        upscaled   contrast, enlarged by `upscale` for small banner text
+
+    Every step writes into a buffer kept per thread and per shape, so the
+    steady state allocates nothing. A returned array is only valid until
+    the next prepare() on the same thread; pass reuse=False to get an array
+    the caller owns (for example to keep several frames for a batch).
+    """
+
+    def __init__(self, max_width=800, max_height=600, alpha=1.2, beta=10, upscale=2.0):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.alpha = alpha
+        self.beta = beta
+        self.upscale = upscale
+        self._local = threading.local()
+
+    def _out(self, name, shape, reuse):
+        if not reuse:
+            return np.empty(shape, dtype=np.uint8)
+        buffers = self._local.__dict__.setdefault('buffers', {})
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def prepare(self, variant, img, reuse=True):
+        variant = ALIASES.get(variant, variant)
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown OCR variant: {variant}")
+        return getattr(self, '_' + variant)(img, reuse)
+
+    def _raw(self, img, reuse):
+        if img.ndim == 2:
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2RGB, dst=self._out('raw', img.shape + (3,), reuse))
+        code = cv2.COLOR_BGRA2RGB if img.shape[2] == 4 else cv2.COLOR_BGR2RGB
+        return cv2.cvtColor(img, code, dst=self._out('raw', img.shape[:2] + (3,), reuse))
+
+    def _gray(self, img, reuse, name='gray'):
+        if img.ndim == 2:
+            return img
+        code = cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(img, code, dst=self._out(name, img.shape[:2], reuse))
+
+    def _contrast(self, img, reuse):
+        gray = self._gray(img, reuse, 'contrast.gray')
+        height, width = gray.shape
+        if width > self.max_width or height > self.max_height:
+            scale = min(self.max_width / width, self.max_height / height)
+            size = (int(width * scale), int(height * scale))
+            gray = cv2.resize(gray, size, dst=self._out('contrast.small', size[::-1], reuse),
+                              interpolation=cv2.INTER_LINEAR)
+        return cv2.convertScaleAbs(gray, dst=self._out('contrast', gray.shape, reuse), alpha=self.alpha, beta=self.beta)
+
+    def _binarized(self, img, reuse):
+        contrast = self._contrast(img, reuse)
+        out = self._out('binarized', contrast.shape, reuse)
+        cv2.threshold(contrast, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU, dst=out)
+        return out
+
+    def _upscaled(self, img, reuse):
+        contrast = self._contrast(img, reuse)
+        height, width = contrast.shape
+        size = (int(width * self.upscale), int(height * self.upscale))
+        return cv2.resize(contrast, size, dst=self._out('upscaled', size[::-1], reuse), interpolation=cv2.INTER_CUBIC)
@@ -0,0 +1,120 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+TEMPLATE_KINDS = ('banner',)
+
+
+class TemplateDetector:
+    """Answers "is there a devil fruit banner" with cv2.matchTemplate.
+
+    The library is a folder of grayscale crops taken from real captures:
+    banner_*.png is a line of the devil fruit banner. Crops are harvested
+    automatically from OCR reads that confirmed a fruit (see harvest()), so
+    the library matches the player's resolution and UI scale.
+
+    classify() returns True when the best normalized correlation is at or
+    above `high`, and None otherwise, meaning EasyOCR should decide. A low
+    score is never a "no": a banner line includes the fruit's name, so a
+    template from one fruit scores low against every other fruit. Whether
+    the fruit is legendary is never answered here either: a crop of the pity
+    line matches every other pity value almost as well as its own, so the
+    pity number is always read by OCR.
+    """
+
+    def __init__(self, directory, high=0.85, max_per_kind=3):
+        self.directory = str(directory)
+        self.high = high
+        self.max_per_kind = max_per_kind
+        self.templates = {kind: [] for kind in TEMPLATE_KINDS}
+        self.decided = 0
+        self.ambiguous = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return bool(self.templates['banner'])
+
+    def load(self):
+        templates = {kind: [] for kind in TEMPLATE_KINDS}
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                kind = next((k for k in TEMPLATE_KINDS if name.startswith(k + '_') and name.endswith('.png')), None)
+                if kind is None:
+                    continue
+                template = cv2.imread(os.path.join(self.directory, name), cv2.IMREAD_GRAYSCALE)
+                if template is not None:
+                    templates[kind].append(template)
+        with self._lock:
+            self.templates = templates
+        return {kind: len(items) for kind, items in templates.items()}
+
+    @staticmethod
+    def _gray(img):
+        if img.ndim == 2:
+            return img
+        if img.shape[2] == 4:
+            return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    @staticmethod
+    def _best_score(gray, templates):
+        best = None
+        for template in templates:
+            if template.shape[0] > gray.shape[0] or template.shape[1] > gray.shape[1]:
+                continue
+            score = float(cv2.matchTemplate(gray, template, cv2.TM_CCOEFF_NORMED).max())
+            best = score if best is None else max(best, score)
+        return best
+
+    def scores(self, img):
+        gray = self._gray(img)
+        with self._lock:
+            templates = dict(self.templates)
+        return {kind: self._best_score(gray, templates[kind]) for kind in TEMPLATE_KINDS}
+
+    def classify(self, img):
+        banner = self.scores(img)['banner']
+        if banner is None or banner < self.high:
+            self.ambiguous += 1
+            return None
+        self.decided += 1
+        return True
+
+    def harvest(self, img, line_results):
+        """Save banner line crops from a confirmed fruit read as new templates. Returns the kinds added."""
+        gray = self._gray(img)
+        added = []
+        for points, text, _conf in line_results:
+            text = text.lower()
+            # The pity line differs between drops only in its digits, so it is never a template.
+            if 'pity' not in text and ('devil' in text or 'fruit' in text):
+                kind = 'banner'
+            else:
+                kind = None
+            if kind is None or kind in added or len(self.templates[kind]) >= self.max_per_kind:
+                continue
+            xs = [int(p[0]) for p in points]
+            ys = [int(p[1]) for p in points]
+            crop = gray[max(min(ys), 0):max(ys), max(min(xs), 0):max(xs)]
+            if crop.size == 0 or crop.shape[0] < 8 or crop.shape[1] < 16:
+                continue
+            crop = np.ascontiguousarray(crop)
+            os.makedirs(self.directory, exist_ok=True)
+            index = len(self.templates[kind])
+            cv2.imwrite(os.path.join(self.directory, f"{kind}_{index}.png"), crop)
+            with self._lock:
+                self.templates[kind] = self.templates[kind] + [crop]
+            added.append(kind)
+        return added
+
+    def stats(self):
+        checks = self.decided + self.ambiguous
+        return {
+            "templates": {kind: len(items) for kind, items in self.templates.items()},
+            "decided": self.decided,
+            "ambiguous": self.ambiguous,
+            "decided_rate": round(self.decided / checks, 4) if checks else 0.0,
+        }
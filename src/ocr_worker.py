@@ -0,0 +1,523 @@
+"""Out-of-process EasyOCR worker.
+
+The worker is this app relaunched with --ocr-worker (see main.py), so frozen
+builds go through the same DLL bootstrap as the UI process. Images travel
+through shared memory; requests and results are small pickled messages,
+length-prefixed, on the child's stdin/stdout.
+"""
+
+import itertools
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from event_log import log
+
+WORKER_FLAG = '--ocr-worker'
+
+# easyocr.Reader methods a client may call on a shared-memory image
+READER_METHODS = ('readtext', 'readtext_batched', 'recognize', 'detect')
+
+_HEADER = struct.Struct('<I')
+
+
+class OcrWorkerError(RuntimeError):
+    pass
+
+
+def _read_exact(fd, size):
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            raise EOFError
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _send(fd, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    view = memoryview(_HEADER.pack(len(data)) + data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _recv(fd):
+    size, = _HEADER.unpack(_read_exact(fd, _HEADER.size))
+    return pickle.loads(_read_exact(fd, size))
+
+
+def _to_plain(value):
+    """Convert readtext output (numpy scalars/arrays in tuples) to plain Python objects."""
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def process_rss_mb(pid=None):
+    """Resident set size of a process (default: this one) in MB, or None if unavailable."""
+    try:
+        if os.name == 'nt':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ('cb', wintypes.DWORD),
+                    ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t),
+                    ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t),
+                    ('PeakPagefileUsage', ctypes.c_size_t),
+                ]
+
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            kernel32.OpenProcess.restype = wintypes.HANDLE
+            kernel32.K32GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD]
+            if pid is None:
+                handle = kernel32.GetCurrentProcess()
+            else:
+                # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+                handle = kernel32.OpenProcess(0x1000 | 0x0010, False, pid)
+                if not handle:
+                    return None
+            try:
+                counters = PROCESS_MEMORY_COUNTERS()
+                counters.cb = ctypes.sizeof(counters)
+                if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                    return None
+                return round(counters.WorkingSetSize / (1024 * 1024), 1)
+            finally:
+                if pid is not None:
+                    kernel32.CloseHandle(handle)
+
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except Exception:
+        pass
+    return None
+
+
+def warmup_image():
+    """A synthetic devil fruit banner used to warm the model up before the first real scan."""
+    import cv2
+
+    img = np.full((160, 640, 3), (40, 90, 120), dtype=np.uint8)
+    for text, y in (("You fished up a Devil Fruit!", 60), ("Pity: 12/40", 120)):
+        cv2.putText(img, text, (20, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 5)
+        cv2.putText(img, text, (20, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    return img
+
+
+def load_reader(reader_kwargs=None, warmup=True):
+    """Import torch and easyocr, build the reader and run one warm-up inference.
+
+    Returns (reader, timings) with each step's duration in seconds, so
+    the first real scan runs at steady-state speed.
+    """
+    timings = {}
+    started = time.perf_counter()
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        pass
+    timings['torch_import_s'] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    import easyocr
+    timings['easyocr_import_s'] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    reader = easyocr.Reader(['en'], gpu=False, verbose=False, **(reader_kwargs or {}))
+    timings['model_load_s'] = round(time.perf_counter() - started, 3)
+
+    if warmup:
+        started = time.perf_counter()
+        reader.readtext(warmup_image(), detail=1, paragraph=False, batch_size=1)
+        timings['first_inference_s'] = round(time.perf_counter() - started, 3)
+    return reader, timings
+
+
+def worker_command():
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, WORKER_FLAG]
+    main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    return [sys.executable, main_script, WORKER_FLAG]
+
+
+def serve():
+    """Child side: load EasyOCR once, then answer requests until stdin closes."""
+    # Keep the protocol on private copies of stdin/stdout so stray prints from
+    # torch or easyocr can't corrupt it.
+    in_fd = os.dup(0)
+    out_fd = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+
+    try:
+        options = _recv(in_fd)
+    except EOFError:
+        return
+
+    try:
+        reader, timings = load_reader(options.get('reader_kwargs'), warmup=options.get('warmup', True))
+        _send(out_fd, ('ready', dict(timings, pid=os.getpid())))
+    except Exception as e:
+        _send(out_fd, ('init_failed', f"{type(e).__name__}: {e}"))
+        return
+
+    send_lock = threading.Lock()
+    cancelled = set()
+
+    def reply(message):
+        with send_lock:
+            _send(out_fd, message)
+
+    def run(request_id, method, img, kwargs):
+        if request_id in cancelled:
+            cancelled.discard(request_id)
+            reply(('cancelled', request_id))
+            return
+        try:
+            started = time.perf_counter()
+            if method == 'readtext_batched':
+                # Frames arrive stacked in one segment; the reader wants a list
+                results = reader.readtext_batched(list(img), **kwargs)
+            else:
+                results = getattr(reader, method)(img, **kwargs)
+            reply(('result', request_id, _to_plain(results), time.perf_counter() - started))
+        except Exception as e:
+            reply(('error', request_id, f"{type(e).__name__}: {e}"))
+
+    # Calls run on a pool so this loop keeps reading: a 'cancel' reaches a
+    # queued request before it starts, and with concurrency > 1 several
+    # requests run at once (torch releases the GIL during inference).
+    executor = ThreadPoolExecutor(max_workers=max(1, int(options.get('concurrency', 1))))
+    segments = {}
+    released = []
+
+    def close_released():
+        # A call that just replied may still hold a view of its segment for
+        # a moment; such segments are retried on the next message.
+        for segment in list(released):
+            try:
+                segment.close()
+                released.remove(segment)
+            except BufferError:
+                pass
+
+    while True:
+        try:
+            message = _recv(in_fd)
+        except EOFError:
+            break
+        if message[0] == 'close':
+            break
+        close_released()
+        if message[0] == 'release':
+            # The parent is unlinking this segment; drop our mapping too.
+            segment = segments.pop(message[1], None)
+            if segment is not None:
+                released.append(segment)
+                close_released()
+            continue
+        if message[0] == 'cancel':
+            if len(cancelled) > 1000:
+                cancelled.clear()
+            cancelled.add(message[1])
+            continue
+        _, request_id, method, segment_name, shape, kwargs = message
+        try:
+            segment = segments.get(segment_name)
+            if segment is None:
+                segment = shared_memory.SharedMemory(name=segment_name)
+                if os.name != 'nt':
+                    # The parent owns the segment; don't let this process's
+                    # resource tracker unlink it on exit.
+                    from multiprocessing import resource_tracker
+                    resource_tracker.unregister(segment._name, 'shared_memory')
+                segments[segment_name] = segment
+            img = np.ndarray(shape, dtype=np.uint8, buffer=segment.buf)
+        except Exception as e:
+            reply(('error', request_id, f"{type(e).__name__}: {e}"))
+            continue
+        executor.submit(run, request_id, method, img, kwargs)
+
+    executor.shutdown(wait=True, cancel_futures=True)
+    for segment in list(segments.values()) + released:
+        segment.close()
+
+
+class _Request:
+    __slots__ = ('future', 'segment', 'submitted')
+
+    def __init__(self, future, segment):
+        self.future = future
+        self.segment = segment
+        self.submitted = time.monotonic()
+
+
+class OcrWorker:
+    """Parent side: owns the worker process and hands out OCR futures.
+
+    submit() copies the image into a shared memory segment and returns a
+    concurrent.futures.Future that resolves to exactly what
+    reader.<method>(img, **kwargs) would return. A request running longer
+    than request_timeout is treated as a hang: the worker is killed, its
+    pending futures fail with OcrWorkerError and it is restarted, at most
+    max_restarts times per restart_window seconds.
+
+    concurrency is how many requests the worker runs at the same time;
+    cancel() drops a request the caller no longer needs.
+    """
+
+    def __init__(self, reader_kwargs=None, request_timeout=15.0, start_timeout=120.0,
+                 max_restarts=3, restart_window=300.0, warmup=True, concurrency=1):
+        self.reader_kwargs = reader_kwargs or {}
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.ready = Future()
+        self.info = {}
+        self.restarts = []
+        self._process = None
+        self._in_fd = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._free_segments = []
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._started_at = time.perf_counter()
+
+    @property
+    def pid(self):
+        return self._process.pid if self._process is not None else None
+
+    @property
+    def alive(self):
+        return self.ready.done() and not self.ready.exception() and self._process is not None and self._process.poll() is None
+
+    def start(self):
+        """Launch the worker. Returns a Future that resolves once the model is loaded."""
+        if self._closed:
+            raise OcrWorkerError("OCR worker is closed")
+        self.ready = Future()
+        self.ready.set_running_or_notify_cancel()
+        env = dict(os.environ)
+        env.setdefault('KMP_DUPLICATE_LIB_OK', 'TRUE')
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        self._process = subprocess.Popen(
+            worker_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            creationflags=creationflags,
+        )
+        self._in_fd = self._process.stdin.fileno()
+        self._started_at = time.perf_counter()
+        _send(self._in_fd, {'reader_kwargs': self.reader_kwargs, 'warmup': self.warmup, 'concurrency': self.concurrency})
+        process = self._process
+        threading.Thread(target=self._read_loop, args=(process,), name="ocr-worker-reader", daemon=True).start()
+        threading.Thread(target=self._supervise, args=(process,), name="ocr-worker-supervisor", daemon=True).start()
+        return self.ready
+
+    def submit(self, img, method='readtext', **kwargs):
+        if method not in READER_METHODS:
+            raise ValueError(f"Unsupported OCR method: {method}")
+        if not self.alive:
+            raise OcrWorkerError("OCR worker is not running")
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        segment = self._acquire_segment(img.nbytes)
+        np.ndarray(img.shape, dtype=np.uint8, buffer=segment.buf)[...] = img
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+        request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = _Request(future, segment)
+        try:
+            with self._send_lock:
+                _send(self._in_fd, ('call', request_id, method, segment.name, img.shape, kwargs))
+        except OSError as e:
+            self._finish(request_id, error=OcrWorkerError(f"OCR worker pipe closed: {e}"))
+        return future
+
+    def call(self, method, img, timeout=None, **kwargs):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(img, method, **kwargs).result(timeout=timeout or self.request_timeout)
+
+    def readtext(self, img, timeout=None, **kwargs):
+        return self.call('readtext', img, timeout, **kwargs)
+
+    def cancel(self, future):
+        """Fail a submitted future with CancelledError; the worker skips the request if it has not started."""
+        with self._lock:
+            request_id = next((rid for rid, request in self._pending.items() if request.future is future), None)
+        if request_id is None:
+            return False
+        try:
+            future.set_exception(CancelledError())
+        except InvalidStateError:
+            return False  # finished meanwhile
+        try:
+            with self._send_lock:
+                _send(self._in_fd, ('cancel', request_id))
+        except OSError:
+            pass
+        return True
+
+    def close(self):
+        self._closed = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            try:
+                with self._send_lock:
+                    _send(self._in_fd, ('close',))
+                process.wait(timeout=2.0)
+            except Exception:
+                process.kill()
+        self._fail_pending(OcrWorkerError("OCR worker closed"))
+        with self._lock:
+            segments, self._free_segments = self._free_segments, []
+        for segment in segments:
+            self._destroy_segment(segment)
+
+    def _acquire_segment(self, nbytes):
+        with self._lock:
+            for index, segment in enumerate(self._free_segments):
+                if segment.size >= nbytes:
+                    return self._free_segments.pop(index)
+        return shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+
+    def _release_segment(self, segment):
+        with self._lock:
+            if len(self._free_segments) < 8:
+                self._free_segments.append(segment)
+                return
+        if self.alive:
+            # Otherwise the worker keeps its mapping (and the memory) until it exits.
+            try:
+                with self._send_lock:
+                    _send(self._in_fd, ('release', segment.name))
+            except Exception:
+                pass
+        self._destroy_segment(segment)
+
+    @staticmethod
+    def _destroy_segment(segment):
+        try:
+            segment.close()
+            segment.unlink()
+        except Exception:
+            pass
+
+    def _finish(self, request_id, result=None, error=None):
+        with self._lock:
+            request = self._pending.pop(request_id, None)
+        if request is None:
+            return
+        # The segment stays reserved until the worker answers, even for a
+        # cancelled request it may still be reading.
+        self._release_segment(request.segment)
+        try:
+            if error is not None:
+                request.future.set_exception(error)
+            else:
+                request.future.set_result(result)
+        except InvalidStateError:
+            pass  # cancelled by the caller
+
+    def _fail_pending(self, error):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for request in pending.values():
+            self._release_segment(request.segment)
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    def _read_loop(self, process):
+        out_fd = process.stdout.fileno()
+        try:
+            while True:
+                message = _recv(out_fd)
+                kind = message[0]
+                if kind == 'ready':
+                    self.info = dict(message[1], process_ready_s=round(time.perf_counter() - self._started_at, 3))
+                    self.ready.set_result(self.info)
+                elif kind == 'init_failed':
+                    self.ready.set_exception(OcrWorkerError(message[1]))
+                    break
+                elif kind == 'result':
+                    self._finish(message[1], result=message[2])
+                elif kind == 'error':
+                    self._finish(message[1], error=OcrWorkerError(message[2]))
+                elif kind == 'cancelled':
+                    self._finish(message[1])
+        except (EOFError, OSError):
+            pass
+
+        if not self.ready.done():
+            self.ready.set_exception(OcrWorkerError("OCR worker exited during start-up"))
+        self._fail_pending(OcrWorkerError("OCR worker exited"))
+        if process.poll() is None:
+            process.kill()
+        if process is self._process and not self._closed and self.ready.exception() is None:
+            self._restart()
+
+    def _supervise(self, process):
+        started = time.monotonic()
+        while process.poll() is None and process is self._process and not self._closed:
+            time.sleep(0.5)
+            now = time.monotonic()
+            if not self.ready.done():
+                if now - started > self.start_timeout:
+                    process.kill()
+                continue
+            with self._lock:
+                overdue = any(now - r.submitted > self.request_timeout for r in self._pending.values())
+            if overdue:
+                # A hung inference; killing the process wakes _read_loop,
+                # which fails the pending futures and restarts the worker.
+                log.warning('ocr_worker_hung', "OCR request timed out, killing worker", timeout_s=self.request_timeout)
+                process.kill()
+
+    def _restart(self):
+        now = time.monotonic()
+        self.restarts = [t for t in self.restarts if now - t < self.restart_window]
+        if len(self.restarts) >= self.max_restarts:
+            log.error('ocr_worker_gave_up', "OCR worker keeps exiting, not restarting it", restarts=len(self.restarts))
+            self._process = None
+            return
+        self.restarts.append(now)
+        log.warning('ocr_worker_restart', "OCR worker exited, restarting", restarts=len(self.restarts))
+        try:
+            self.start()
+        except Exception:
+            self._process = None
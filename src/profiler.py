@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _Ring:
+    __slots__ = ('samples', 'index', 'total')
+
+    def __init__(self, capacity):
+        self.samples = [0.0] * capacity
+        self.index = 0
+        self.total = 0
+
+
+class StageProfiler:
+    """Per-stage timings for the control loop, kept in fixed-size ring buffers.
+
+    record() is a list store and two integer updates, so it is cheap enough
+    to leave on in production. Only the macro thread writes; readers take a
+    copy of the ring, so a summary may miss the sample being written.
+    """
+
+    def __init__(self, capacity=4096, enabled=True):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._rings = {}
+        self._create_lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        ring = self._rings.get(stage)
+        if ring is None:
+            with self._create_lock:
+                ring = self._rings.setdefault(stage, _Ring(self.capacity))
+        ring.samples[ring.index] = seconds
+        ring.index = (ring.index + 1) % self.capacity
+        ring.total += 1
+
+    def reset(self):
+        with self._create_lock:
+            self._rings = {}
+
+    def summary(self):
+        """Return {stage: {count, p50_ms, p95_ms, p99_ms, max_ms}} over the current windows."""
+        result = {}
+        for stage, ring in list(self._rings.items()):
+            filled = min(ring.total, self.capacity)
+            if filled == 0:
+                continue
+            data = np.asarray(ring.samples[:filled], dtype=np.float64) * 1000
+            p50, p95, p99 = np.percentile(data, [50, 95, 99])
+            result[stage] = {
+                "count": ring.total,
+                "p50_ms": round(float(p50), 4),
+                "p95_ms": round(float(p95), 4),
+                "p99_ms": round(float(p99), 4),
+                "max_ms": round(float(data.max()), 4),
+            }
+        return result
+
+    def dump(self, path):
+        data = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "window": self.capacity,
+            "stages": self.summary(),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+        return data
+
+
+CYCLE_PHASES = (
+    'pre_cast',
+    'rod_select',
+    'cast',
+    'bite_wait',
+    'minigame',
+    'ocr',
+    'fruit_storage',
+    'end_delay',
+)
+
+
+class CycleAccounting:
+    """Wall time spent in each phase of the fishing cycle.
+
+    The macro loop add()s time to the open cycle and calls end_cycle() after
+    fish_end_delay. A cycle that ends without a bite (recast timeout) or is
+    cut short by Stop or an error is closed with abort_cycle() instead: it
+    is kept as its own row marked "aborted", and its time is left out of
+    the per-cycle totals and distributions. Totals cover the whole session;
+    per-phase distributions and the raw per-cycle rows keep only the most
+    recent cycles.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self.totals = dict.fromkeys(CYCLE_PHASES, 0.0)
+        self.cycle_count = 0
+        self.aborted_count = 0
+        self.aborted_s = 0.0
+        self.history = deque(maxlen=self.capacity)
+        self._distributions = StageProfiler(capacity=self.capacity)
+        self._current = {}
+
+    def add(self, phase, seconds):
+        self._current[phase] = self._current.get(phase, 0.0) + seconds
+
+    def _row(self):
+        cycle = {phase: round(self._current.get(phase, 0.0), 4) for phase in CYCLE_PHASES}
+        cycle["total"] = round(sum(self._current.values()), 4)
+        cycle["ended_at"] = round(time.time(), 3)
+        return cycle
+
+    def abort_cycle(self, reason):
+        """Close the open cycle as aborted, so its time isn't carried into the next one."""
+        if not self._current:
+            return
+        cycle = self._row()
+        cycle["aborted"] = reason
+        self.history.append(cycle)
+        self.aborted_count += 1
+        self.aborted_s += sum(self._current.values())
+        self._current = {}
+
+    def end_cycle(self):
+        if not self._current:
+            return
+        cycle = self._row()
+        for phase, seconds in self._current.items():
+            self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+        for phase in CYCLE_PHASES:
+            self._distributions.record(phase, self._current.get(phase, 0.0))
+        self._distributions.record('total', sum(self._current.values()))
+        self.history.append(cycle)
+        self.cycle_count += 1
+        self._current = {}
+
+    def summary(self):
+        """Return session totals, each phase's share of cycle time and its distribution."""
+        accounted = sum(self.totals.values())
+        distributions = self._distributions.summary()
+        phases = {}
+        for phase in CYCLE_PHASES:
+            total = self.totals.get(phase, 0.0)
+            phases[phase] = {
+                "total_s": round(total, 2),
+                "share": round(total / accounted, 4) if accounted > 0 else 0.0,
+                "mean_s": round(total / self.cycle_count, 3) if self.cycle_count else 0.0,
+                "distribution": distributions.get(phase),
+            }
+        return {
+            "cycles": self.cycle_count,
+            "accounted_s": round(accounted, 2),
+            "aborted": {"cycles": self.aborted_count, "total_s": round(self.aborted_s, 2)},
+            "cycle": distributions.get('total'),
+            "phases": phases,
+        }
+
+    def dump(self, path):
+        data = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "summary": self.summary(),
+            "recent_cycles": list(self.history),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+        return data
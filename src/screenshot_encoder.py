@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+FORMATS = {
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+    'png': ('.png', 'image/png', None),
+}
+
+QUALITY_STEPS = (90, 80, 70, 60, 50, 40)
+MAX_SHRINKS = 3
+
+
+class EncodedImage:
+    __slots__ = ('data', 'extension', 'mime', 'width', 'height', 'quality', 'encode_s')
+
+    def __init__(self, data, extension, mime, width, height, quality, encode_s):
+        self.data = data
+        self.extension = extension
+        self.mime = mime
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.encode_s = encode_s
+
+    def filename(self, stem):
+        return stem + self.extension
+
+
+def _resize_to_width(img, max_width):
+    height, width = img.shape[:2]
+    if not max_width or width <= max_width:
+        return img
+    size = (max_width, max(1, round(height * max_width / width)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_image(img, fmt='jpeg', max_bytes=400 * 1024, max_width=1280):
+    """Encode a BGR/BGRA capture as fmt within max_bytes. Returns an EncodedImage.
+
+    The image is first shrunk to max_width. Quality then steps down through
+    QUALITY_STEPS until the result fits; if it still doesn't, the image is
+    shrunk by a quarter and the steps repeat, up to MAX_SHRINKS times. The
+    smallest attempt is returned when nothing fits. WebP falls back to JPEG
+    when this OpenCV build can't write it; PNG ignores the budget.
+    """
+    started = time.perf_counter()
+    if img.ndim == 3 and img.shape[2] == 4:
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    img = _resize_to_width(img, max_width)
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown screenshot format: {fmt}")
+    extension, mime, quality_flag = FORMATS[fmt]
+    if quality_flag is None:
+        success, encoded = cv2.imencode(extension, img)
+        if not success:
+            raise RuntimeError(f"cv2.imencode failed for {fmt}")
+        return EncodedImage(encoded.tobytes(), extension, mime, img.shape[1], img.shape[0], None,
+                            time.perf_counter() - started)
+
+    best = None
+    for shrink in range(MAX_SHRINKS + 1):
+        for quality in QUALITY_STEPS:
+            try:
+                success, encoded = cv2.imencode(extension, img, [quality_flag, quality])
+            except cv2.error:
+                success = False
+            if not success:
+                if fmt == 'jpeg':
+                    raise RuntimeError("cv2.imencode failed for jpeg")
+                return encode_image(img, 'jpeg', max_bytes, max_width)
+            if best is None or encoded.nbytes < len(best[0]):
+                best = (encoded.tobytes(), quality, img.shape[1], img.shape[0])
+            if encoded.nbytes <= max_bytes:
+                return EncodedImage(best[0], extension, mime, best[2], best[3], quality,
+                                    time.perf_counter() - started)
+        if shrink < MAX_SHRINKS:
+            img = _resize_to_width(img, int(img.shape[1] * 0.75))
+    data, quality, width, height = best
+    return EncodedImage(data, extension, mime, width, height, quality, time.perf_counter() - started)
+
+
+class ScreenshotEncoder:
+    """Encodes screenshots on a background thread so capture returns straight away.
+
+    submit() takes the raw capture and returns a Future of an EncodedImage;
+    the caller must not modify the array afterwards.
+    """
+
+    def __init__(self, fmt='jpeg', max_bytes=400 * 1024, max_width=1280):
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.max_width = max_width
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot-encoder')
+
+    def submit(self, img):
+        return self._executor.submit(encode_image, img, self.fmt, self.max_bytes, self.max_width)
+
+    def stop(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import time
+
+from event_log import log
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to a temp file next to path, fsync it, then rename it over path."""
+    path = str(path)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SettingsStore:
+    """Write-behind persistence for macro_settings.json.
+
+    mark_dirty() only records that something changed. A background thread
+    writes snapshot() once no change has arrived for `delay` seconds, or at
+    the latest `max_delay` seconds after the first unsaved change, so a
+    slider drag becomes one or two writes. Writes go through
+    write_json_atomic, so a crash leaves either the old or the new file.
+    flush() writes immediately; stop() flushes and ends the thread.
+    """
+
+    def __init__(self, path, snapshot, delay=0.5, max_delay=3.0):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.max_delay = max_delay
+        self.requests = 0
+        self.writes = 0
+        self.errors = 0
+        self._dirty_since = None
+        self._last_change = 0.0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._stopped = False
+        self._thread = None
+
+    def mark_dirty(self):
+        with self._condition:
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_change = now
+            self.requests += 1
+            stopped = self._stopped
+            if not stopped:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+                    self._thread.start()
+                self._condition.notify()
+        if stopped:
+            # Changes after shutdown have no writer thread to wait for.
+            self.flush()
+
+    def _run(self):
+        with self._condition:
+            while not self._stopped:
+                if self._dirty_since is None:
+                    self._condition.wait()
+                    continue
+                due = min(self._last_change + self.delay, self._dirty_since + self.max_delay)
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._condition.release()
+                try:
+                    self.flush()
+                finally:
+                    self._condition.acquire()
+
+    def flush(self):
+        """Write the settings now if anything changed since the last write."""
+        with self._write_lock:
+            with self._condition:
+                if self._dirty_since is None:
+                    return True
+                self._dirty_since = None
+            try:
+                write_json_atomic(self.path, self.snapshot())
+            except Exception as e:
+                self.errors += 1
+                with self._condition:
+                    # Keep the change pending and retry after max_delay.
+                    if self._dirty_since is None:
+                        self._dirty_since = time.monotonic()
+                        self._last_change = self._dirty_since + self.max_delay
+                print(f"Error saving settings: {e}")
+                return False
+            self.writes += 1
+            log.debug('settings_saved', "Settings saved", writes=self.writes, requests=self.requests)
+            return True
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        return self.flush()
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "coalesced": max(0, self.requests - self.writes),
+            "errors": self.errors,
+            "pending": self._dirty_since is not None,
+        }
@@ -0,0 +1,592 @@
+import json
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import zlib
+
+import requests
+
+from event_log import log
+
+
+class WebhookMessage:
+    __slots__ = ('url', 'payload', 'files', 'label', 'attempts', 'created')
+
+    def __init__(self, url, payload, files=None, label="webhook"):
+        self.url = url
+        self.payload = payload
+        self.files = files  # {field: (filename, bytes, mime)}
+        self.label = label
+        self.attempts = 0
+        self.created = time.time()
+
+
+_FRAME = struct.Struct('<2sII')  # magic, body length, crc32 of body
+_MAGIC = b'HW'
+_META = struct.Struct('<I')
+
+
+def encode_message(message):
+    """One spool frame: JSON metadata, then the attachment bytes back to back."""
+    files = message.files or {}
+    meta = json.dumps({
+        "url": message.url,
+        "payload": message.payload,
+        "label": message.label,
+        "created": message.created,
+        "files": [[field, name, mime, len(data)] for field, (name, data, mime) in files.items()],
+    }, separators=(',', ':')).encode('utf-8')
+    body = b''.join([_META.pack(len(meta)), meta] + [data for _name, data, _mime in files.values()])
+    return _FRAME.pack(_MAGIC, len(body), zlib.crc32(body)) + body
+
+
+def decode_message(body):
+    meta_size, = _META.unpack_from(body)
+    meta = json.loads(body[_META.size:_META.size + meta_size])
+    offset = _META.size + meta_size
+    files = {}
+    for field, name, mime, size in meta["files"]:
+        files[field] = (name, body[offset:offset + size], mime)
+        offset += size
+    message = WebhookMessage(meta["url"], meta["payload"], files or None, meta["label"])
+    message.created = meta["created"]
+    return message
+
+
+class WebhookSpool:
+    """Append-only on-disk store for webhooks that could not be delivered.
+
+    Messages are written as CRC-checked frames into numbered segment files
+    (a new segment after segment_bytes, and on every start, so a frame torn
+    by a crash is never appended to). peek()/ack() consume the oldest
+    message; the read position is kept in a small cursor file replaced
+    atomically, so a restart resumes where replay stopped. When the spool
+    grows past max_bytes, the oldest segments are deleted.
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024, segment_bytes=4 * 1024 * 1024):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._segments = []  # ascending sequence numbers
+        self._write_file = None
+        self._cursor = (None, 0)  # (segment, offset) of the oldest unacknowledged frame
+        self._records = 0
+        self._load()
+
+    def _path(self, segment):
+        return os.path.join(self.directory, f"{segment:08d}.spool")
+
+    def _load(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        self._segments = sorted(int(name[:-6]) for name in names if name.endswith('.spool') and name[:-6].isdigit())
+        try:
+            with open(os.path.join(self.directory, 'cursor')) as f:
+                segment, offset = (int(v) for v in f.read().split())
+            if segment in self._segments:
+                self._cursor = (segment, offset)
+        except (OSError, ValueError):
+            pass
+        # Segments replayed completely in an earlier run
+        cursor_segment, cursor_offset = self._cursor
+        for segment in list(self._segments):
+            if cursor_segment is not None and (segment < cursor_segment or (
+                    segment == cursor_segment and cursor_offset >= _file_size(self._path(segment)))):
+                self._segments.remove(segment)
+                self._delete(segment)
+        self._records = sum(1 for _ in self._frames())
+
+    def _frames(self, segments=None):
+        """(segment, offset, end, body) for every unacknowledged frame, oldest first."""
+        cursor_segment, cursor_offset = self._cursor
+        for segment in list(self._segments if segments is None else segments):
+            if cursor_segment is not None and segment < cursor_segment:
+                continue
+            offset = cursor_offset if segment == cursor_segment else 0
+            try:
+                with open(self._path(segment), 'rb') as f:
+                    f.seek(offset)
+                    while True:
+                        header = f.read(_FRAME.size)
+                        if len(header) < _FRAME.size:
+                            break
+                        magic, size, crc = _FRAME.unpack(header)
+                        body = f.read(size)
+                        if magic != _MAGIC or len(body) < size or zlib.crc32(body) != crc:
+                            break  # torn or corrupt tail; nothing after it is trusted
+                        end = offset + _FRAME.size + size
+                        yield segment, offset, end, body
+                        offset = end
+            except OSError:
+                continue
+
+    def append(self, message):
+        frame = encode_message(message)
+        with self._lock:
+            if self._write_file is None or self._write_file.tell() >= self.segment_bytes:
+                self._roll()
+            self._write_file.write(frame)
+            self._write_file.flush()
+            os.fsync(self._write_file.fileno())
+            self._records += 1
+            self._evict()
+
+    def _roll(self):
+        if self._write_file is not None:
+            self._write_file.close()
+        segment = (self._segments[-1] + 1) if self._segments else 1
+        self._write_file = open(self._path(segment), 'ab')
+        self._segments.append(segment)
+
+    def _evict(self):
+        sizes = {segment: _file_size(self._path(segment)) for segment in self._segments}
+        while len(self._segments) > 1 and sum(sizes.values()) > self.max_bytes:
+            oldest = self._segments.pop(0)
+            dropped = sum(1 for _frame in self._frames([oldest]))
+            self._delete(oldest)
+            sizes.pop(oldest)
+            self._records = max(0, self._records - dropped)
+            self.evicted += dropped
+            log.warning('webhook_spool_evicted', "Webhook spool full, dropped oldest messages", dropped=dropped)
+
+    def _delete(self, segment):
+        try:
+            os.remove(self._path(segment))
+        except OSError:
+            pass
+        if self._cursor[0] == segment:
+            self._cursor = (None, 0)
+            self._save_cursor()
+
+    def peek(self):
+        """The oldest spooled message, or None."""
+        with self._lock:
+            for _segment, _offset, _end, body in self._frames():
+                return decode_message(body)
+        return None
+
+    def ack(self):
+        """Mark the oldest spooled message as handled."""
+        with self._lock:
+            for segment, _offset, end, _body in self._frames():
+                self._records = max(0, self._records - 1)
+                if self._write_file is None or segment != self._segments[-1]:
+                    if end >= _file_size(self._path(segment)):
+                        self._segments.remove(segment)
+                        self._delete(segment)
+                        return
+                self._cursor = (segment, end)
+                self._save_cursor()
+                return
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, 'cursor')
+        segment, offset = self._cursor
+        try:
+            if segment is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            with open(path + '.tmp', 'w') as f:
+                f.write(f"{segment} {offset}")
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            log.warning('webhook_spool_error', "Failed to save webhook spool cursor", error=str(e))
+
+    def close(self):
+        with self._lock:
+            if self._write_file is not None:
+                self._write_file.close()
+                self._write_file = None
+
+    def stats(self):
+        return {
+            "records": self._records,
+            "bytes": sum(_file_size(self._path(segment)) for segment in self._segments),
+            "evicted": self.evicted,
+        }
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class WebhookDispatcher:
+    """Delivers Discord webhooks from a background thread.
+
+    submit() only enqueues, so the macro thread never waits on the network.
+    One requests.Session keeps the HTTPS connection alive between posts.
+    A 429 waits for Discord's retry_after; timeouts, connection errors and
+    5xx responses back off exponentially (with jitter) up to max_attempts;
+    other 4xx responses are not retried. When Discord reports the bucket is
+    empty (X-RateLimit-Remaining: 0) the next post waits for the reset.
+
+    The queue is bounded; when it is full the oldest message is dropped.
+    Messages that could not be delivered (other than ones Discord rejected
+    outright) go to the spool, if one is given. Whenever the queue is idle
+    the spool is replayed oldest first with a single post per message that
+    never sleeps on the dispatcher thread, backing off up to
+    max_replay_backoff while the network stays down. Failed replay posts
+    are counted in replay_retries, not in failed or retries.
+    on_give_up(message, reason) is called for every undelivered message.
+    """
+
+    def __init__(self, queue_size=64, timeout=10.0, max_attempts=5, base_backoff=1.0, max_backoff=60.0,
+                 on_give_up=None, spool=None, max_replay_backoff=300.0):
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.on_give_up = on_give_up
+        self.spool = spool
+        self.max_replay_backoff = max_replay_backoff
+        self.replayed = 0
+        self.replay_retries = 0
+        self._replay_failures = 0
+        self._next_replay = 0.0
+        self.session = requests.Session()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._not_before = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="webhook", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, url, payload, files=None, label="webhook"):
+        return self.submit_message(WebhookMessage(url, payload, files, label))
+
+    def submit_message(self, message):
+        self.start()
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return True
+            except queue.Full:
+                try:
+                    dropped = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self.dropped += 1
+                log.warning('webhook_dropped', "Webhook queue full, dropping oldest message", every=30.0, label=dropped.label)
+                self._give_up(dropped, "queue_full")
+
+    def stop(self, timeout=5.0):
+        """Deliver what is queued for up to timeout seconds, then stop."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stop.set()
+        self._thread.join(timeout=max(0.0, deadline - time.monotonic()) + 0.5)
+        self._thread = None
+        while True:
+            try:
+                self._give_up(self._queue.get_nowait(), "shutdown")
+            except queue.Empty:
+                break
+        if self.spool is not None:
+            self.spool.close()
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "dropped": self.dropped,
+            "replayed": self.replayed,
+            "replay_retries": self.replay_retries,
+            "spool": self.spool.stats() if self.spool is not None else None,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            replay_due = self.spool is not None and time.monotonic() >= self._next_replay
+            try:
+                message = self._queue.get(timeout=0.01 if replay_due else 0.5)
+            except queue.Empty:
+                if replay_due:
+                    self._replay_one()
+                continue
+            result = self._deliver(message)
+            if result is True:
+                # The network is back; don't make spooled messages wait out their backoff
+                self._next_replay = 0.0
+            else:
+                self._give_up(message, result)
+
+    def _replay_one(self):
+        if self._not_before > time.monotonic():
+            self._next_replay = self._not_before
+            return
+        try:
+            message = self.spool.peek()
+        except Exception as e:
+            log.error('webhook_spool_error', "Failed to read webhook spool", every=60.0, error=str(e))
+            message = None
+        if message is None:
+            self._next_replay = time.monotonic() + 5.0
+            return
+        result = self._replay_attempt(message)
+        if result is True or result.startswith('http_'):
+            self.spool.ack()
+            self._replay_failures = 0
+            if result is True:
+                self.replayed += 1
+                log.info('webhook_replayed', "Delivered spooled webhook", label=message.label,
+                         age_s=round(time.time() - message.created, 1))
+            return
+        self.replay_retries += 1
+        self._replay_failures += 1
+        delay = min(self.max_replay_backoff, self.base_backoff * (2 ** self._replay_failures))
+        self._next_replay = max(time.monotonic() + delay, self._not_before)
+
+    def _replay_attempt(self, message):
+        """One post of a spooled message, without sleeping. Returns True, 'http_NNN' if rejected, or 'retry'."""
+        message.attempts += 1
+        try:
+            response = self._post(message, timeout=min(self.timeout, 5.0))
+        except requests.exceptions.RequestException as e:
+            log.debug('webhook_replay_error', "Spooled webhook not delivered yet", every=60.0,
+                      label=message.label, error=str(e)[:100])
+            return "retry"
+        self._note_rate_limit(response)
+        if response.status_code < 300:
+            self.sent += 1
+            return True
+        if response.status_code == 429:
+            self.rate_limited += 1
+            self._not_before = time.monotonic() + _retry_after(response)
+            return "retry"
+        if response.status_code >= 500:
+            return "retry"
+        self.failed += 1
+        log.error('webhook_failed', "Spooled webhook rejected", label=message.label,
+                  status=response.status_code, body=response.text[:100])
+        return f"http_{response.status_code}"
+
+    def _note_rate_limit(self, response):
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset_after = _float(response.headers.get('X-RateLimit-Reset-After'))
+            if reset_after:
+                self._not_before = time.monotonic() + reset_after
+
+    def _wait(self, seconds):
+        """Sleep, waking early on stop(). Returns False if stopping."""
+        return not self._stop.wait(max(0.0, seconds))
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _post(self, message, timeout=None):
+        timeout = timeout or self.timeout
+        if message.files:
+            return self.session.post(message.url, data={'payload_json': json.dumps(message.payload)},
+                                     files=message.files, timeout=timeout)
+        return self.session.post(message.url, json=message.payload, timeout=timeout)
+
+    def _deliver(self, message):
+        """Post until it succeeds or attempts run out. Returns True, or why it failed."""
+        max_attempts = self.max_attempts
+        message.attempts = 0
+        throttled = 0
+        while message.attempts < max_attempts and throttled <= 2 * max_attempts:
+            if not self._wait(self._not_before - time.monotonic()):
+                break
+            message.attempts += 1
+            try:
+                response = self._post(message)
+            except requests.exceptions.RequestException as e:
+                self.retries += 1
+                log.warning('webhook_error', "Webhook request failed, retrying", every=30.0,
+                            label=message.label, attempt=message.attempts, error=str(e)[:100])
+                if not self._wait(self._backoff(message.attempts)):
+                    break
+                continue
+
+            self._note_rate_limit(response)
+
+            if response.status_code < 300:
+                self.sent += 1
+                log.info('webhook_sent', "Webhook sent", label=message.label, attempts=message.attempts)
+                return True
+            if response.status_code == 429:
+                self.rate_limited += 1
+                retry_after = _retry_after(response)
+                log.warning('webhook_rate_limited', "Discord rate limited the webhook", every=30.0,
+                            label=message.label, retry_after=retry_after)
+                # Waiting out a 429 is not the message's fault
+                message.attempts -= 1
+                throttled += 1
+                self._not_before = time.monotonic() + retry_after
+                continue
+            if response.status_code >= 500:
+                self.retries += 1
+                if not self._wait(self._backoff(message.attempts)):
+                    break
+                continue
+            self.failed += 1
+            log.error('webhook_failed', "Webhook rejected", label=message.label,
+                      status=response.status_code, body=response.text[:100])
+            return f"http_{response.status_code}"
+
+        self.failed += 1
+        log.warning('webhook_failed', "Webhook not delivered", every=30.0, label=message.label, attempts=message.attempts)
+        return "retries_exhausted" if not self._stop.is_set() else "shutdown"
+
+    def _give_up(self, message, reason):
+        if self.spool is not None and not reason.startswith('http_'):
+            try:
+                self.spool.append(message)
+                log.info('webhook_spooled', "Saved undelivered webhook for later", label=message.label, reason=reason)
+            except Exception as e:
+                log.error('webhook_spool_error', "Failed to spool webhook", label=message.label, error=str(e))
+        if self.on_give_up is not None:
+            try:
+                self.on_give_up(message, reason)
+            except Exception as e:
+                log.error('webhook_give_up_error', "Failed to hand off undelivered webhook", error=str(e))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_after(response):
+    """Seconds to wait after a 429, from Discord's JSON body or the Retry-After header."""
+    try:
+        retry_after = _float(response.json().get('retry_after'))
+    except (ValueError, AttributeError):
+        retry_after = None
+    if retry_after is None:
+        retry_after = _float(response.headers.get('Retry-After'))
+    return retry_after if retry_after is not None else 1.0
+
+
+class WebhookDigest:
+    """Buffers low-priority webhook embeds and sends them as one message per interval.
+
+    add() is called instead of submitting an embed on its own. Every
+    interval seconds the buffered embeds for each URL go out in as few
+    messages as Discord allows (max_embeds per message); when more than
+    that piled up, the newest ones are kept and one extra embed counts the
+    rest. snapshot(), if given, is called once per interval and returns
+    (url, embed) for a periodic event such as current throughput, or None.
+    Urgent alerts should keep using the dispatcher directly. The interval
+    timer runs between start() and stop().
+    """
+
+    def __init__(self, dispatcher, interval=600.0, max_embeds=10, max_messages=1, snapshot=None, username="haiku"):
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.max_embeds = max_embeds
+        self.max_messages = max_messages
+        self.snapshot = snapshot
+        self.username = username
+        self.events = 0
+        self.digests = 0
+        self._buffers = {}  # url -> [(label, embed, mention)]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="webhook-digest", daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, url, embed, label, mention=None):
+        with self._lock:
+            self._buffers.setdefault(url, []).append((label, embed, mention))
+            self.events += 1
+
+    def stop(self):
+        """Send whatever is buffered and stop the timer."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._take_snapshot()
+            self.flush()
+
+    def _take_snapshot(self):
+        if self.snapshot is None:
+            return
+        try:
+            snapshot = self.snapshot()
+        except Exception as e:
+            log.warning('webhook_digest_snapshot_error', "Failed to build digest snapshot", error=str(e))
+            return
+        if snapshot:
+            url, embed = snapshot
+            self.add(url, embed, "throughput")
+
+    def flush(self):
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+        for url, events in buffers.items():
+            embeds = [embed for _label, embed, _mention in events]
+            capacity = self.max_embeds * self.max_messages
+            if len(embeds) > capacity:
+                older = events[:len(embeds) - capacity + 1]
+                counts = {}
+                for label, _embed, _mention in older:
+                    counts[label] = counts.get(label, 0) + 1
+                summary = {
+                    "title": f"...and {len(older)} earlier events",
+                    "description": ", ".join(f"{count} {label}" for label, count in sorted(counts.items())),
+                    "color": 0x95a5a6,
+                }
+                embeds = [summary] + embeds[len(older):]
+            mentions = sorted({mention for _label, _embed, mention in events if mention})
+            for start in range(0, len(embeds), self.max_embeds):
+                payload = {"embeds": embeds[start:start + self.max_embeds], "username": self.username}
+                if mentions and start == 0:
+                    payload["content"] = " ".join(f"<@{mention}>" for mention in mentions)
+                self.dispatcher.submit(url, payload, label="digest")
+                self.digests += 1
+            log.info('webhook_digest_sent', "Sent webhook digest", events=len(events))
+
+    def stats(self):
+        with self._lock:
+            buffered = sum(len(events) for events in self._buffers.values())
+        return {
+            "buffered": buffered,
+            "events": self.events,
+            "digests": self.digests,
+            "requests_saved": max(0, self.events - buffered - self.digests),
+        }
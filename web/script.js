@@ -741,11 +741,99 @@ async function updateUI() {
         if (statusDot) {
             statusDot.style.background = state.running ? 'var(--success)' : 'var(--text-muted)';
         }
+
+        await updateCycleBreakdown();
+        await updateOcrEngineStatus(state.ocr_status);
     } catch (e) {
         // Silently fail - API might not be ready
     }
 }
 
+// ---- Cycle Breakdown ----
+const CYCLE_PHASE_LABELS = {
+    pre_cast: 'Buy / craft',
+    rod_select: 'Rod & bait select',
+    cast: 'Cast hold',
+    bite_wait: 'Bite wait',
+    minigame: 'Minigame',
+    ocr: 'OCR',
+    fruit_storage: 'Fruit storage',
+    end_delay: 'End delay'
+};
+
+async function updateCycleBreakdown() {
+    const container = document.getElementById('cycleBreakdown');
+    if (!container) return;
+    try {
+        const breakdown = await pywebview.api.get_cycle_breakdown();
+        if (!breakdown || !breakdown.cycles) return;
+
+        const rows = Object.entries(CYCLE_PHASE_LABELS).map(([phase, label]) => {
+            const stats = breakdown.phases[phase] || { share: 0, mean_s: 0 };
+            const percent = (stats.share * 100).toFixed(1);
+            return `<div style="display: flex; justify-content: space-between;">` +
+                `<span>${label}</span>` +
+                `<span style="color: var(--text-muted);">${stats.mean_s.toFixed(2)}s &middot; ${percent}%</span>` +
+                `</div>`;
+        });
+        rows.push(`<div style="color: var(--text-muted); margin-top: 4px;">${breakdown.cycles} cycles</div>`);
+        container.innerHTML = rows.join('');
+    } catch (e) {
+        // API might not be ready
+    }
+}
+
+async function exportCycleBreakdown() {
+    try {
+        const result = await pywebview.api.export_cycle_breakdown();
+        if (result && result.success) {
+            showToast('Exported', result.path, 'success');
+        } else {
+            showToast('Failed', result ? result.message : 'Export failed', 'error');
+        }
+    } catch (e) {
+        showToast('Error', 'Failed to export cycle breakdown', 'error');
+    }
+}
+
+// ---- OCR Engine ----
+const OCR_TIMING_LABELS = {
+    torch_import_s: 'Torch import',
+    easyocr_import_s: 'EasyOCR import',
+    model_load_s: 'Model load',
+    first_inference_s: 'Warm-up inference',
+    total_s: 'Total'
+};
+let lastOcrStatus = null;
+
+async function updateOcrEngineStatus(status) {
+    const container = document.getElementById('ocrEngineStatus');
+    if (!container || status === lastOcrStatus) return;
+    lastOcrStatus = status;
+
+    if (status === 'unavailable') {
+        showToast('Warning', 'OCR failed to initialize — devil fruit detection disabled', 'warning');
+    }
+    const labels = { pending: 'Waiting...', loading: 'Loading...', ready: 'Ready', unloaded: 'Unloaded while idle', unavailable: 'Unavailable' };
+    const rows = [`<div>Status: <span style="color: var(--text-muted);">${labels[status] || status}</span></div>`];
+    if (status === 'ready') {
+        try {
+            const stats = await pywebview.api.get_ocr_stats();
+            const timings = stats.init_timings || {};
+            Object.entries(OCR_TIMING_LABELS).forEach(([key, label]) => {
+                if (timings[key] === undefined) return;
+                rows.push(`<div style="display: flex; justify-content: space-between;">` +
+                    `<span>${label}</span>` +
+                    `<span style="color: var(--text-muted);">${timings[key].toFixed(2)}s</span>` +
+                    `</div>`);
+            });
+        } catch (e) {
+            // API might not be ready
+        }
+    }
+    container.innerHTML = rows.join('');
+}
+
 // ---- Loading Status ----
 function updateLoadingStatus(msg) {
     const el = document.getElementById('loadingStatus');